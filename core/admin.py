@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AcademicSession, Term, ClassLevel, ClassRoom, Subject, SubjectVideo, SchoolSettings
+from .models import AcademicSession, Term, ClassLevel, ClassRoom, Subject, SubjectVideo, SchoolSettings, SearchEntry
 
 @admin.register(AcademicSession)
 class AcademicSessionAdmin(admin.ModelAdmin):
@@ -36,3 +36,9 @@ class SubjectVideoAdmin(admin.ModelAdmin):
 @admin.register(SchoolSettings)
 class SchoolSettingsAdmin(admin.ModelAdmin):
     list_display = ['school_name', 'school_phone', 'school_email']
+
+
+@admin.register(SearchEntry)
+class SearchEntryAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_id', 'content', 'updated_at']
+    list_filter = ['kind']
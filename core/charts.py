@@ -1,74 +1,164 @@
-import plotly.graph_objects as go
+import hashlib
+import uuid
 from datetime import date
+from functools import wraps
+from inspect import signature
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from .models import ClassRoom
 from attendance.models import StudentAttendance
-from finance.models import Invoice
-from students.models import Student, Result
-from django.db.models import Count, Sum, Avg, F
-
-
-def get_attendance_chart():
-    """Generate attendance statistics pie chart"""
+from finance.analytics import revenue_series
+from students.models import StudentTermSummary
+from django.db.models import Count, Sum, Q, ExpressionWrapper, FloatField
+from django.db.models.functions import Cast
+
+CHART_SOURCES = {
+    'attendance': ['attendance.StudentAttendance'],
+    'revenue': ['finance.Payment', 'finance.Invoice'],
+    'students': ['core.ClassRoom', 'students.Student'],
+    'performance': ['students.Result', 'students.StudentTermSummary', 'students.Student'],
+}
+
+
+def _chart_version(name):
+    return cache.get_or_set(f'chart:{name}:version', uuid.uuid4().hex, None)
+
+
+def invalidate_chart(name):
+    """Expire every cached variant of a chart once the current transaction commits"""
+    transaction.on_commit(lambda: cache.set(f'chart:{name}:version', uuid.uuid4().hex, None))
+
+
+def cached_chart(name, daily=False):
+    """Cache a chart function's output per chart name and filter arguments.
+
+    Entries are keyed on a per-chart version token, so invalidating a chart
+    swaps the token instead of hunting down every filter combination.
+    """
+    def decorator(func):
+        params = signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = params.bind(*args, **kwargs)
+            bound.apply_defaults()
+            filters = '&'.join(f"{k}={v or ''}" for k, v in bound.arguments.items())
+            if daily:
+                filters += f"&day={date.today().isoformat()}"
+            digest = hashlib.md5(filters.encode()).hexdigest()
+            key = f"chart:{name}:{_chart_version(name)}:{func.__name__}:{digest}"
+            output = cache.get(key)
+            if output is None:
+                output = func(*args, **kwargs)
+                cache.set(key, output, settings.CHART_CACHE_TIMEOUT)
+            return output
+        return wrapper
+    return decorator
+
+
+@cached_chart('attendance', daily=True)
+def attendance_chart_data():
+    """Attendance statistics pie chart spec"""
     today = date.today()
-    present = StudentAttendance.objects.filter(date=today, status='present').count()
-    absent = StudentAttendance.objects.filter(date=today, status='absent').count()
-
-    fig = go.Figure(data=[go.Pie(
-        labels=['Present', 'Absent'],
-        values=[present, absent],
-        marker=dict(colors=['#28a745', '#dc3545'])
-    )])
-    fig.update_layout(height=300, showlegend=True, margin=dict(l=0, r=0, t=0, b=0))
-    return fig.to_html(include_plotlyjs=False, div_id="attendance_chart", config={'displaylogo': False})
-
-def get_revenue_chart():
-    """Generate revenue trends line chart"""
-    invoice = Invoice.objects.all()
-
-    names = [str(p.student.first_name) for p in invoice]
-    amounts = [float(p.amount_paid or 0) for p in invoice]
-
-    fig = go.Figure(data=[go.Scatter(x=names, y=amounts, mode='lines+markers', fill='tozeroy', line=dict(color='#007bff'))])
-    fig.update_layout(height=300, xaxis_title="students", yaxis_title="Revenue ($)", margin=dict(l=40, r=20, t=20, b=40))
-    return fig.to_html(include_plotlyjs=False, div_id="revenue_chart",config={'displaylogo': False})
-
+    counts = StudentAttendance.objects.filter(date=today).aggregate(
+        present=Count('id', filter=Q(status='present')),
+        absent=Count('id', filter=Q(status='absent')),
+    )
 
-def get_student_distribution():
-    """Generate student per class bar chart"""
+    return {
+        'data': [{
+            'type': 'pie',
+            'labels': ['Present', 'Absent'],
+            'values': [counts['present'], counts['absent']],
+            'marker': {'colors': ['#28a745', '#dc3545']},
+        }],
+        'layout': {'height': 300, 'showlegend': True, 'margin': {'l': 0, 'r': 0, 't': 0, 'b': 0}},
+        'empty': not (counts['present'] or counts['absent']),
+    }
+
+
+@cached_chart('revenue')
+def revenue_chart_data(session_id=None, term_id=None, period='month'):
+    """Revenue trends line chart spec"""
+    series = revenue_series(period, session_id, term_id)
+
+    return {
+        'data': [{
+            'type': 'scatter',
+            'x': [p['period'] for p in series],
+            'y': [p['total'] for p in series],
+            'mode': 'lines+markers',
+            'fill': 'tozeroy',
+            'line': {'color': '#007bff'},
+        }],
+        'layout': {
+            'height': 300,
+            'xaxis': {'title': {'text': period.title()}},
+            'yaxis': {'title': {'text': 'Revenue ($)'}},
+            'margin': {'l': 40, 'r': 20, 't': 20, 'b': 40},
+        },
+        'empty': not series,
+    }
+
+
+@cached_chart('students')
+def student_distribution_data():
+    """Students per class bar chart spec"""
     classrooms = ClassRoom.objects.annotate(student_count=Count('student')).values('name', 'student_count').order_by('name')
 
     names = [c['name'] for c in classrooms] if classrooms else ['No Data']
     counts = [c['student_count'] for c in classrooms] if classrooms else [0]
 
-    fig = go.Figure(data=[go.Bar(x=names, y=counts, marker_color='#28a745')])
-    fig.update_layout(height=300, xaxis_title="Class", yaxis_title="Students", margin=dict(l=40, r=20, t=20, b=40))
-    return fig.to_html(include_plotlyjs=False, div_id="students_chart",config={'displaylogo': False})
-
-
-def get_performance_chart(session_id=None, term_id=None, class_id=None):
-    """Generate student performance bar chart (Name vs Average)"""
-    results_query = Result.objects.select_related('student')
+    return {
+        'data': [{'type': 'bar', 'x': names, 'y': counts, 'marker': {'color': '#28a745'}}],
+        'layout': {
+            'height': 300,
+            'xaxis': {'title': {'text': 'Class'}},
+            'yaxis': {'title': {'text': 'Students'}},
+            'margin': {'l': 40, 'r': 20, 't': 20, 'b': 40},
+        },
+        'empty': not classrooms,
+    }
+
+
+@cached_chart('performance')
+def performance_chart_data(session_id=None, term_id=None, class_id=None):
+    """Student performance bar chart spec (Name vs Average)"""
+    summaries = StudentTermSummary.objects.all()
     if session_id:
-        results_query = results_query.filter(session_id=session_id)
+        summaries = summaries.filter(session_id=session_id)
     if term_id:
-        results_query = results_query.filter(term_id=term_id)
+        summaries = summaries.filter(term_id=term_id)
     if class_id:
-        results_query = results_query.filter(classroom_id=class_id)
+        summaries = summaries.filter(classroom_id=class_id)
 
-    performance_data = results_query.values('student__first_name', 'student__last_name').annotate(avg_score=Avg(F('ca_score') + F('exam_score'))).order_by('-avg_score')[:20]
+    avg_score = ExpressionWrapper(Cast(Sum('total'), FloatField()) / Sum('subject_count'), output_field=FloatField())
+    performance_data = summaries.values('student_id', 'student__first_name', 'student__last_name').annotate(avg_score=avg_score).order_by('-avg_score')[:20]
 
     names = [f"{p['student__first_name']} {p['student__last_name']}" for p in performance_data]
     scores = [float(p['avg_score'] or 0) for p in performance_data]
+    empty = not names
 
-    if not names:
+    if empty:
         names, scores = ['No Data'], [0]
 
-    fig = go.Figure(data=[go.Bar(x=names, y=scores, marker_color='#6366f1')])
-    fig.update_layout(
-        height=400,
-        xaxis_title="Student Name",
-        yaxis_title="Average Score",
-        margin=dict(l=40, r=20, t=20, b=80),
-        xaxis_tickangle=-45
-    )
-    return fig.to_html(include_plotlyjs=False, div_id="performance_chart", config={'displaylogo': False})
\ No newline at end of file
+    return {
+        'data': [{'type': 'bar', 'x': names, 'y': scores, 'marker': {'color': '#6366f1'}}],
+        'layout': {
+            'height': 400,
+            'xaxis': {'title': {'text': 'Student Name'}, 'tickangle': -45},
+            'yaxis': {'title': {'text': 'Average Score'}},
+            'margin': {'l': 40, 'r': 20, 't': 20, 'b': 80},
+        },
+        'empty': empty,
+    }
+
+
+CHART_DATA = {
+    'attendance': (attendance_chart_data, {}),
+    'revenue': (revenue_chart_data, {'session': 'session_id', 'term': 'term_id', 'period': 'period'}),
+    'students': (student_distribution_data, {}),
+    'performance': (performance_chart_data, {'session': 'session_id', 'term': 'term_id', 'class': 'class_id'}),
+}
+
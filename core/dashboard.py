@@ -0,0 +1,125 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from .models import ClassRoom, Subject
+from students.models import Student
+from teachers.models import Teacher
+from finance.rollup import finance_totals
+from library.models import Book, BookIssue
+from attendance.models import StudentAttendance
+from cbt.models import Exam
+from homepage.models import Admission
+
+SNAPSHOT_CACHE_KEY = 'dashboard:snapshot'
+
+_widget_executor = ThreadPoolExecutor(max_workers=settings.DASHBOARD_WIDGET_WORKERS, thread_name_prefix='dashboard-widget')
+
+
+def get_school_counts():
+    """Head counts for students, staff, classes, subjects and approved admissions"""
+    return {
+        'total_students': Student.objects.filter(status='active').count(),
+        'total_teachers': Teacher.objects.filter(status='active').count(),
+        'total_classes': ClassRoom.objects.count(),
+        'total_subjects': Subject.objects.count(),
+        'new_admissions_count': Admission.objects.filter(status='Approved').count(),
+    }
+
+
+def get_finance_totals():
+    """Revenue collected and fees still outstanding"""
+    totals = finance_totals()
+    return {
+        'total_revenue': totals['collected'],
+        'pending_fees': totals['outstanding'],
+    }
+
+
+def get_attendance_today():
+    """Present/absent student counts for today in a single query"""
+    counts = StudentAttendance.objects.filter(date=date.today()).aggregate(
+        present=Count('id', filter=Q(status='present')),
+        absent=Count('id', filter=Q(status='absent')),
+    )
+    return {
+        'present_today': counts['present'],
+        'absent_today': counts['absent'],
+    }
+
+
+def get_library_counts():
+    """Library stock and books currently on loan"""
+    return {
+        'total_books': Book.objects.count(),
+        'books_issued': BookIssue.objects.filter(status='issued').count(),
+    }
+
+
+def get_exam_counts():
+    """Published CBT exams"""
+    return {
+        'active_exams': Exam.objects.filter(status='published').count(),
+    }
+
+
+SNAPSHOT_WIDGETS = (
+    get_school_counts,
+    get_finance_totals,
+    get_attendance_today,
+    get_library_counts,
+    get_exam_counts,
+)
+
+
+def build_dashboard_snapshot():
+    """Compute every dashboard KPI from the database"""
+    snapshot = {'date': date.today()}
+    for widget in SNAPSHOT_WIDGETS:
+        snapshot.update(widget())
+    return snapshot
+
+
+def get_dashboard_snapshot():
+    """Return the cached KPI snapshot, rebuilding it on a miss or a new day"""
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+    if snapshot is None or snapshot['date'] != date.today():
+        snapshot = build_dashboard_snapshot()
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot, settings.DASHBOARD_CACHE_TIMEOUT)
+    return snapshot
+
+
+def _run_in_worker(func):
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def run_widget(func):
+    """Run a blocking widget function on the bounded dashboard thread pool.
+
+    Each worker thread holds its own database connection, so widgets issue
+    their queries concurrently instead of queueing behind one another.
+    """
+    return await sync_to_async(_run_in_worker, thread_sensitive=False, executor=_widget_executor)(func)
+
+
+async def aget_dashboard_snapshot():
+    """Async variant of get_dashboard_snapshot that computes widgets in parallel on a miss"""
+    snapshot = await cache.aget(SNAPSHOT_CACHE_KEY)
+    if snapshot is None or snapshot['date'] != date.today():
+        snapshot = {'date': date.today()}
+        for values in await asyncio.gather(*(run_widget(widget) for widget in SNAPSHOT_WIDGETS)):
+            snapshot.update(values)
+        await cache.aset(SNAPSHOT_CACHE_KEY, snapshot, settings.DASHBOARD_CACHE_TIMEOUT)
+    return snapshot
+
+
+def invalidate_dashboard_snapshot():
+    """Drop the cached snapshot once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(SNAPSHOT_CACHE_KEY))
@@ -0,0 +1,173 @@
+import csv
+import tempfile
+from datetime import datetime
+from django.conf import settings
+from django.utils import timezone
+from openpyxl import Workbook
+from . import search
+from attendance.models import StudentAttendance
+from finance.models import Invoice, Payment
+from students.models import Student
+from teachers.models import Teacher
+
+EXPORTS = {
+    'students': {
+        'queryset': lambda: Student.objects.all(),
+        'columns': [
+            ('Admission No', 'admission_number'),
+            ('First Name', 'first_name'),
+            ('Last Name', 'last_name'),
+            ('Other Name', 'other_name'),
+            ('Gender', 'gender'),
+            ('Date of Birth', 'date_of_birth'),
+            ('Admission Date', 'admission_date'),
+            ('Class Level', 'current_class__class_level__name'),
+            ('Class', 'current_class__name'),
+            ('Status', 'status'),
+            ('Phone', 'phone'),
+            ('Email', 'email'),
+            ('Parent Name', 'parent_name'),
+            ('Parent Phone', 'parent_phone'),
+            ('Parent Email', 'parent_email'),
+        ],
+        'filters': {'class': 'current_class_id', 'status': 'status'},
+        'search': 'student',
+    },
+    'teachers': {
+        'queryset': lambda: Teacher.objects.all(),
+        'columns': [
+            ('Staff ID', 'staff_id'),
+            ('First Name', 'first_name'),
+            ('Last Name', 'last_name'),
+            ('Gender', 'gender'),
+            ('Date Employed', 'date_employed'),
+            ('Qualification', 'qualification'),
+            ('Phone', 'phone'),
+            ('Email', 'email'),
+            ('Status', 'status'),
+        ],
+        'filters': {'status': 'status'},
+        'search': 'teacher',
+    },
+    'invoices': {
+        'queryset': lambda: Invoice.objects.all(),
+        'columns': [
+            ('Invoice No', 'invoice_number'),
+            ('Admission No', 'student__admission_number'),
+            ('First Name', 'student__first_name'),
+            ('Last Name', 'student__last_name'),
+            ('Session', 'session__name'),
+            ('Term', 'term__name'),
+            ('Total', 'total_amount'),
+            ('Paid', 'amount_paid'),
+            ('Balance', 'balance'),
+            ('Status', 'status'),
+            ('Due Date', 'due_date'),
+            ('Created', 'created_at'),
+        ],
+        'filters': {
+            'status': 'status',
+            'session': 'session_id',
+            'term': 'term_id',
+            'start_date': 'created_at__date__gte',
+            'end_date': 'created_at__date__lte',
+        },
+        'search': 'invoice',
+    },
+    'payments': {
+        'queryset': lambda: Payment.objects.all(),
+        'columns': [
+            ('Receipt No', 'receipt_number'),
+            ('Invoice No', 'invoice__invoice_number'),
+            ('Admission No', 'invoice__student__admission_number'),
+            ('Amount', 'amount'),
+            ('Method', 'payment_method'),
+            ('Status', 'payment_status'),
+            ('Payment Date', 'payment_date'),
+            ('Reference', 'reference'),
+            ('Paystack Reference', 'paystack_reference'),
+            ('Received By', 'received_by'),
+        ],
+        'filters': {
+            'status': 'payment_status',
+            'method': 'payment_method',
+            'start_date': 'payment_date__gte',
+            'end_date': 'payment_date__lte',
+        },
+    },
+    'attendance': {
+        'queryset': lambda: StudentAttendance.objects.all(),
+        'columns': [
+            ('Date', 'date'),
+            ('Admission No', 'student__admission_number'),
+            ('First Name', 'student__first_name'),
+            ('Last Name', 'student__last_name'),
+            ('Class Level', 'classroom__class_level__name'),
+            ('Class', 'classroom__name'),
+            ('Status', 'status'),
+            ('Remarks', 'remarks'),
+        ],
+        'filters': {
+            'class': 'classroom_id',
+            'status': 'status',
+            'term': 'term_id',
+            'start_date': 'date__gte',
+            'end_date': 'date__lte',
+        },
+    },
+}
+
+
+def export_rows(name, params):
+    """Headers and a lazily-evaluated row iterator for an export, filtered by request ``params``.
+
+    Rows come from values_list().iterator() so only one chunk is held in
+    memory at a time. Invalid filter values raise ValidationError/ValueError
+    here, before anything has been streamed.
+    """
+    export = EXPORTS[name]
+    queryset = export['queryset']()
+    filters = {lookup: params[param] for param, lookup in export['filters'].items() if params.get(param)}
+    if filters:
+        queryset = queryset.filter(**filters)
+    if export.get('search') and params.get('q'):
+        queryset = search.filter_queryset(queryset, export['search'], params['q'])
+
+    headers = [header for header, _ in export['columns']]
+    fields = [field for _, field in export['columns']]
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    return headers, rows
+
+
+class Echo:
+    """File-like object whose write() hands the line back, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _excel_value(value):
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def write_xlsx(headers, rows, sheet_name='Export'):
+    """Write rows to a write-only workbook in a temporary file and return it rewound"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([_excel_value(value) for value in row])
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,150 @@
+import io
+import os
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from .qrcodes import generate_qr_codes
+
+CARD_WIDTH = 3.5*inch
+CARD_HEIGHT = 2.25*inch
+SHEET_COLUMNS = 2
+SHEET_ROWS = 5
+
+
+def _draw_card_frame(p, colour, title):
+    p.setLineWidth(2)
+    p.setStrokeColor(colors.HexColor(colour))
+    p.rect(0.05*inch, 0.05*inch, 3.4*inch, 2.15*inch)
+
+    p.setFillColor(colors.HexColor(colour))
+    p.rect(0.05*inch, 1.8*inch, 3.4*inch, 0.4*inch, fill=True)
+
+    p.setFillColor(colors.white)
+    p.setFont("Helvetica-Bold", 12)
+    p.drawCentredString(1.75*inch, 2.05*inch, title)
+
+
+def _draw_card_footer(p, colour):
+    p.setFillColor(colors.HexColor(colour))
+    p.rect(0.05*inch, 0.05*inch, 3.4*inch, 0.2*inch, fill=True)
+
+    p.setFillColor(colors.white)
+    p.setFont("Helvetica", 5)
+    p.drawCentredString(1.75*inch, 0.1*inch, "Valid for Current Academic Year | Keep Card Safe")
+
+
+def _draw_qr(p, qr):
+    if qr is not None:
+        try:
+            p.drawImage(qr, 2.6*inch, 0.8*inch, width=0.7*inch, height=0.7*inch)
+        except Exception:
+            pass
+
+
+def draw_student_card(p, student, qr=None):
+    """Draw a student ID card with its lower-left corner at the current origin"""
+    _draw_card_frame(p, '#1e40af', "STUDENT ID CARD")
+
+    p.setFillColor(colors.black)
+    p.setFont("Helvetica-Bold", 9)
+    p.drawString(0.2*inch, 1.6*inch, student.full_name.upper())
+
+    p.setFont("Helvetica", 7)
+    p.drawString(0.2*inch, 1.35*inch, f"ID: {student.admission_number}")
+    p.drawString(0.2*inch, 1.15*inch, f"Class: {student.current_class or 'N/A'}")
+    p.drawString(0.2*inch, 0.95*inch, f"DOB: {student.date_of_birth.strftime('%d/%m/%Y') if student.date_of_birth else 'N/A'}")
+    p.drawString(0.2*inch, 0.75*inch, f"Status: {student.get_status_display()}")
+
+    _draw_qr(p, qr)
+
+    p.setFont("Helvetica", 6)
+    p.drawString(0.2*inch, 0.35*inch, f"Admission: {student.admission_date.strftime('%d/%m/%Y') if student.admission_date else 'N/A'}")
+
+    _draw_card_footer(p, '#1e40af')
+
+
+def draw_staff_card(p, teacher, qr=None):
+    """Draw a staff ID card with its lower-left corner at the current origin"""
+    _draw_card_frame(p, '#059669', "STAFF ID CARD")
+
+    p.setFillColor(colors.black)
+    p.setFont("Helvetica-Bold", 9)
+    p.drawString(0.2*inch, 1.6*inch, teacher.full_name.upper())
+
+    p.setFont("Helvetica", 7)
+    p.drawString(0.2*inch, 1.35*inch, f"Staff ID: {teacher.staff_id}")
+    p.drawString(0.2*inch, 1.15*inch, "Position: Teacher")
+    if teacher.qualification:
+        qual_short = teacher.qualification[:25]
+        p.drawString(0.2*inch, 0.95*inch, f"Qualification: {qual_short}")
+    p.drawString(0.2*inch, 0.75*inch, f"Status: {teacher.get_status_display()}")
+
+    _draw_qr(p, qr)
+
+    p.setFont("Helvetica", 6)
+    p.drawString(0.2*inch, 0.35*inch, f"Employed: {teacher.date_employed.strftime('%d/%m/%Y') if teacher.date_employed else 'N/A'}")
+
+    _draw_card_footer(p, '#059669')
+
+
+def qr_path(person):
+    try:
+        path = person.qr_code.path if person.qr_code else None
+    except (ValueError, NotImplementedError):
+        return None
+    return path if path and os.path.exists(path) else None
+
+
+def _ensure_qr_codes(people):
+    missing = [person.pk for person in people if not person.qr_code]
+    if not missing:
+        return
+    model = type(people[0])
+    workers = os.cpu_count() if len(missing) >= settings.ID_CARD_POOL_THRESHOLD else None
+    generate_qr_codes(model._meta.label, missing, workers=workers)
+    stored = dict(model.objects.filter(pk__in=missing).values_list('pk', 'qr_code'))
+    for person in people:
+        if person.pk in stored:
+            person.qr_code = stored[person.pk]
+
+
+def render_card_sheets(people, draw_card, title):
+    """Lay cards out 10 per A4 page on a single canvas and return the PDF bytes.
+
+    Missing QR codes are rendered up front (in a process pool for large
+    batches) and each QR image is decoded once and reused.
+    """
+    people = list(people)
+    _ensure_qr_codes(people)
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    p.setTitle(title)
+
+    page_width, page_height = A4
+    margin_x = (page_width - SHEET_COLUMNS * CARD_WIDTH) / 2
+    margin_y = (page_height - SHEET_ROWS * CARD_HEIGHT) / 2
+    per_page = SHEET_COLUMNS * SHEET_ROWS
+    images = {}
+
+    for index, person in enumerate(people):
+        slot = index % per_page
+        if index and slot == 0:
+            p.showPage()
+        column, row = slot % SHEET_COLUMNS, slot // SHEET_COLUMNS
+
+        path = qr_path(person)
+        if path and path not in images:
+            images[path] = ImageReader(path)
+
+        p.saveState()
+        p.translate(margin_x + column * CARD_WIDTH, page_height - margin_y - (row + 1) * CARD_HEIGHT)
+        draw_card(p, person, images.get(path))
+        p.restoreState()
+
+    p.showPage()
+    p.save()
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,27 @@
+import os
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from core.qrcodes import QR_SOURCES, generate_qr_codes, missing_qr_pks
+
+
+class Command(BaseCommand):
+    help = 'Generate missing QR codes for all students and teachers in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes used to render QR images')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--force', action='store_true', help='Regenerate codes that already exist')
+
+    def handle(self, *args, **options):
+        for label in QR_SOURCES:
+            if options['force']:
+                pks = list(apps.get_model(label).objects.values_list('pk', flat=True))
+            else:
+                pks = missing_qr_pks(label)
+
+            done = 0
+            for start in range(0, len(pks), options['batch_size']):
+                batch = pks[start:start + options['batch_size']]
+                done += generate_qr_codes(label, batch, force=options['force'], workers=options['workers'])
+                self.stdout.write(f'{label}: {done}/{len(pks)}')
+            self.stdout.write(self.style.SUCCESS(f'{label}: generated {done} QR code(s).'))
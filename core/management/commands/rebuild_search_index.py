@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from core.search import rebuild_index, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for students, teachers and invoices'
+
+    def handle(self, *args, **options):
+        counts = rebuild_index()
+        summary = ', '.join(f'{count} {kind}(s)' for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Indexed {summary} using the {search_backend()} backend.'))
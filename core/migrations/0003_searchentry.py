@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_subject_description_subject_icon_subjectvideo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Student'), ('teacher', 'Teacher'), ('invoice', 'Invoice')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('content', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Search entries',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+import re
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE core_searchentry_fts USING fts5("
+    "content, content='core_searchentry', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER core_searchentry_ai AFTER INSERT ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER core_searchentry_ad AFTER DELETE ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER core_searchentry_au AFTER UPDATE ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO core_searchentry_fts(rowid, content) VALUES (new.id, new.content); END",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS core_searchentry_au",
+    "DROP TRIGGER IF EXISTS core_searchentry_ad",
+    "DROP TRIGGER IF EXISTS core_searchentry_ai",
+    "DROP TABLE IF EXISTS core_searchentry_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS core_searchentry_tsv_idx ON core_searchentry USING GIN (to_tsvector('simple', content))",
+    "CREATE INDEX IF NOT EXISTS core_searchentry_trgm_idx ON core_searchentry USING GIN (content gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS core_searchentry_trgm_idx",
+    "DROP INDEX IF EXISTS core_searchentry_tsv_idx",
+]
+
+
+def _run(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_search_backend(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            _run(schema_editor, SQLITE_FORWARD)
+        except Exception:
+            # SQLite built without FTS5: search falls back to LIKE matching.
+            _run(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_backend(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+
+
+def _parts(value):
+    return ' '.join(re.findall(r'[^\W\d_]+|\d+', value or ''))
+
+
+def backfill_search_entries(apps, schema_editor):
+    SearchEntry = apps.get_model('core', 'SearchEntry')
+    Student = apps.get_model('students', 'Student')
+    Teacher = apps.get_model('teachers', 'Teacher')
+    Invoice = apps.get_model('finance', 'Invoice')
+
+    entries = []
+    for s in Student.objects.all().iterator():
+        words = [s.first_name, s.last_name, s.other_name, s.admission_number, _parts(s.admission_number)]
+        entries.append(SearchEntry(kind='student', object_id=s.pk, content=' '.join(filter(None, words))))
+    for t in Teacher.objects.all().iterator():
+        words = [t.first_name, t.last_name, t.staff_id, _parts(t.staff_id), t.email]
+        entries.append(SearchEntry(kind='teacher', object_id=t.pk, content=' '.join(filter(None, words))))
+    for i in Invoice.objects.select_related('student').iterator():
+        words = [i.invoice_number, _parts(i.invoice_number), i.student.first_name, i.student.last_name, i.student.admission_number]
+        entries.append(SearchEntry(kind='invoice', object_id=i.pk, content=' '.join(filter(None, words))))
+    SearchEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_searchentry'),
+        ('students', '0005_student_last_name_index'),
+        ('teachers', '0002_teacher_qr_code'),
+        ('finance', '0002_payment_payment_status_payment_paystack_access_code_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_backend, drop_search_backend),
+        migrations.RunPython(backfill_search_entries, migrations.RunPython.noop),
+    ]
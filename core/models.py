@@ -103,3 +103,23 @@ class SchoolSettings(models.Model):
 
     def __str__(self):
         return self.school_name
+
+
+class SearchEntry(models.Model):
+    KIND_CHOICES = [
+        ('student', 'Student'),
+        ('teacher', 'Teacher'),
+        ('invoice', 'Invoice'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    content = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        verbose_name_plural = "Search entries"
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
@@ -0,0 +1,85 @@
+import base64
+import datetime
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder truncates datetimes to milliseconds; a cursor must keep the exact value"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    payload = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Malformed cursor')
+    return values
+
+
+def _after(ordering, values):
+    """Build the row-value comparison ``(a, b, ...) > (va, vb, ...)`` as ORed Q objects"""
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[index]})
+        for prev_field, prev_value in zip(ordering[:index], values[:index]):
+            clause &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= clause
+    return condition
+
+
+def _value(row, name):
+    if isinstance(row, dict):
+        return row[name]
+    value = row
+    for part in name.split('__'):
+        value = getattr(value, part)
+    return value
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=50):
+    """Return ``(rows, next_cursor)`` for the page after ``cursor``.
+
+    ``ordering`` must end with a unique field (normally ``'id'``) so the
+    position of every row is unambiguous. Unlike OFFSET pagination the
+    database seeks straight to the cursor, so deep pages cost the same as
+    the first one.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, len(ordering))))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([_value(last, field.lstrip('-')) for field in ordering])
+    return rows, next_cursor
+
+
+def get_page_size(request, default, maximum=200):
+    try:
+        size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from .background import run_in_background
+
+QR_SOURCES = {
+    'students.Student': ('admission_number', 'STUDENT'),
+    'teachers.Teacher': ('staff_id', 'TEACHER'),
+}
+
+
+def render_qr_png(data):
+    """Render ``data`` as a QR code PNG and return the bytes"""
+    import qrcode
+
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _qr_target(label, instance):
+    field, prefix = QR_SOURCES[label]
+    identifier = getattr(instance, field)
+    return f"{prefix}:{identifier}", f"qr_{identifier}.png"
+
+
+def store_qr_code(instance, png):
+    """Write ``png`` to storage and persist only the qr_code column (no second full save)"""
+    label = instance._meta.label
+    _, filename = _qr_target(label, instance)
+    instance.qr_code.save(filename, ContentFile(png), save=False)
+    type(instance).objects.filter(pk=instance.pk).update(qr_code=instance.qr_code.name)
+
+
+def generate_qr_codes(label, pks, force=False, workers=None):
+    """Render and store QR codes for ``pks`` of ``label``; renders in a process pool when ``workers`` > 1"""
+    model = apps.get_model(label)
+    field, _ = QR_SOURCES[label]
+    instances = model.objects.filter(pk__in=pks).only('pk', field, 'qr_code')
+    if not force:
+        instances = instances.filter(Q(qr_code='') | Q(qr_code__isnull=True))
+    instances = list(instances)
+
+    payloads = [_qr_target(label, instance)[0] for instance in instances]
+    if workers and workers > 1 and len(payloads) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            images = pool.map(render_qr_png, payloads, chunksize=16)
+            for instance, png in zip(instances, images):
+                store_qr_code(instance, png)
+    else:
+        for instance, payload in zip(instances, payloads):
+            store_qr_code(instance, render_qr_png(payload))
+    return len(instances)
+
+
+def schedule_qr_codes(label, pks):
+    """Generate missing QR codes off the request thread after the current transaction commits"""
+    pks = list(pks)
+    if pks:
+        run_in_background(generate_qr_codes, label, pks)
+
+
+def schedule_qr_code(instance):
+    schedule_qr_codes(instance._meta.label, [instance.pk])
+
+
+def missing_qr_pks(label):
+    model = apps.get_model(label)
+    return list(model.objects.filter(Q(qr_code='') | Q(qr_code__isnull=True)).values_list('pk', flat=True))
@@ -0,0 +1,153 @@
+import re
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from .models import SearchEntry
+
+FTS_TABLE = 'core_searchentry_fts'
+
+_backends = {}
+
+
+def _identifier_parts(value):
+    """Split identifiers like ADM2024001 into 'ADM 2024001' so each part is prefix-searchable"""
+    return ' '.join(re.findall(r'[^\W\d_]+|\d+', value or ''))
+
+
+def _join(*words):
+    return ' '.join(w for w in words if w)
+
+
+def student_document(student):
+    return _join(student.first_name, student.last_name, student.other_name,
+                 student.admission_number, _identifier_parts(student.admission_number))
+
+
+def teacher_document(teacher):
+    return _join(teacher.first_name, teacher.last_name, teacher.staff_id,
+                 _identifier_parts(teacher.staff_id), teacher.email)
+
+
+def invoice_document(invoice):
+    student = invoice.student
+    return _join(invoice.invoice_number, _identifier_parts(invoice.invoice_number),
+                 student.first_name, student.last_name, student.admission_number)
+
+
+DOCUMENTS = {
+    'student': student_document,
+    'teacher': teacher_document,
+    'invoice': invoice_document,
+}
+
+
+def search_backend():
+    """'fts5' on SQLite with the FTS table, 'postgres' on PostgreSQL, otherwise 'basic'"""
+    key = (connection.vendor, connection.settings_dict['NAME'])
+    if key not in _backends:
+        if connection.vendor == 'postgresql':
+            _backends[key] = 'postgres'
+        elif connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+            _backends[key] = 'fts5'
+        else:
+            _backends[key] = 'basic'
+    return _backends[key]
+
+
+def index_object(kind, obj):
+    SearchEntry.objects.update_or_create(kind=kind, object_id=obj.pk, defaults={'content': DOCUMENTS[kind](obj)})
+
+
+def remove_object(kind, pk):
+    SearchEntry.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def index_objects(kind, objects, batch_size=500):
+    """Upsert search entries for ``objects`` in batches (for bulk writers that skip signals)"""
+    document = DOCUMENTS[kind]
+    entries = []
+    count = 0
+    for obj in objects:
+        entries.append(SearchEntry(kind=kind, object_id=obj.pk, content=document(obj)))
+        if len(entries) >= batch_size:
+            count += _upsert(entries)
+            entries = []
+    if entries:
+        count += _upsert(entries)
+    return count
+
+
+def index_queryset(kind, queryset, batch_size=500):
+    return index_objects(kind, queryset.iterator(chunk_size=batch_size), batch_size)
+
+
+def _upsert(entries):
+    SearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['content', 'updated_at'],
+    )
+    return len(entries)
+
+
+def _tokens(query):
+    return re.findall(r'\w+', query or '')
+
+
+def _match_sql(kind, tokens):
+    """Return ``(sql, params)`` selecting object_id of matching entries, best match first"""
+    backend = search_backend()
+    if backend == 'fts5':
+        expression = ' '.join(f'"{token}"*' for token in tokens)
+        sql = (
+            f"SELECT e.object_id FROM core_searchentry e JOIN {FTS_TABLE} f ON f.rowid = e.id "
+            f"WHERE e.kind = %s AND {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE})"
+        )
+        return sql, [kind, expression]
+    if backend == 'postgres':
+        expression = ' & '.join(f'{token}:*' for token in tokens)
+        sql = (
+            "SELECT object_id FROM core_searchentry "
+            "WHERE kind = %s AND (to_tsvector('simple', content) @@ to_tsquery('simple', %s) OR content ILIKE %s) "
+            "ORDER BY ts_rank(to_tsvector('simple', content), to_tsquery('simple', %s)) DESC"
+        )
+        return sql, [kind, expression, f"%{' '.join(tokens)}%", expression]
+    sql = "SELECT object_id FROM core_searchentry WHERE kind = %s" + " AND content LIKE %s" * len(tokens)
+    return sql, [kind] + [f'%{token}%' for token in tokens]
+
+
+def filter_queryset(queryset, kind, query):
+    """Restrict ``queryset`` to objects whose search entry matches ``query``.
+
+    The match runs as a subquery, so the caller's own ordering and
+    pagination still apply.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return queryset
+    sql, params = _match_sql(kind, tokens)
+    return queryset.filter(pk__in=RawSQL(sql, params))
+
+
+def ranked_ids(kind, query, limit=20):
+    """Object ids matching ``query``, best match first"""
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+    sql, params = _match_sql(kind, tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} LIMIT %s", params + [limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild_index():
+    from students.models import Student
+    from teachers.models import Teacher
+    from finance.models import Invoice
+
+    SearchEntry.objects.all().delete()
+    return {
+        'student': index_queryset('student', Student.objects.all()),
+        'teacher': index_queryset('teacher', Teacher.objects.all()),
+        'invoice': index_queryset('invoice', Invoice.objects.select_related('student')),
+    }
@@ -0,0 +1,69 @@
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from . import search
+from .charts import CHART_SOURCES, invalidate_chart
+from .dashboard import invalidate_dashboard_snapshot
+
+DASHBOARD_SOURCES = [
+    'students.Student',
+    'teachers.Teacher',
+    'core.ClassRoom',
+    'core.Subject',
+    'homepage.Admission',
+    'finance.Invoice',
+    'finance.Payment',
+    'library.Book',
+    'library.BookIssue',
+    'attendance.StudentAttendance',
+    'cbt.Exam',
+]
+
+
+def _invalidate_caches(sender, **kwargs):
+    label = sender._meta.label
+    if label in DASHBOARD_SOURCES:
+        invalidate_dashboard_snapshot()
+    for name, sources in CHART_SOURCES.items():
+        if label in sources:
+            invalidate_chart(name)
+
+
+watched = set(DASHBOARD_SOURCES)
+for sources in CHART_SOURCES.values():
+    watched.update(sources)
+
+for label in sorted(watched):
+    model = apps.get_model(label)
+    post_save.connect(_invalidate_caches, sender=model, dispatch_uid=f'core-cache-save-{label}')
+    post_delete.connect(_invalidate_caches, sender=model, dispatch_uid=f'core-cache-delete-{label}')
+
+
+def _index_student(sender, instance, **kwargs):
+    search.index_object('student', instance)
+    search.index_queryset('invoice', instance.invoices.select_related('student'))
+
+
+def _index_teacher(sender, instance, **kwargs):
+    search.index_object('teacher', instance)
+
+
+def _index_invoice(sender, instance, **kwargs):
+    search.index_object('invoice', instance)
+
+
+def _unindex(kind):
+    def receiver(sender, instance, **kwargs):
+        search.remove_object(kind, instance.pk)
+    return receiver
+
+
+SEARCH_RECEIVERS = {
+    'students.Student': ('student', _index_student),
+    'teachers.Teacher': ('teacher', _index_teacher),
+    'finance.Invoice': ('invoice', _index_invoice),
+}
+
+for label, (kind, index_receiver) in SEARCH_RECEIVERS.items():
+    model = apps.get_model(label)
+    post_save.connect(index_receiver, sender=model, dispatch_uid=f'core-search-save-{label}')
+    post_delete.connect(_unindex(kind), sender=model, weak=False, dispatch_uid=f'core-search-delete-{label}')
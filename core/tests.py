@@ -1,3 +1,17 @@
+import datetime
 from django.test import TestCase
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
 
-# Create your tests here.
+
+class CursorTests(TestCase):
+    def test_round_trip_keeps_microseconds(self):
+        moment = datetime.datetime(2026, 3, 1, 8, 15, 30, 123456, tzinfo=datetime.timezone.utc)
+        values = decode_cursor(encode_cursor([moment, 42]), 2)
+        self.assertEqual(datetime.datetime.fromisoformat(values[0]), moment)
+        self.assertEqual(values[1], 42)
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor', 2)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(encode_cursor([1]), 2)
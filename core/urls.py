@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'core'
 
 urlpatterns = [
-    path('', views.dashboard, name='dashboard'),
+    path('', views.dashboard_async if settings.DASHBOARD_ASYNC else views.dashboard, name='dashboard'),
+    path('api/charts/<str:name>/', views.chart_data_api, name='chart_data'),
+    path('exports/<str:name>/', views.export_data, name='export'),
     path('classes/', views.class_list, name='class_list'),
     path('classes/add/', views.class_add, name='class_add'),
     path('classes/<int:pk>/edit/', views.class_edit, name='class_edit'),
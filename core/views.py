@@ -1,85 +1,132 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Sum, Avg, F
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.db.models import Count, Avg, F
 from students.models import Student
-from teachers.models import Teacher
-from finance.models import Invoice, Payment
-from library.models import Book, BookIssue
-from attendance.models import StudentAttendance
-from cbt.models import Exam, ExamAttempt
+from finance.models import Payment
+from cbt.models import ExamAttempt
 from .models import ClassLevel, ClassRoom, Subject, AcademicSession, Term
-from .charts import get_attendance_chart, get_revenue_chart, get_student_distribution,get_performance_chart
+from .charts import CHART_DATA
+from .exports import EXPORTS, export_rows, stream_csv, write_xlsx
+from .dashboard import get_dashboard_snapshot, aget_dashboard_snapshot, run_widget
+from asgiref.sync import sync_to_async
 from datetime import date, timedelta
+import asyncio
+import hashlib
+import json
 
 
 @login_required
 def dashboard(request):
     role = getattr(request.user, 'role', 'student')
 
-    total_students = Student.objects.filter(status='active').count()
-    total_teachers = Teacher.objects.filter(status='active').count()
-    total_classes = ClassRoom.objects.count()
-    total_subjects = Subject.objects.count()
+    snapshot = get_dashboard_snapshot()
 
-    from homepage.models import Admission
-    new_admissions_count = Admission.objects.filter(status='Approved').count()
+    recent_students = Student.objects.select_related('current_class__class_level').order_by('-created_at')[:5]
+    recent_payments = Payment.objects.select_related('invoice__student').order_by('-created_at')[:5]
 
-    total_revenue = Payment.objects.aggregate(total=Sum('amount'))['total'] or 0
-    pending_fees = Invoice.objects.filter(status__in=['pending', 'partial']).aggregate(total=Sum('balance'))['total'] or 0
-
-    total_books = Book.objects.count()
-    books_issued = BookIssue.objects.filter(status='issued').count()
+    selected_session = request.GET.get('session')
+    selected_term = request.GET.get('term')
+    selected_class = request.GET.get('class')
 
-    today = date.today()
-    present_today = StudentAttendance.objects.filter(date=today, status='present').count()
-    absent_today = StudentAttendance.objects.filter(date=today, status='absent').count()
+    sessions = AcademicSession.objects.all().order_by('-start_date')
+    terms = Term.objects.select_related('session')
+    classrooms = ClassRoom.objects.all()
 
-    recent_students = Student.objects.order_by('-created_at')[:5]
-    recent_payments = Payment.objects.order_by('-created_at')[:5]
+    context = {
+        'recent_students': recent_students,
+        'recent_payments': recent_payments,
+        'sessions': sessions,
+        'terms': terms,
+        'classrooms': classrooms,
+        'selected_session': selected_session,
+        'selected_term': selected_term,
+        'selected_class': selected_class,
+        **snapshot,
+    }
+    return render(request, 'core/dashboard.html', context)
 
-    active_exams = Exam.objects.filter(status='published').count()
 
+@login_required
+async def dashboard_async(request):
+    """Dashboard for ASGI deployments: independent widgets are queried concurrently"""
     selected_session = request.GET.get('session')
     selected_term = request.GET.get('term')
     selected_class = request.GET.get('class')
 
-    sessions = AcademicSession.objects.all().order_by('-start_date')
-    terms = Term.objects.all()
-    classrooms = ClassRoom.objects.all()
-
-    attendance_chart = get_attendance_chart()
-    revenue_chart = get_revenue_chart()
-    student_chart = get_student_distribution()
-    performance_chart = get_performance_chart(selected_session, selected_term, selected_class)
+    snapshot, recent_students, recent_payments, sessions, terms, classrooms = await asyncio.gather(
+        aget_dashboard_snapshot(),
+        run_widget(lambda: list(Student.objects.select_related('current_class__class_level').order_by('-created_at')[:5])),
+        run_widget(lambda: list(Payment.objects.select_related('invoice__student').order_by('-created_at')[:5])),
+        run_widget(lambda: list(AcademicSession.objects.all().order_by('-start_date'))),
+        run_widget(lambda: list(Term.objects.select_related('session'))),
+        run_widget(lambda: list(ClassRoom.objects.all())),
+    )
 
     context = {
-        'total_students': total_students,
-        'total_teachers': total_teachers,
-        'total_classes': total_classes,
-        'total_subjects': total_subjects,
-        'new_admissions_count': new_admissions_count,
-        'total_revenue': total_revenue,
-        'pending_fees': pending_fees,
-        'total_books': total_books,
-        'books_issued': books_issued,
-        'present_today': present_today,
-        'absent_today': absent_today,
         'recent_students': recent_students,
         'recent_payments': recent_payments,
-        'active_exams': active_exams,
-        'attendance_chart': attendance_chart,
-        'revenue_chart': revenue_chart,
-        'student_chart': student_chart,
-        'performance_chart': performance_chart,
         'sessions': sessions,
         'terms': terms,
         'classrooms': classrooms,
         'selected_session': selected_session,
         'selected_term': selected_term,
         'selected_class': selected_class,
+        **snapshot,
     }
-    return render(request, 'core/dashboard.html', context)
+    return await sync_to_async(render)(request, 'core/dashboard.html', context)
+
+
+@login_required
+def chart_data_api(request, name):
+    if name not in CHART_DATA:
+        return JsonResponse({'status': 'error', 'message': f"Unknown chart '{name}'"}, status=404)
+
+    chart_func, params = CHART_DATA[name]
+    filters = {arg: request.GET[param] for param, arg in params.items() if request.GET.get(param)}
+    try:
+        spec = chart_func(**filters)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    payload = json.dumps(spec, cls=DjangoJSONEncoder, separators=(',', ':'))
+    etag = quote_etag(hashlib.md5(payload.encode()).hexdigest())
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(payload, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def export_data(request, name):
+    if name not in EXPORTS:
+        return JsonResponse({'status': 'error', 'message': f"Unknown export '{name}'"}, status=404)
+
+    try:
+        headers, rows = export_rows(name, request.GET)
+    except (ValidationError, ValueError) as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    filename = f"{name}_{date.today():%Y%m%d}"
+    if request.GET.get('format') == 'xlsx':
+        return FileResponse(
+            write_xlsx(headers, rows, name.title()),
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    response = StreamingHttpResponse(stream_csv(headers, rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
 
 
 @login_required
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FeeCategory, FeeStructure, Invoice, InvoiceItem, Payment, Expense
+from .models import FeeCategory, FeeStructure, Invoice, InvoiceItem, Payment, Expense, FinanceDailySummary, FinanceDailyBreakdown, PaystackEvent
 
 @admin.register(FeeCategory)
 class FeeCategoryAdmin(admin.ModelAdmin):
@@ -32,3 +32,20 @@ class ExpenseAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'amount', 'date']
     list_filter = ['category', 'date']
     date_hierarchy = 'date'
+
+@admin.register(FinanceDailySummary)
+class FinanceDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'invoiced', 'collected', 'payments', 'expenses', 'outstanding']
+    date_hierarchy = 'date'
+
+@admin.register(FinanceDailyBreakdown)
+class FinanceDailyBreakdownAdmin(admin.ModelAdmin):
+    list_display = ['date', 'kind', 'name', 'amount']
+    list_filter = ['kind', 'name']
+    date_hierarchy = 'date'
+
+@admin.register(PaystackEvent)
+class PaystackEventAdmin(admin.ModelAdmin):
+    list_display = ['event', 'reference', 'status', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'event']
+    search_fields = ['reference']
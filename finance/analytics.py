@@ -0,0 +1,45 @@
+from django.db.models import Sum, Count
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+from .models import FinanceDailySummary, Payment
+
+PERIOD_FUNCTIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def revenue_series(period='month', session_id=None, term_id=None):
+    """Completed payment totals bucketed by day, week or month in the database.
+
+    Returns a list of ``{'period', 'total', 'count'}`` dicts ordered by period,
+    with ``period`` as an ISO date string so the result is JSON-ready.
+    Unfiltered series are read from the daily rollup; the rollup has no
+    session or term, so filtered series still aggregate the payments.
+    """
+    if period not in PERIOD_FUNCTIONS:
+        raise ValueError(f"Unknown revenue period '{period}'")
+
+    if session_id or term_id:
+        payments = Payment.objects.filter(payment_status='completed')
+        if session_id:
+            payments = payments.filter(invoice__session_id=session_id)
+        if term_id:
+            payments = payments.filter(invoice__term_id=term_id)
+        buckets = payments.annotate(bucket=PERIOD_FUNCTIONS[period]('payment_date')).values('bucket').annotate(total=Sum('amount'), count=Count('id'))
+    else:
+        buckets = (
+            FinanceDailySummary.objects.filter(payments__gt=0)
+            .annotate(bucket=PERIOD_FUNCTIONS[period]('date'))
+            .values('bucket')
+            .annotate(total=Sum('collected'), count=Sum('payments'))
+        )
+    buckets = buckets.order_by('bucket')
+    return [
+        {
+            'period': row['bucket'].isoformat(),
+            'total': float(row['total'] or 0),
+            'count': row['count'],
+        }
+        for row in buckets
+    ]
@@ -0,0 +1,101 @@
+import uuid
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from core import search
+from core.charts import invalidate_chart
+from core.dashboard import invalidate_dashboard_snapshot
+from core.models import Term
+from students.models import Student
+from students.profile import invalidate_student_profiles
+from .models import FeeStructure, Invoice, InvoiceItem
+from .rollup import INVOICE_FIELDS, record_invoices, rollup_row
+
+
+def fee_schedule(term):
+    """Map class level id to ``[(category_id, amount, category_name)]`` for a term.
+
+    Structures set for the term override session-wide ones (no term) of the
+    same category and class level.
+    """
+    structures = (
+        FeeStructure.objects.filter(Q(term=term) | Q(term__isnull=True), session_id=term.session_id)
+        .select_related('category')
+        .order_by('class_level_id', 'category__name', 'term_id')
+    )
+    chosen = {}
+    for structure in structures:
+        key = (structure.class_level_id, structure.category_id)
+        if key not in chosen or structure.term_id is not None:
+            chosen[key] = structure
+
+    schedule = defaultdict(list)
+    for (class_level_id, category_id), structure in chosen.items():
+        schedule[class_level_id].append((category_id, structure.amount, structure.category.name))
+    return schedule
+
+
+def _invoice_number():
+    return f"INV{uuid.uuid4().hex[:10].upper()}"
+
+
+@transaction.atomic
+def generate_term_invoices(term, due_date=None, class_level_ids=None, chunk_size=None):
+    """Invoice every active student for ``term`` from the fee structures of their class level.
+
+    Students who already have an invoice for the term are skipped, as are
+    students whose class level has no fee structure. The term row is locked
+    first, so concurrent or double-submitted runs for the same term queue
+    up and each sees the invoices the previous one created. Invoices and their
+    items are bulk-created in chunks inside one transaction, then added to
+    the daily rollup, indexed for search and the finance caches are
+    invalidated (bulk writes skip signals and model saves). Returns
+    ``{'created', 'skipped', 'unbilled'}`` counts.
+    """
+    chunk_size = chunk_size or settings.TERM_INVOICE_CHUNK_SIZE
+    Term.objects.select_for_update().only('pk').get(pk=term.pk)
+    schedule = fee_schedule(term)
+
+    students = Student.objects.filter(status='active', current_class__isnull=False).select_related('current_class').only(
+        'id', 'admission_number', 'first_name', 'last_name', 'current_class__class_level_id',
+    )
+    if class_level_ids:
+        students = students.filter(current_class__class_level_id__in=class_level_ids)
+    invoiced = Invoice.objects.filter(session_id=term.session_id, term=term).values('student_id')
+    skipped = students.filter(pk__in=invoiced).count()
+    students = list(students.exclude(pk__in=invoiced).order_by('pk'))
+
+    billable = [s for s in students if schedule.get(s.current_class.class_level_id)]
+    created = []
+    for start in range(0, len(billable), chunk_size):
+        chunk = billable[start:start + chunk_size]
+        invoices = []
+        for student in chunk:
+            total = sum(amount for _, amount, _ in schedule[student.current_class.class_level_id])
+            invoices.append(Invoice(
+                invoice_number=_invoice_number(),
+                student=student,
+                session_id=term.session_id,
+                term=term,
+                total_amount=total,
+                balance=total,
+                status='pending',
+                due_date=due_date,
+            ))
+        invoices = Invoice.objects.bulk_create(invoices)
+        InvoiceItem.objects.bulk_create([
+            InvoiceItem(invoice=invoice, fee_category_id=category_id, amount=amount, description=name)
+            for invoice in invoices
+            for category_id, amount, name in schedule[invoice.student.current_class.class_level_id]
+        ])
+        created.extend(invoices)
+
+    if created:
+        record_invoices(added=[rollup_row(invoice, INVOICE_FIELDS) for invoice in created])
+        search.index_objects('invoice', created)
+        invalidate_dashboard_snapshot()
+        invalidate_chart('revenue')
+        invalidate_student_profiles(invoice.student_id for invoice in created)
+
+    return {'created': len(created), 'skipped': skipped, 'unbilled': len(students) - len(billable)}
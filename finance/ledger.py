@@ -0,0 +1,136 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from core.charts import invalidate_chart
+from core.dashboard import invalidate_dashboard_snapshot
+from students.profile import invalidate_student_profiles
+from .models import Invoice, Payment, invoice_status
+from .rollup import INVOICE_FIELDS, record_invoices
+
+COUNTED_STATUS = 'completed'
+RECONCILE_BATCH_SIZE = 500
+
+
+def _counted(status, amount):
+    return Decimal(amount) if status == COUNTED_STATUS else Decimal(0)
+
+
+def _invalidate(student_ids):
+    invalidate_dashboard_snapshot()
+    invalidate_chart('revenue')
+    invalidate_student_profiles(student_ids)
+
+
+def adjust_invoice(invoice_id, delta):
+    """Add ``delta`` to an invoice's amount paid under a row lock; returns ``(old_status, new_status)``.
+
+    The row is locked with select_for_update and the amounts are moved with
+    F() expressions, so concurrent payments on one invoice serialize instead
+    of overwriting each other. Must be called inside a transaction.
+    """
+    locked = (
+        Invoice.objects.select_for_update()
+        .filter(pk=invoice_id)
+        .values_list('total_amount', 'amount_paid', 'status', 'student_id', 'created_at', 'balance')
+        .first()
+    )
+    if locked is None:
+        return None, None
+
+    total_amount, amount_paid, old_status, student_id, created_at, balance = locked
+    new_status = invoice_status(total_amount, amount_paid + delta, old_status)
+    if delta:
+        Invoice.objects.filter(pk=invoice_id).update(
+            amount_paid=F('amount_paid') + delta,
+            balance=F('balance') - delta,
+            status=new_status,
+            updated_at=timezone.now(),
+        )
+        record_invoices(
+            [(created_at, total_amount, balance, old_status)],
+            [(created_at, total_amount, balance - delta, new_status)],
+        )
+        _invalidate([student_id])
+    return old_status, new_status
+
+
+def apply_payment_change(previous, payment):
+    """Post the ledger effect of a payment moving from ``previous`` to its current state.
+
+    ``previous`` starts with ``(invoice_id, payment_status, amount)`` as stored before
+    the write, or None for a new payment; a deleted payment passes None as
+    ``payment``. Only completed payments count towards an invoice, so the
+    pending -> completed, completed -> failed, amount and invoice changes
+    all reduce to a debit on the old invoice and a credit on the new one.
+    """
+    deltas = {}
+    if previous:
+        invoice_id, status, amount = previous[:3]
+        deltas[invoice_id] = deltas.get(invoice_id, 0) - _counted(status, amount)
+    if payment is not None:
+        deltas[payment.invoice_id] = deltas.get(payment.invoice_id, 0) + _counted(payment.payment_status, payment.amount)
+
+    for invoice_id, delta in sorted(deltas.items()):
+        adjust_invoice(invoice_id, delta)
+
+
+@transaction.atomic
+def set_payment_status(payment_id, status):
+    """Move a payment to ``status`` exactly once; returns the payment, or None if it was already there.
+
+    The payment row is locked first, so the Paystack callback and webhook
+    racing on the same reference credit the invoice only once.
+    """
+    payment = Payment.objects.select_for_update().get(pk=payment_id)
+    if payment.payment_status == status:
+        return None
+    payment.payment_status = status
+    payment.save(update_fields=['payment_status'])
+    return payment
+
+
+def _expected_invoices(queryset):
+    paid = Coalesce(Sum('payments__amount', filter=Q(payments__payment_status=COUNTED_STATUS)), Value(Decimal(0)))
+    return (
+        queryset.annotate(expected_paid=paid)
+        .values_list('pk', 'student_id', 'total_amount', 'amount_paid', 'balance', 'status', 'expected_paid')
+        .order_by('pk')
+    )
+
+
+def find_drift(queryset=None):
+    """Yield ``(invoice_id, student_id, stored, expected)`` for invoices whose paid/balance/status disagree with their payments"""
+    queryset = Invoice.objects.all() if queryset is None else queryset
+    for pk, student_id, total_amount, amount_paid, balance, status, expected_paid in _expected_invoices(queryset).iterator(chunk_size=2000):
+        expected = (expected_paid, total_amount - expected_paid, invoice_status(total_amount, expected_paid, status))
+        stored = (amount_paid, balance, status)
+        if stored != expected:
+            yield pk, student_id, stored, expected
+
+
+def reconcile_invoices(fix=False, queryset=None):
+    """Find (and with ``fix``, repair in bulk) invoices that drifted from their completed payments; returns the drift list.
+
+    The repair locks the drifted rows and recomputes their payment sums
+    under the lock before writing absolute totals, so an adjust_invoice()
+    committing between the scan and the write cannot be overwritten.
+    """
+    drift = list(find_drift(queryset))
+    if fix and drift:
+        now = timezone.now()
+        with transaction.atomic():
+            locked = Invoice.objects.select_for_update().filter(pk__in=[pk for pk, *_ in drift]).order_by('pk')
+            stored = {pk: row for pk, *row in locked.values_list('pk', *INVOICE_FIELDS)}
+            drift = list(find_drift(Invoice.objects.filter(pk__in=stored)))
+            repaired = []
+            for pk, _, _, (amount_paid, balance, status) in drift:
+                repaired.append(Invoice(pk=pk, amount_paid=amount_paid, balance=balance, status=status, updated_at=now))
+            Invoice.objects.bulk_update(repaired, ['amount_paid', 'balance', 'status', 'updated_at'], batch_size=RECONCILE_BATCH_SIZE)
+            record_invoices(
+                [stored[invoice.pk] for invoice in repaired],
+                [(stored[invoice.pk][0], stored[invoice.pk][1], invoice.balance, invoice.status) for invoice in repaired],
+            )
+            _invalidate([student_id for _, student_id, _, _ in drift])
+    return drift
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from core.models import Term
+from finance.billing import generate_term_invoices
+
+
+class Command(BaseCommand):
+    help = 'Invoice every active student for a term from the fee structures of their class level'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', type=int, help='Term id (defaults to the current term)')
+        parser.add_argument('--due-date', help='Due date for the invoices (YYYY-MM-DD)')
+        parser.add_argument('--class-level', dest='class_levels', type=int, action='append', help='Only bill this class level id (repeatable)')
+        parser.add_argument('--chunk-size', type=int, help='Invoices per bulk insert (defaults to TERM_INVOICE_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        terms = Term.objects.select_related('session')
+        term = terms.filter(pk=options['term']).first() if options['term'] else terms.filter(is_current=True).first()
+        if term is None:
+            raise CommandError('Term not found; pass --term.')
+
+        due_date = None
+        if options['due_date']:
+            try:
+                due_date = parse_date(options['due_date'])
+            except ValueError:
+                pass
+            if due_date is None:
+                raise CommandError(f"Invalid --due-date '{options['due_date']}'; use YYYY-MM-DD.")
+
+        counts = generate_term_invoices(term, due_date, options['class_levels'], options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {counts['created']} invoice(s) for {term}; "
+            f"{counts['skipped']} already invoiced, {counts['unbilled']} without a fee structure."
+        ))
@@ -0,0 +1,40 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from finance import paystack
+
+
+class Command(BaseCommand):
+    help = 'Drive initialize + verify round trips through the pooled Paystack client and report latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Number of initialize/verify round trips')
+        parser.add_argument('--concurrency', type=int, default=10)
+
+    def _round_trip(self, _):
+        reference = f'BENCH{uuid.uuid4().hex[:12].upper()}'
+        try:
+            paystack.initialize_transaction('bench@school.edu', 10000, reference, 'http://localhost/callback/')
+            paystack.verify_transaction(reference)
+        except paystack.PaystackError:
+            return False
+        return True
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Benchmarking {settings.PAYSTACK_BASE_URL}')
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(self._round_trip, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        for endpoint, stats in sorted(paystack.request_stats().items()):
+            self.stdout.write(
+                f"{endpoint}: {stats['calls']} calls, {stats['errors']} errors, "
+                f"avg {stats['avg_ms']:.1f}ms, max {stats['max_ms']:.1f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{results.count(True)}/{len(results)} round trips succeeded in {elapsed:.2f}s '
+            f'({len(results) / elapsed:.1f}/s)'
+        ))
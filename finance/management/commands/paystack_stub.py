@@ -0,0 +1,105 @@
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import urlencode
+from django.core.management.base import BaseCommand
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /transaction/initialize and /transaction/verify/<reference> like Paystack's test mode"""
+
+    protocol_version = 'HTTP/1.1'
+    transactions = {}
+    lock = Lock()
+    latency = 0.0
+    fail_rate = 0.0
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return random.random() < self.fail_rate
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self._delay():
+            return self._reply(503, {'status': False, 'message': 'Stub failure'})
+        if self.path != '/transaction/initialize':
+            return self._reply(404, {'status': False, 'message': 'Not found'})
+
+        reference = body.get('reference') or uuid.uuid4().hex
+        with self.lock:
+            if reference in self.transactions:
+                return self._reply(400, {'status': False, 'message': 'Duplicate Transaction Reference'})
+            self.transactions[reference] = body
+
+        # Skip the checkout page: send the browser straight back to the callback.
+        query = urlencode({'trxref': reference, 'reference': reference})
+        callback = body.get('callback_url', '')
+        self._reply(200, {
+            'status': True,
+            'message': 'Authorization URL created',
+            'data': {
+                'authorization_url': f"{callback}{'&' if '?' in callback else '?'}{query}",
+                'access_code': f'stub_{uuid.uuid4().hex[:12]}',
+                'reference': reference,
+            },
+        })
+
+    def do_GET(self):
+        if self._delay():
+            return self._reply(503, {'status': False, 'message': 'Stub failure'})
+        prefix = '/transaction/verify/'
+        reference = self.path[len(prefix):] if self.path.startswith(prefix) else None
+        with self.lock:
+            transaction = self.transactions.get(reference)
+        if transaction is None:
+            return self._reply(400, {'status': False, 'message': 'Transaction reference not found'})
+        self._reply(200, {
+            'status': True,
+            'message': 'Verification successful',
+            'data': {
+                'status': 'success',
+                'reference': reference,
+                'amount': transaction.get('amount'),
+                'metadata': transaction.get('metadata'),
+            },
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Run a local Paystack stand-in for offline testing and load tests (point PAYSTACK_BASE_URL at it)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before every response')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503')
+
+    def handle(self, *args, **options):
+        StubHandler.latency = options['latency']
+        StubHandler.fail_rate = options['fail_rate']
+        server = ThreadingHTTPServer((options['host'], options['port']), StubHandler)
+        self.stdout.write(self.style.SUCCESS(
+            f"Paystack stub listening on http://{options['host']}:{options['port']} "
+            f"(set PAYSTACK_BASE_URL to this address)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from finance.webhooks import process_paystack_events
+
+
+class Command(BaseCommand):
+    help = 'Apply queued Paystack webhook events (run once from cron, or continuously with --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Events per transaction (defaults to PAYSTACK_EVENT_BATCH_SIZE)')
+        parser.add_argument('--interval', type=float, help='Keep polling the inbox every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            outcomes = process_paystack_events(options['batch_size'])
+            if outcomes or not options['interval']:
+                summary = ', '.join(f'{count} {status}' for status, count in sorted(outcomes.items())) or 'no events'
+                self.stdout.write(self.style.SUCCESS(f'Paystack events: {summary}.'))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
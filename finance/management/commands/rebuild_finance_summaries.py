@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from finance.rollup import rebuild_finance_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily finance rollup from invoices, payments and expenses'
+
+    def handle(self, *args, **options):
+        days = rebuild_finance_summaries()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt finance summaries for {days} day(s).'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from finance.ledger import reconcile_invoices
+
+
+class Command(BaseCommand):
+    help = 'Detect invoices whose amount paid, balance or status drifted from their completed payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Repair drifted invoices in bulk')
+        parser.add_argument('--verbose-rows', action='store_true', help='List every drifted invoice')
+
+    def handle(self, *args, **options):
+        drift = reconcile_invoices(fix=options['fix'])
+
+        if options['verbose_rows']:
+            for pk, _, stored, expected in drift:
+                self.stdout.write(f'Invoice {pk}: stored paid/balance/status {stored} expected {expected}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('All invoices reconcile with their payments.'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {len(drift)} invoice(s).'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} invoice(s) drifted; run with --fix to repair.'))
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:32
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_finance_summaries(apps, schema_editor):
+    Invoice = apps.get_model('finance', 'Invoice')
+    Payment = apps.get_model('finance', 'Payment')
+    Expense = apps.get_model('finance', 'Expense')
+    FinanceDailySummary = apps.get_model('finance', 'FinanceDailySummary')
+
+    summaries = {}
+
+    def summary(day):
+        if day not in summaries:
+            summaries[day] = FinanceDailySummary(date=day, collected_by_method={}, expenses_by_category={})
+        return summaries[day]
+
+    invoices = Invoice.objects.annotate(day=TruncDate('created_at')).values('day').annotate(
+        invoiced=Sum('total_amount'), outstanding=Sum('balance', filter=Q(status__in=['pending', 'partial'])),
+    )
+    for row in invoices:
+        summary(row['day']).invoiced = row['invoiced'] or 0
+        summary(row['day']).outstanding = row['outstanding'] or 0
+    payments = Payment.objects.filter(payment_status='completed').values('payment_date', 'payment_method').annotate(total=Sum('amount'), count=Count('id'))
+    for row in payments:
+        day = summary(row['payment_date'])
+        day.collected += row['total']
+        day.payments += row['count']
+        day.collected_by_method[row['payment_method']] = str(row['total'])
+    for row in Expense.objects.values('date', 'category').annotate(total=Sum('amount')):
+        day = summary(row['date'])
+        day.expenses += row['total']
+        day.expenses_by_category[row['category']] = str(row['total'])
+
+    FinanceDailySummary.objects.bulk_create(summaries.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_payment_payment_status_payment_paystack_access_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinanceDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('invoiced', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('collected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payments', models.IntegerField(default=0)),
+                ('collected_by_method', models.JSONField(blank=True, default=dict)),
+                ('expenses', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expenses_by_category', models.JSONField(blank=True, default=dict)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Finance daily summaries',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.RunPython(backfill_finance_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_search_backend'),
+        ('finance', '0003_finance_daily_summary'),
+        ('students', '0006_result_class_statistics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='finance_inv_status_3b281e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['created_at', 'id'], name='finance_inv_created_44100f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['student', 'session', 'term'], name='finance_inv_student_a24b29_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_status', 'payment_date', 'id'], name='finance_pay_payment_9322f9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_date', 'id'], name='finance_pay_payment_376d9a_idx'),
+        ),
+    ]
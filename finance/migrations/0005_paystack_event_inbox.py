@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_invoice_payment_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaystackEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=50)),
+                ('reference', models.CharField(max_length=100)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['paystack_reference'], name='finance_pay_paystac_bb014d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paystackevent',
+            index=models.Index(fields=['status', 'id'], name='finance_pay_status_b726d9_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='paystackevent',
+            unique_together={('event', 'reference')},
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:48
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def copy_breakdowns(apps, schema_editor):
+    FinanceDailySummary = apps.get_model('finance', 'FinanceDailySummary')
+    FinanceDailyBreakdown = apps.get_model('finance', 'FinanceDailyBreakdown')
+
+    rows = []
+    for summary in FinanceDailySummary.objects.iterator():
+        for kind in ('collected_by_method', 'expenses_by_category'):
+            for name, amount in getattr(summary, kind).items():
+                rows.append(FinanceDailyBreakdown(date=summary.date, kind=kind, name=name, amount=Decimal(amount)))
+    FinanceDailyBreakdown.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_paystack_event_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinanceDailyBreakdown',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('kind', models.CharField(choices=[('collected_by_method', 'Collected by method'), ('expenses_by_category', 'Expenses by category')], max_length=30)),
+                ('name', models.CharField(max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'unique_together': {('date', 'kind', 'name')},
+            },
+        ),
+        migrations.RunPython(copy_breakdowns, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='financedailysummary',
+            name='collected_by_method',
+        ),
+        migrations.RemoveField(
+            model_name='financedailysummary',
+            name='expenses_by_category',
+        ),
+    ]
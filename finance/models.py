@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from students.models import Student
 from core.models import ClassLevel, AcademicSession, Term
 
@@ -28,6 +28,17 @@ class FeeStructure(models.Model):
         return f"{self.category.name} - {self.class_level.name} - {self.amount}"
 
 
+def invoice_status(total_amount, amount_paid, status):
+    """Status an invoice should have for the amount paid against it"""
+    if status == 'cancelled':
+        return status
+    if total_amount - amount_paid <= 0:
+        return 'paid'
+    if amount_paid > 0:
+        return 'partial'
+    return 'pending'
+
+
 class Invoice(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -48,13 +59,24 @@ class Invoice(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['student', 'session', 'term']),
+        ]
+
     def save(self, *args, **kwargs):
+        from .rollup import INVOICE_FIELDS, record_invoices, rollup_row
+
         self.balance = self.total_amount - self.amount_paid
-        if self.balance <= 0:
-            self.status = 'paid'
-        elif self.amount_paid > 0:
-            self.status = 'partial'
-        super().save(*args, **kwargs)
+        self.status = invoice_status(self.total_amount, self.amount_paid, self.status)
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None and not self._state.adding:
+                previous = Invoice.objects.select_for_update().filter(pk=self.pk).values_list(*INVOICE_FIELDS).first()
+            super().save(*args, **kwargs)
+            record_invoices([previous], [rollup_row(self, INVOICE_FIELDS)])
 
     def __str__(self):
         return f"{self.invoice_number} - {self.student}"
@@ -98,12 +120,35 @@ class Payment(models.Model):
     received_by = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['payment_status', 'payment_date', 'id']),
+            models.Index(fields=['payment_date', 'id']),
+            models.Index(fields=['paystack_reference']),
+        ]
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        invoice = self.invoice
-        total_paid = invoice.payments.aggregate(total=models.Sum('amount'))['total'] or 0
-        invoice.amount_paid = total_paid
-        invoice.save()
+        from .ledger import apply_payment_change
+        from .rollup import PAYMENT_FIELDS, record_payments, rollup_row
+
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None and not self._state.adding:
+                previous = Payment.objects.select_for_update().filter(pk=self.pk).values_list(*PAYMENT_FIELDS).first()
+            super().save(*args, **kwargs)
+            apply_payment_change(previous, self)
+            record_payments([previous], [rollup_row(self, PAYMENT_FIELDS)])
+        if self._meta.get_field('invoice').is_cached(self):
+            self.invoice.refresh_from_db(fields=['amount_paid', 'balance', 'status', 'updated_at'])
+
+    def delete(self, *args, **kwargs):
+        from .ledger import apply_payment_change
+
+        with transaction.atomic():
+            previous = Payment.objects.select_for_update().filter(pk=self.pk).values_list('invoice_id', 'payment_status', 'amount').first()
+            result = super().delete(*args, **kwargs)
+            apply_payment_change(previous, None)
+        return result
 
     def __str__(self):
         return f"{self.receipt_number} - {self.amount}"
@@ -126,5 +171,83 @@ class Expense(models.Model):
     approved_by = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        from .rollup import EXPENSE_FIELDS, record_expenses, rollup_row
+
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None and not self._state.adding:
+                previous = Expense.objects.select_for_update().filter(pk=self.pk).values_list(*EXPENSE_FIELDS).first()
+            super().save(*args, **kwargs)
+            record_expenses([previous], [rollup_row(self, EXPENSE_FIELDS)])
+
     def __str__(self):
         return f"{self.title} - {self.amount}"
+
+
+class PaystackEvent(models.Model):
+    """A verified Paystack webhook delivery, stored once per (event, reference) and applied by a worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    event = models.CharField(max_length=50)
+    reference = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['event', 'reference']
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"{self.event} - {self.reference}"
+
+
+class FinanceDailySummary(models.Model):
+    """Per-day finance totals maintained on every invoice, payment and expense write.
+
+    Collections and expenses are booked on their payment/expense date;
+    invoiced and outstanding amounts on the day the invoice was raised, so
+    ``outstanding`` is the balance still open on that day's invoices.
+    """
+    date = models.DateField(unique=True)
+    invoiced = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payments = models.IntegerField(default=0)
+    expenses = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = "Finance daily summaries"
+
+    def __str__(self):
+        return f"{self.date} - {self.collected}"
+
+
+class FinanceDailyBreakdown(models.Model):
+    """One day's collections for a payment method, or expenses for a category, kept beside FinanceDailySummary"""
+    KIND_CHOICES = [
+        ('collected_by_method', 'Collected by method'),
+        ('expenses_by_category', 'Expenses by category'),
+    ]
+
+    date = models.DateField()
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    name = models.CharField(max_length=20)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ['date', 'kind', 'name']
+
+    def __str__(self):
+        return f"{self.date} - {self.name} - {self.amount}"
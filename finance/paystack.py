@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_stats = defaultdict(lambda: {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+_stats_lock = threading.Lock()
+
+
+class PaystackError(Exception):
+    """Paystack could not be reached or answered with a server error"""
+
+
+def get_session():
+    """The process-wide pooled Paystack session, created on first use.
+
+    Connections are kept alive and reused across requests. Connection
+    failures are retried with exponential backoff for every method, but
+    read timeouts and 5xx answers only for GET: a retried POST could
+    initialize the same transaction twice.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=settings.PAYSTACK_RETRIES,
+                    backoff_factor=settings.PAYSTACK_RETRY_BACKOFF,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset({'GET'}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.PAYSTACK_POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def _record(endpoint, elapsed_ms, failed):
+    with _stats_lock:
+        stats = _stats[endpoint]
+        stats['calls'] += 1
+        stats['errors'] += int(failed)
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+
+def request_stats():
+    """Per-endpoint call, error and latency figures for this process"""
+    with _stats_lock:
+        return {
+            endpoint: dict(stats, avg_ms=stats['total_ms'] / stats['calls'] if stats['calls'] else 0.0)
+            for endpoint, stats in _stats.items()
+        }
+
+
+def _request(endpoint, method, path, **kwargs):
+    url = f"{settings.PAYSTACK_BASE_URL.rstrip('/')}{path}"
+    headers = {'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}'}
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = get_session().request(
+            method, url, headers=headers,
+            timeout=(settings.PAYSTACK_CONNECT_TIMEOUT, settings.PAYSTACK_READ_TIMEOUT),
+            **kwargs,
+        )
+        if response.status_code >= 500:
+            raise PaystackError(f'Paystack returned HTTP {response.status_code}')
+        result = response.json()
+        failed = False
+        return result
+    except requests.JSONDecodeError as e:
+        # Also a RequestException, so it has to be caught first.
+        raise PaystackError('Paystack returned an invalid response') from e
+    except requests.RequestException as e:
+        raise PaystackError(f'Paystack request failed: {e}') from e
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _record(endpoint, elapsed_ms, failed)
+        logger.info('paystack %s %.1fms%s', endpoint, elapsed_ms, ' failed' if failed else '')
+
+
+def initialize_transaction(email, amount, reference, callback_url, metadata=None):
+    """Start a transaction for ``amount`` kobo; returns Paystack's JSON body (check ``status``)"""
+    payload = {
+        'email': email,
+        'amount': amount,
+        'reference': reference,
+        'callback_url': callback_url,
+        'metadata': metadata or {},
+    }
+    return _request('initialize', 'POST', '/transaction/initialize', json=payload)
+
+
+def verify_transaction(reference):
+    """Look up a transaction by reference; returns Paystack's JSON body (check ``status``)"""
+    return _request('verify', 'GET', f'/transaction/verify/{reference}')
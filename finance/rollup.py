@@ -0,0 +1,173 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Expense, FinanceDailyBreakdown, FinanceDailySummary, Invoice, Payment
+
+OPEN_STATUSES = ('pending', 'partial')
+COLLECTED_STATUS = 'completed'
+
+INVOICE_FIELDS = ('created_at', 'total_amount', 'balance', 'status')
+PAYMENT_FIELDS = ('invoice_id', 'payment_status', 'amount', 'payment_date', 'payment_method')
+EXPENSE_FIELDS = ('date', 'category', 'amount')
+
+TOTAL_FIELDS = ('invoiced', 'collected', 'expenses', 'outstanding')
+
+
+def rollup_row(instance, fields):
+    """The ``fields`` of an unsaved or saved instance, coerced the way the database stores them"""
+    opts = instance._meta
+    return tuple(opts.get_field(name).to_python(getattr(instance, name)) for name in fields)
+
+
+def _day(value):
+    return timezone.localdate(value) if isinstance(value, datetime) else value
+
+
+def _invoice_delta(row):
+    created_at, total_amount, balance, status = row
+    outstanding = balance if status in OPEN_STATUSES else 0
+    return _day(created_at), {'invoiced': total_amount, 'outstanding': outstanding}
+
+
+def _payment_delta(row):
+    _, status, amount, payment_date, method = row
+    if status != COLLECTED_STATUS:
+        return payment_date, {}
+    return payment_date, {'collected': amount, 'payments': 1, ('collected_by_method', method): amount}
+
+
+def _expense_delta(row):
+    day, category, amount = row
+    return day, {'expenses': amount, ('expenses_by_category', category): amount}
+
+
+def _apply(totals, parts):
+    days = sorted(totals)
+    FinanceDailySummary.objects.bulk_create([FinanceDailySummary(date=day) for day in days], ignore_conflicts=True)
+    now = timezone.now()
+    for day in days:
+        FinanceDailySummary.objects.filter(date=day).update(
+            **{key: F(key) + value for key, value in totals[day].items()}, updated_at=now,
+        )
+
+    keys = sorted(parts)
+    FinanceDailyBreakdown.objects.bulk_create(
+        [FinanceDailyBreakdown(date=day, kind=kind, name=name) for day, kind, name in keys], ignore_conflicts=True,
+    )
+    for day, kind, name in keys:
+        FinanceDailyBreakdown.objects.filter(date=day, kind=kind, name=name).update(amount=F('amount') + parts[day, kind, name])
+
+
+def _record(delta_for, removed, added):
+    """Sum the signed deltas of ``removed`` and ``added`` rows and post them to the rollup.
+
+    Missing rows are created first with ignore_conflicts, then each delta
+    is one F() update, taken in sorted day (and kind, name) order so
+    concurrent writers lock rows in the same order.
+    """
+    totals = defaultdict(Counter)
+    parts = Counter()
+    for rows, sign in ((removed, -1), (added, 1)):
+        for row in rows:
+            if row is None:
+                continue
+            day, delta = delta_for(row)
+            for key, value in delta.items():
+                if isinstance(key, tuple):  # (kind, name) of a FinanceDailyBreakdown row
+                    parts[(day, *key)] += sign * value
+                else:
+                    totals[day][key] += sign * value
+
+    totals = {day: {key: value for key, value in delta.items() if value} for day, delta in totals.items()}
+    totals = {day: delta for day, delta in totals.items() if delta}
+    parts = {key: value for key, value in parts.items() if value}
+    if totals or parts:
+        with transaction.atomic():
+            _apply(totals, parts)
+
+
+def record_invoices(removed=(), added=()):
+    """Move invoice rows (``INVOICE_FIELDS`` tuples) out of and into the daily rollup"""
+    _record(_invoice_delta, removed, added)
+
+
+def record_payments(removed=(), added=()):
+    """Move payment rows (``PAYMENT_FIELDS`` tuples) out of and into the daily rollup"""
+    _record(_payment_delta, removed, added)
+
+
+def record_expenses(removed=(), added=()):
+    """Move expense rows (``EXPENSE_FIELDS`` tuples) out of and into the daily rollup"""
+    _record(_expense_delta, removed, added)
+
+
+def _summary(summaries, day):
+    if day not in summaries:
+        summaries[day] = FinanceDailySummary(date=day)
+    return summaries[day]
+
+
+@transaction.atomic
+def rebuild_finance_summaries():
+    """Recompute every daily summary and breakdown from the transaction tables; returns the number of days"""
+    summaries = {}
+    parts = []
+
+    invoices = (
+        Invoice.objects.annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(invoiced=Sum('total_amount'), outstanding=Sum('balance', filter=Q(status__in=OPEN_STATUSES)))
+    )
+    for row in invoices:
+        summary = _summary(summaries, row['day'])
+        summary.invoiced = row['invoiced'] or 0
+        summary.outstanding = row['outstanding'] or 0
+
+    payments = (
+        Payment.objects.filter(payment_status=COLLECTED_STATUS)
+        .values('payment_date', 'payment_method')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    for row in payments:
+        summary = _summary(summaries, row['payment_date'])
+        summary.collected += row['total']
+        summary.payments += row['count']
+        parts.append(FinanceDailyBreakdown(date=row['payment_date'], kind='collected_by_method', name=row['payment_method'], amount=row['total']))
+
+    expenses = Expense.objects.values('date', 'category').annotate(total=Sum('amount'))
+    for row in expenses:
+        summary = _summary(summaries, row['date'])
+        summary.expenses += row['total']
+        parts.append(FinanceDailyBreakdown(date=row['date'], kind='expenses_by_category', name=row['category'], amount=row['total']))
+
+    FinanceDailySummary.objects.all().delete()
+    FinanceDailySummary.objects.bulk_create(summaries.values(), batch_size=500)
+    FinanceDailyBreakdown.objects.all().delete()
+    FinanceDailyBreakdown.objects.bulk_create(parts, batch_size=500)
+    return len(summaries)
+
+
+def finance_totals(start=None, end=None):
+    """Invoiced, collected, expense and outstanding totals summed over the daily rollup"""
+    summaries = FinanceDailySummary.objects.all()
+    if start:
+        summaries = summaries.filter(date__gte=start)
+    if end:
+        summaries = summaries.filter(date__lte=end)
+    totals = summaries.aggregate(**{name: Sum(name) for name in TOTAL_FIELDS})
+    return {name: totals[name] or Decimal(0) for name in TOTAL_FIELDS}
+
+
+def breakdown(kind, start=None, end=None):
+    """Totals per name for a breakdown ``kind`` (``collected_by_method`` or ``expenses_by_category``), largest first"""
+    parts = FinanceDailyBreakdown.objects.filter(kind=kind)
+    if start:
+        parts = parts.filter(date__gte=start)
+    if end:
+        parts = parts.filter(date__lte=end)
+    totals = parts.values('name').annotate(total=Sum('amount')).exclude(total=0).order_by('-total', 'name')
+    return {row['name']: row['total'] for row in totals}
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import Expense, Invoice, Payment
+from .rollup import EXPENSE_FIELDS, INVOICE_FIELDS, PAYMENT_FIELDS, record_expenses, record_invoices, record_payments, rollup_row
+
+
+@receiver(post_delete, sender=Invoice)
+def remove_invoice_from_rollup(sender, instance, **kwargs):
+    record_invoices(removed=[rollup_row(instance, INVOICE_FIELDS)])
+
+
+@receiver(post_delete, sender=Payment)
+def remove_payment_from_rollup(sender, instance, **kwargs):
+    record_payments(removed=[rollup_row(instance, PAYMENT_FIELDS)])
+
+
+@receiver(post_delete, sender=Expense)
+def remove_expense_from_rollup(sender, instance, **kwargs):
+    record_expenses(removed=[rollup_row(instance, EXPENSE_FIELDS)])
@@ -1,3 +1,383 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import io
+import json
+import threading
+from datetime import date, timedelta
+from http.server import ThreadingHTTPServer
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from urllib3.exceptions import NewConnectionError, ReadTimeoutError
+from core.models import AcademicSession, ClassLevel, ClassRoom, SearchEntry, Term
+from students.models import Student
+from . import paystack
+from .billing import fee_schedule, generate_term_invoices
+from .ledger import find_drift, reconcile_invoices, set_payment_status
+from .management.commands.paystack_stub import StubHandler
+from .rollup import breakdown, finance_totals, rebuild_finance_summaries
+from .models import Expense, FeeCategory, FeeStructure, FinanceDailyBreakdown, FinanceDailySummary, Invoice, Payment, PaystackEvent
+from .webhooks import process_paystack_events, valid_signature
 
-# Create your tests here.
+
+class FinanceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.session = AcademicSession.objects.create(name='2025/2026', start_date=date(2025, 9, 1), end_date=date(2026, 7, 31), is_current=True)
+        cls.term = Term.objects.create(name='First', session=cls.session, start_date=date(2025, 9, 1), end_date=date(2025, 12, 15), is_current=True)
+        cls.level = ClassLevel.objects.create(name='JSS1', order=1)
+        cls.classroom = ClassRoom.objects.create(name='A', class_level=cls.level)
+        cls.students = [
+            Student.objects.create(
+                admission_number=f'ADM{i:03d}', first_name=f'First{i}', last_name=f'Last{i}', gender='M',
+                date_of_birth=date(2012, 1, 1), admission_date=date(2024, 9, 1), current_class=cls.classroom,
+            )
+            for i in range(3)
+        ]
+        cls.user = User.objects.create_superuser('bursar', 'bursar@school.edu', 'password')
+
+    def make_invoice(self, number, total=100, student=None, **kwargs):
+        return Invoice.objects.create(
+            invoice_number=number, student=student or self.students[0], session=self.session, term=self.term,
+            total_amount=total, **kwargs,
+        )
+
+
+@override_settings(INVOICE_LIST_PAGE_SIZE=4)
+class InvoiceListPaginationTests(FinanceTestCase):
+    def test_walks_every_invoice_once(self):
+        invoices = [self.make_invoice(f'INV{i:03d}') for i in range(11)]
+        # Several invoices share one millisecond, which a truncated cursor used to skip.
+        moment = timezone.now().replace(microsecond=500100)
+        for offset, invoice in enumerate(invoices[:6]):
+            Invoice.objects.filter(pk=invoice.pk).update(created_at=moment + timedelta(microseconds=offset * 100))
+
+        self.client.force_login(self.user)
+        seen = []
+        url = '/finance/invoices/'
+        while url:
+            response = self.client.get(url)
+            seen.extend(invoice.pk for invoice in response.context['invoices'])
+            cursor = response.context['next_cursor']
+            url = f'/finance/invoices/?cursor={cursor}' if cursor else None
+
+        self.assertEqual(len(seen), len(invoices))
+        self.assertEqual(set(seen), {invoice.pk for invoice in invoices})
+
+
+class LedgerTests(FinanceTestCase):
+    def test_payments_move_invoice_totals(self):
+        invoice = self.make_invoice('INV001')
+        payment = Payment.objects.create(receipt_number='R1', invoice=invoice, amount='30', payment_date=date.today())
+        pending = Payment.objects.create(receipt_number='R2', invoice=invoice, amount=70, payment_date=date.today(), payment_status='pending')
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.amount_paid, invoice.balance, invoice.status), (30, 70, 'partial'))
+
+        self.assertIsNotNone(set_payment_status(pending.pk, 'completed'))
+        self.assertIsNone(set_payment_status(pending.pk, 'completed'))
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.amount_paid, invoice.balance, invoice.status), (100, 0, 'paid'))
+
+        payment.delete()
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.amount_paid, invoice.balance, invoice.status), (70, 30, 'partial'))
+
+    def test_reconcile_repairs_drift(self):
+        invoice = self.make_invoice('INV001')
+        Payment.objects.create(receipt_number='R1', invoice=invoice, amount=40, payment_date=date.today())
+        Invoice.objects.filter(pk=invoice.pk).update(amount_paid=90, balance=10, status='partial')
+
+        self.assertEqual(len(reconcile_invoices()), 1)
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.amount_paid, 90)
+
+        drift = reconcile_invoices(fix=True)
+        self.assertEqual([pk for pk, *_ in drift], [invoice.pk])
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.amount_paid, invoice.balance, invoice.status), (40, 60, 'partial'))
+        self.assertEqual(reconcile_invoices(), [])
+
+    def test_reconcile_recomputes_under_lock(self):
+        invoice = self.make_invoice('INV001')
+        Invoice.objects.filter(pk=invoice.pk).update(amount_paid=90, balance=10, status='partial')
+        scanned = list(find_drift())
+        # A payment lands between the unlocked scan and the repair.
+        Payment.objects.create(receipt_number='R1', invoice=invoice, amount=90, payment_date=date.today())
+        Invoice.objects.filter(pk=invoice.pk).update(amount_paid=90, balance=10, status='partial')
+
+        with mock.patch('finance.ledger.find_drift', side_effect=[iter(scanned), find_drift(Invoice.objects.filter(pk=invoice.pk))]):
+            reconcile_invoices(fix=True)
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.amount_paid, invoice.balance, invoice.status), (90, 10, 'partial'))
+
+
+class TermBillingTests(FinanceTestCase):
+    def setUp(self):
+        tuition = FeeCategory.objects.create(name='Tuition')
+        books = FeeCategory.objects.create(name='Books')
+        FeeStructure.objects.create(category=tuition, class_level=self.level, session=self.session, amount=100)
+        FeeStructure.objects.create(category=tuition, class_level=self.level, session=self.session, term=self.term, amount=150)
+        FeeStructure.objects.create(category=books, class_level=self.level, session=self.session, amount=20)
+
+    def test_term_fees_override_session_fees(self):
+        self.assertEqual(sorted(amount for _, amount, _ in fee_schedule(self.term)[self.level.pk]), [20, 150])
+
+    def test_generation_is_idempotent(self):
+        self.make_invoice('EXISTING', student=self.students[0])
+        self.assertEqual(generate_term_invoices(self.term), {'created': 2, 'skipped': 1, 'unbilled': 0})
+        self.assertEqual(generate_term_invoices(self.term), {'created': 0, 'skipped': 3, 'unbilled': 0})
+
+        invoice = Invoice.objects.get(student=self.students[1], term=self.term)
+        self.assertEqual((invoice.total_amount, invoice.balance, invoice.status), (170, 170, 'pending'))
+        self.assertEqual(invoice.items.count(), 2)
+        self.assertTrue(SearchEntry.objects.filter(kind='invoice', object_id=invoice.pk).exists())
+
+    def test_command_validates_due_date(self):
+        with self.assertRaisesMessage(CommandError, "Invalid --due-date '31/12/2025'"):
+            call_command('generate_term_invoices', term=self.term.pk, due_date='31/12/2025', stdout=io.StringIO())
+        self.assertFalse(Invoice.objects.exists())
+
+        call_command('generate_term_invoices', term=self.term.pk, due_date='2025-12-31', stdout=io.StringIO())
+        self.assertEqual(set(Invoice.objects.values_list('due_date', flat=True)), {date(2025, 12, 31)})
+
+    def test_view_rejects_malformed_input(self):
+        self.client.force_login(self.user)
+        response = self.client.post('/finance/invoices/generate/', {'term': 'abc'})
+        self.assertRedirects(response, '/finance/invoices/generate/', fetch_redirect_response=False)
+        response = self.client.post('/finance/invoices/generate/', {'term': self.term.pk, 'due_date': '31/12/2025'})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post('/finance/invoices/generate/', {'term': self.term.pk, 'class_levels': ['x']})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Invoice.objects.exists())
+
+        response = self.client.post('/finance/invoices/generate/', {'term': self.term.pk, 'due_date': '2025-12-31'})
+        self.assertRedirects(response, '/finance/invoices/', fetch_redirect_response=False)
+        self.assertEqual(set(Invoice.objects.values_list('due_date', flat=True)), {date(2025, 12, 31)})
+
+
+class RevenueSeriesApiTests(FinanceTestCase):
+    def test_series_and_bad_filters(self):
+        invoice = self.make_invoice('INV001')
+        Payment.objects.create(receipt_number='R1', invoice=invoice, amount=60, payment_date=date(2025, 10, 3))
+        self.client.force_login(self.user)
+
+        response = self.client.get('/finance/revenue/series/', {'period': 'month', 'session': self.session.pk})
+        self.assertEqual(response.json()['series'], [{'period': '2025-10-01', 'total': 60.0, 'count': 1}])
+        self.assertEqual(self.client.get('/finance/revenue/series/', {'period': 'decade'}).status_code, 400)
+        self.assertEqual(self.client.get('/finance/revenue/series/', {'session': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get('/finance/revenue/series/', {'term': '1.5'}).status_code, 400)
+
+
+class InvoiceDateFilterTests(FinanceTestCase):
+    def test_list_and_export_agree_on_date_range(self):
+        old = self.make_invoice('INVOLD')
+        self.make_invoice('INVNEW')
+        Invoice.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        today = timezone.localdate().isoformat()
+        self.client.force_login(self.user)
+
+        response = self.client.get('/finance/invoices/', {'start_date': today, 'end_date': today})
+        self.assertEqual([invoice.invoice_number for invoice in response.context['invoices']], ['INVNEW'])
+        self.assertContains(response, f'start_date={today}&end_date={today}')
+
+        response = self.client.get('/dashboard/exports/invoices/', {'start_date': today, 'end_date': today})
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(rows[1].startswith('INVNEW,'))
+
+
+class RollupTests(FinanceTestCase):
+    def snapshot(self):
+        summaries = {
+            row[0]: row[1:]
+            for row in FinanceDailySummary.objects.values_list('date', 'invoiced', 'collected', 'payments', 'expenses', 'outstanding')
+            if any(row[1:])
+        }
+        parts = set(FinanceDailyBreakdown.objects.exclude(amount=0).values_list('date', 'kind', 'name', 'amount'))
+        return summaries, parts
+
+    def test_incremental_rollup_matches_rebuild(self):
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        first = self.make_invoice('INV001', total=100)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() - timedelta(days=1)):
+            second = self.make_invoice('INV002', total=250, student=self.students[1])
+
+        Payment.objects.create(receipt_number='R1', invoice=first, amount=40, payment_date=today)
+        moved = Payment.objects.create(receipt_number='R2', invoice=second, amount=50, payment_date=today, payment_method='card')
+        moved.payment_date = yesterday
+        moved.payment_method = 'bank_transfer'
+        moved.save()
+        Payment.objects.create(receipt_number='R3', invoice=second, amount=25, payment_date=today, payment_status='pending')
+        Payment.objects.create(receipt_number='R4', invoice=first, amount=10, payment_date=today).delete()
+
+        Expense.objects.create(title='Chalk', category='supplies', amount=30, date=today)
+        Expense.objects.create(title='Power', category='utilities', amount=80, date=yesterday)
+        Expense.objects.create(title='Paint', category='maintenance', amount=15, date=today).delete()
+        first.status = 'cancelled'
+        first.save()
+
+        self.assertEqual(finance_totals(), {'invoiced': 350, 'collected': 90, 'expenses': 110, 'outstanding': 200})
+        self.assertEqual(breakdown('collected_by_method'), {'bank_transfer': 50, 'cash': 40})
+        self.assertEqual(breakdown('expenses_by_category', start=today), {'supplies': 30})
+
+        incremental = self.snapshot()
+        self.assertEqual(rebuild_finance_summaries(), 2)
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_dashboard_labels_breakdowns(self):
+        invoice = self.make_invoice('INV001')
+        Payment.objects.create(receipt_number='R1', invoice=invoice, amount=60, payment_date=date.today(), payment_method='bank_transfer')
+        Expense.objects.create(title='Chalk', category='supplies', amount=30, date=date.today())
+
+        self.client.force_login(self.user)
+        response = self.client.get('/finance/')
+        self.assertEqual(response.context['collected_by_method'], {'Bank Transfer': 60})
+        self.assertEqual(response.context['expenses_by_category'], {'Supplies': 30})
+
+
+@override_settings(PAYSTACK_SECRET_KEY='sk_test', BACKGROUND_TASKS_EAGER=True)
+class PaystackWebhookTests(FinanceTestCase):
+    url = '/finance/paystack/webhook/'
+
+    def setUp(self):
+        self.invoice = self.make_invoice('INV001')
+        self.payment = Payment.objects.create(
+            receipt_number='R1', invoice=self.invoice, amount=100, payment_date=date.today(),
+            payment_method='paystack', payment_status='pending', paystack_reference='PSK-1',
+        )
+
+    def deliver(self, payload, signature=None):
+        body = json.dumps(payload).encode()
+        if signature is None:
+            signature = hmac.new(b'sk_test', body, hashlib.sha512).hexdigest()
+        return self.client.post(self.url, body, content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=signature)
+
+    def test_rejects_bad_signature_and_get(self):
+        self.assertEqual(self.deliver({'event': 'charge.success'}, signature='bad').status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertFalse(PaystackEvent.objects.exists())
+        with self.settings(PAYSTACK_SECRET_KEY=''):
+            self.assertFalse(valid_signature(b'{}', hmac.new(b'', b'{}', hashlib.sha512).hexdigest()))
+
+    def test_duplicate_deliveries_credit_once(self):
+        payload = {'event': 'charge.success', 'data': {'reference': 'PSK-1', 'amount': 10000}}
+        for _ in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.deliver(payload).status_code, 200)
+
+        event = PaystackEvent.objects.get()
+        self.assertEqual((event.event, event.reference, event.status, event.attempts), ('charge.success', 'PSK-1', 'processed', 1))
+        self.invoice.refresh_from_db()
+        self.assertEqual((self.invoice.amount_paid, self.invoice.status), (100, 'paid'))
+        self.assertEqual(process_paystack_events(), {})
+
+    def test_unknown_events_and_references_are_ignored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.deliver({'event': 'transfer.success', 'data': {'reference': 'TRF-1'}})
+            self.deliver({'event': 'charge.success', 'data': {'reference': 'PSK-404'}})
+
+        self.assertEqual(
+            dict(PaystackEvent.objects.values_list('reference', 'status')),
+            {'TRF-1': 'ignored', 'PSK-404': 'ignored'},
+        )
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.payment_status, 'pending')
+
+
+class PaystackClientTests(SimpleTestCase):
+    """The pooled client against the paystack_stub server on an ephemeral port"""
+
+    def start_stub(self, **attrs):
+        requests_seen = []
+
+        class Handler(StubHandler):
+            transactions = {}
+            lock = threading.Lock()
+
+            def _delay(self):
+                requests_seen.append((self.command, self.path))
+                return super()._delay()
+
+        for name, value in attrs.items():
+            setattr(Handler, name, value)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.enterContext(override_settings(
+            PAYSTACK_BASE_URL=f'http://127.0.0.1:{server.server_port}',
+            PAYSTACK_RETRIES=2, PAYSTACK_RETRY_BACKOFF=0, PAYSTACK_READ_TIMEOUT=0.5,
+        ))
+        return requests_seen
+
+    def setUp(self):
+        self.reset_client()
+        self.addCleanup(self.reset_client)
+
+    def reset_client(self):
+        paystack._session = None
+        paystack._stats.clear()
+
+    def test_round_trip_and_stats(self):
+        seen = self.start_stub()
+        response = paystack.initialize_transaction('a@school.edu', 10000, 'REF1', 'http://localhost/callback/')
+        self.assertTrue(response['status'])
+        self.assertEqual(paystack.verify_transaction('REF1')['data']['amount'], 10000)
+        self.assertFalse(paystack.verify_transaction('MISSING')['status'])
+
+        self.assertEqual(seen, [('POST', '/transaction/initialize'), ('GET', '/transaction/verify/REF1'), ('GET', '/transaction/verify/MISSING')])
+        stats = paystack.request_stats()
+        self.assertEqual((stats['initialize']['calls'], stats['initialize']['errors']), (1, 0))
+        self.assertEqual((stats['verify']['calls'], stats['verify']['errors']), (2, 0))
+        self.assertEqual(stats['verify']['avg_ms'], stats['verify']['total_ms'] / 2)
+        self.assertGreaterEqual(stats['verify']['max_ms'], stats['verify']['avg_ms'])
+
+    def test_server_errors_retry_get_only(self):
+        seen = self.start_stub(fail_rate=1.0)
+        with self.assertRaises(paystack.PaystackError):
+            paystack.initialize_transaction('a@school.edu', 10000, 'REF1', 'http://localhost/callback/')
+        with self.assertRaises(paystack.PaystackError):
+            paystack.verify_transaction('REF1')
+
+        self.assertEqual([method for method, _ in seen], ['POST', 'GET', 'GET', 'GET'])
+        stats = paystack.request_stats()
+        self.assertEqual((stats['initialize']['calls'], stats['initialize']['errors']), (1, 1))
+        self.assertEqual((stats['verify']['calls'], stats['verify']['errors']), (1, 1))
+
+    def test_read_timeouts_retry_get_only(self):
+        seen = self.start_stub(latency=1.0)
+        with self.assertRaises(paystack.PaystackError):
+            paystack.initialize_transaction('a@school.edu', 10000, 'REF1', 'http://localhost/callback/')
+        with self.assertRaises(paystack.PaystackError):
+            paystack.verify_transaction('REF1')
+        self.assertEqual([method for method, _ in seen], ['POST', 'GET', 'GET', 'GET'])
+
+    def test_connect_errors_retry_every_method(self):
+        retry = paystack.get_session().get_adapter('https://api.paystack.co').max_retries
+        refused = NewConnectionError(None, 'Connection refused')
+        self.assertEqual(retry.increment('POST', '/transaction/initialize', error=refused).total, retry.total - 1)
+        with self.assertRaises(ReadTimeoutError):
+            retry.increment('POST', '/transaction/initialize', error=ReadTimeoutError(None, '/transaction/initialize', 'timed out'))
+        self.assertEqual(retry.increment('GET', '/transaction/verify/REF1', error=ReadTimeoutError(None, '/', 'timed out')).total, retry.total - 1)
+
+    def test_non_json_body_raises(self):
+        class HtmlHandler(StubHandler):
+            def do_GET(self):
+                body = b'<html>Bad gateway</html>'
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), HtmlHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with override_settings(PAYSTACK_BASE_URL=f'http://127.0.0.1:{server.server_port}'):
+            with self.assertRaisesMessage(paystack.PaystackError, 'invalid response'):
+                paystack.verify_transaction('REF1')
+        self.assertEqual(paystack.request_stats()['verify']['errors'], 1)
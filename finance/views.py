@@ -1,42 +1,68 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
-from django.db.models import Sum, Count, Q
-from datetime import date
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import date, datetime, time, timedelta
 from .models import FeeCategory, FeeStructure, Invoice, InvoiceItem, Payment, Expense
+from . import paystack, webhooks
+from .analytics import PERIOD_FUNCTIONS, revenue_series
+from .billing import fee_schedule, generate_term_invoices
+from .ledger import set_payment_status
+from .rollup import breakdown, finance_totals
 from students.models import Student
 from core.models import ClassLevel, AcademicSession, Term
+from core import search
+from core.pagination import InvalidCursor, get_page_size, keyset_page
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
 from reportlab.lib import colors
 import io
+import json
 import uuid
 
 
 @login_required
 def finance_dashboard(request):
-    total_invoiced = Invoice.objects.aggregate(total=Sum('total_amount'))['total'] or 0
-    total_collected = Payment.objects.aggregate(total=Sum('amount'))['total'] or 0
-    total_pending = Invoice.objects.filter(status__in=['pending', 'partial']).aggregate(total=Sum('balance'))['total'] or 0
-    total_expenses = Expense.objects.aggregate(total=Sum('amount'))['total'] or 0
+    totals = finance_totals()
     
     recent_payments = Payment.objects.select_related('invoice__student').order_by('-created_at')[:10]
     pending_invoices = Invoice.objects.filter(status__in=['pending', 'partial']).select_related('student')[:10]
     
     context = {
-        'total_invoiced': total_invoiced,
-        'total_collected': total_collected,
-        'total_pending': total_pending,
-        'total_expenses': total_expenses,
-        'net_income': total_collected - total_expenses,
+        'total_invoiced': totals['invoiced'],
+        'total_collected': totals['collected'],
+        'total_pending': totals['outstanding'],
+        'total_expenses': totals['expenses'],
+        'net_income': totals['collected'] - totals['expenses'],
+        'collected_by_method': {dict(Payment.PAYMENT_METHODS).get(method, method): amount for method, amount in breakdown('collected_by_method').items()},
+        'expenses_by_category': {dict(Expense.CATEGORY_CHOICES).get(category, category): amount for category, amount in breakdown('expenses_by_category').items()},
         'recent_payments': recent_payments,
         'pending_invoices': pending_invoices,
     }
     return render(request, 'finance/dashboard.html', context)
 
 
+@login_required
+def revenue_series_api(request):
+    period = request.GET.get('period', 'month')
+    if period not in PERIOD_FUNCTIONS:
+        return JsonResponse({'status': 'error', 'message': f"Unknown period '{period}'"}, status=400)
+
+    try:
+        series = revenue_series(period, request.GET.get('session'), request.GET.get('term'))
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    return JsonResponse({'period': period, 'series': series})
+
+
 @login_required
 def fee_category_list(request):
     categories = FeeCategory.objects.all()
@@ -77,28 +103,108 @@ def fee_structure_list(request):
     return render(request, 'finance/fee_structures.html', context)
 
 
+INVOICE_LIST_ORDERING = ['-created_at', '-id']
+INVOICE_LIST_FIELDS = [
+    'id', 'invoice_number', 'total_amount', 'amount_paid', 'balance', 'status', 'created_at',
+    'student__first_name', 'student__last_name',
+]
+
+PAYMENT_LIST_ORDERING = ['-payment_date', '-id']
+PAYMENT_LIST_FIELDS = [
+    'id', 'receipt_number', 'amount', 'payment_method', 'payment_status', 'payment_date',
+    'invoice__invoice_number', 'invoice__student__first_name', 'invoice__student__last_name',
+]
+
+
+def _period(request):
+    """Parsed ``start_date``/``end_date`` query parameters; invalid dates are ignored"""
+    bounds = []
+    for param in ('start_date', 'end_date'):
+        try:
+            bounds.append(parse_date(request.GET.get(param, '')))
+        except ValueError:
+            bounds.append(None)
+    return bounds
+
+
+def _paginate(request, queryset, ordering, page_size):
+    cursor = request.GET.get('cursor')
+    try:
+        return keyset_page(queryset, ordering, cursor, page_size)
+    except InvalidCursor:
+        return keyset_page(queryset, ordering, None, page_size)
+
+
 @login_required
 def invoice_list(request):
     query = request.GET.get('q', '')
     status_filter = request.GET.get('status', '')
+    start_date, end_date = _period(request)
     
-    invoices = Invoice.objects.select_related('student').all()
+    invoices = Invoice.objects.select_related('student').only(*INVOICE_LIST_FIELDS)
     
     if query:
-        invoices = invoices.filter(
-            Q(invoice_number__icontains=query) |
-            Q(student__first_name__icontains=query) |
-            Q(student__last_name__icontains=query)
-        )
+        invoices = search.filter_queryset(invoices, 'invoice', query)
     if status_filter:
         invoices = invoices.filter(status=status_filter)
+    # Compare against datetime bounds rather than created_at__date so the (status, created_at) index stays usable
+    if start_date:
+        invoices = invoices.filter(created_at__gte=timezone.make_aware(datetime.combine(start_date, time.min)))
+    if end_date:
+        invoices = invoices.filter(created_at__lt=timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min)))
     
-    invoices = invoices.order_by('-created_at')
+    page_size = get_page_size(request, settings.INVOICE_LIST_PAGE_SIZE)
+    invoices, next_cursor = _paginate(request, invoices, INVOICE_LIST_ORDERING, page_size)
     
     return render(request, 'finance/invoice_list.html', {
         'invoices': invoices,
         'query': query,
         'status_filter': status_filter,
+        'start_date': start_date,
+        'end_date': end_date,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+    })
+
+
+@login_required
+def payment_list(request):
+    query = request.GET.get('q', '')
+    status_filter = request.GET.get('status', '')
+    method_filter = request.GET.get('method', '')
+    invoice_filter = request.GET.get('invoice', '')
+    start_date, end_date = _period(request)
+    
+    payments = Payment.objects.select_related('invoice__student').only(*PAYMENT_LIST_FIELDS)
+    
+    if query:
+        payments = payments.filter(Q(receipt_number__istartswith=query) | Q(paystack_reference=query))
+    if status_filter:
+        payments = payments.filter(payment_status=status_filter)
+    if method_filter:
+        payments = payments.filter(payment_method=method_filter)
+    if invoice_filter.isdigit():
+        payments = payments.filter(invoice_id=invoice_filter)
+    if start_date:
+        payments = payments.filter(payment_date__gte=start_date)
+    if end_date:
+        payments = payments.filter(payment_date__lte=end_date)
+    
+    page_size = get_page_size(request, settings.PAYMENT_LIST_PAGE_SIZE)
+    payments, next_cursor = _paginate(request, payments, PAYMENT_LIST_ORDERING, page_size)
+    
+    return render(request, 'finance/payment_list.html', {
+        'payments': payments,
+        'query': query,
+        'status_filter': status_filter,
+        'method_filter': method_filter,
+        'invoice_filter': invoice_filter,
+        'start_date': start_date,
+        'end_date': end_date,
+        'methods': Payment.PAYMENT_METHODS,
+        'statuses': Payment.STATUS_CHOICES,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
     })
 
 
@@ -145,16 +251,60 @@ def invoice_create(request):
     })
 
 
+@login_required
+def generate_invoices(request):
+    terms = Term.objects.select_related('session').order_by('-start_date')
+    class_levels = ClassLevel.objects.all()
+    
+    term_id = request.POST.get('term') or request.GET.get('term')
+    if term_id and not term_id.isdigit():
+        messages.error(request, 'Invalid term selected.')
+        return redirect('finance:generate_invoices')
+    term = Term.objects.select_related('session').filter(pk=term_id).first() if term_id else Term.objects.select_related('session').filter(is_current=True).first()
+    
+    if request.method == 'POST' and term:
+        level_ids = request.POST.getlist('class_levels')
+        try:
+            due_date = parse_date(request.POST.get('due_date', ''))
+        except ValueError:
+            due_date = None
+        if request.POST.get('due_date') and due_date is None:
+            messages.error(request, 'Enter the due date as YYYY-MM-DD.')
+            return redirect(f"{reverse('finance:generate_invoices')}?term={term.pk}")
+        if not all(level_id.isdigit() for level_id in level_ids):
+            messages.error(request, 'Invalid class level selected.')
+            return redirect(f"{reverse('finance:generate_invoices')}?term={term.pk}")
+        counts = generate_term_invoices(term, due_date=due_date, class_level_ids=level_ids or None)
+        messages.success(request, f"Created {counts['created']} invoice(s) for {term}. {counts['skipped']} student(s) already invoiced, {counts['unbilled']} without a fee structure.")
+        return redirect('finance:invoice_list')
+    
+    schedule = fee_schedule(term) if term else {}
+    levels = [
+        {'level': level, 'fees': schedule.get(level.id, []), 'total': sum(amount for _, amount, _ in schedule.get(level.id, []))}
+        for level in class_levels
+    ]
+    
+    return render(request, 'finance/generate_invoices.html', {
+        'terms': terms,
+        'selected_term': term,
+        'levels': levels,
+    })
+
+
 @login_required
 def invoice_detail(request, pk):
     invoice = get_object_or_404(Invoice, pk=pk)
     items = invoice.items.select_related('fee_category').all()
-    payments = invoice.payments.all().order_by('-payment_date')
+    payments, more_payments = keyset_page(
+        invoice.payments.only('id', 'receipt_number', 'payment_date', 'payment_method', 'amount'),
+        PAYMENT_LIST_ORDERING, None, settings.PAYMENT_LIST_PAGE_SIZE,
+    )
     
     return render(request, 'finance/invoice_detail.html', {
         'invoice': invoice,
         'items': items,
         'payments': payments,
+        'more_payments': more_payments,
     })
 
 
@@ -242,19 +392,14 @@ def expense_list(request):
         messages.success(request, 'Expense recorded!')
         return redirect('finance:expenses')
     
-    total = expenses.aggregate(total=Sum('amount'))['total'] or 0
-    
     return render(request, 'finance/expense_list.html', {
         'expenses': expenses,
-        'total': total,
+        'total': finance_totals()['expenses'],
     })
 
 
 @login_required
 def paystack_initialize(request, invoice_pk):
-    import requests
-    from django.conf import settings
-    
     invoice = get_object_or_404(Invoice, pk=invoice_pk)
     
     if invoice.balance <= 0:
@@ -277,31 +422,18 @@ def paystack_initialize(request, invoice_pk):
         payment_date=date.today(),
     )
     
-    headers = {
-        'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}',
-        'Content-Type': 'application/json',
-    }
-    
-    data = {
-        'email': email,
-        'amount': amount_kobo,
-        'reference': reference,
-        'callback_url': request.build_absolute_uri(f'/finance/paystack/verify/{payment.pk}/'),
-        'metadata': {
-            'invoice_id': invoice.pk,
-            'student_id': invoice.student.pk,
-            'payment_id': payment.pk,
-        }
-    }
-    
     try:
-        response = requests.post(
-            'https://api.paystack.co/transaction/initialize',
-            json=data,
-            headers=headers,
-            timeout=30
+        result = paystack.initialize_transaction(
+            email,
+            amount_kobo,
+            reference,
+            request.build_absolute_uri(f'/finance/paystack/verify/{payment.pk}/'),
+            metadata={
+                'invoice_id': invoice.pk,
+                'student_id': invoice.student.pk,
+                'payment_id': payment.pk,
+            },
         )
-        result = response.json()
         
         if result.get('status'):
             payment.paystack_access_code = result['data']['access_code']
@@ -320,36 +452,16 @@ def paystack_initialize(request, invoice_pk):
 
 
 def paystack_verify(request, payment_pk):
-    import requests
-    from django.conf import settings
-    
     payment = get_object_or_404(Payment, pk=payment_pk)
     
-    headers = {
-        'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}',
-    }
-    
     try:
-        response = requests.get(
-            f'https://api.paystack.co/transaction/verify/{payment.paystack_reference}',
-            headers=headers,
-            timeout=30
-        )
-        result = response.json()
+        result = paystack.verify_transaction(payment.paystack_reference)
         
         if result.get('status') and result['data']['status'] == 'success':
-            payment.payment_status = 'completed'
-            payment.save()
-            
-            invoice = payment.invoice
-            total_paid = invoice.payments.filter(payment_status='completed').aggregate(total=Sum('amount'))['total'] or 0
-            invoice.amount_paid = total_paid
-            invoice.save()
-            
+            set_payment_status(payment.pk, 'completed')
             messages.success(request, 'Payment successful! Thank you.')
         else:
-            payment.payment_status = 'failed'
-            payment.save()
+            set_payment_status(payment.pk, 'failed')
             messages.error(request, 'Payment verification failed.')
     except Exception as e:
         messages.error(request, f"Verification error: {str(e)}")
@@ -357,41 +469,18 @@ def paystack_verify(request, payment_pk):
     return redirect('finance:invoice_detail', pk=payment.invoice.pk)
 
 
+@csrf_exempt
+@require_POST
 def paystack_webhook(request):
-    import json
-    import hashlib
-    import hmac
-    from django.conf import settings
-    from django.views.decorators.csrf import csrf_exempt
-    
-    signature = request.headers.get('x-paystack-signature', '')
-    
-    computed = hmac.new(
-        settings.PAYSTACK_SECRET_KEY.encode(),
-        request.body,
-        hashlib.sha512
-    ).hexdigest()
-    
-    if signature != computed:
+    if not webhooks.valid_signature(request.body, request.headers.get('x-paystack-signature', '')):
         return JsonResponse({'status': 'invalid signature'}, status=400)
     
     try:
-        data = json.loads(request.body)
-        event = data.get('event')
-        
-        if event == 'charge.success':
-            reference = data['data']['reference']
-            payment = Payment.objects.filter(paystack_reference=reference).first()
-            
-            if payment and payment.payment_status != 'completed':
-                payment.payment_status = 'completed'
-                payment.save()
-                
-                invoice = payment.invoice
-                total_paid = invoice.payments.filter(payment_status='completed').aggregate(total=Sum('amount'))['total'] or 0
-                invoice.amount_paid = total_paid
-                invoice.save()
-        
-        return JsonResponse({'status': 'success'})
-    except Exception as e:
-        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+        payload = json.loads(request.body)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    
+    webhooks.record_event(payload)
+    return JsonResponse({'status': 'success'})
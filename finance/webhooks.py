@@ -0,0 +1,112 @@
+import hashlib
+import hmac
+import json
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from core.background import run_in_background
+from .ledger import set_payment_status
+from .models import Payment, PaystackEvent
+
+RETRYABLE_STATUSES = ('pending', 'failed')
+
+_drain_lock = threading.Lock()
+
+
+def valid_signature(body, signature):
+    """Check Paystack's HMAC-SHA512 ``x-paystack-signature`` over the raw request body"""
+    secret = settings.PAYSTACK_SECRET_KEY
+    if not secret or not signature:
+        return False
+    computed = hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(computed, signature)
+
+
+def event_reference(payload):
+    """The reference an event is deduplicated on: the transaction reference, else the event id, else a payload hash"""
+    data = payload.get('data') or {}
+    reference = data.get('reference') or data.get('id')
+    if reference:
+        return str(reference)[:100]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def record_event(payload):
+    """Store a webhook event in the inbox and schedule processing; gateway retries of a stored event are dropped"""
+    PaystackEvent.objects.bulk_create(
+        [PaystackEvent(event=str(payload.get('event', ''))[:50], reference=event_reference(payload), payload=payload)],
+        ignore_conflicts=True,
+    )
+    run_in_background(drain_events)
+
+
+def _charge_success(event, payments):
+    payment_id = payments.get(event.reference)
+    if payment_id is None:
+        return 'ignored', 'No matching payment'
+    set_payment_status(payment_id, 'completed')
+    return 'processed', ''
+
+
+EVENT_HANDLERS = {
+    'charge.success': _charge_success,
+}
+
+
+def _process_batch(after_id, batch_size, max_attempts):
+    with transaction.atomic():
+        events = list(
+            PaystackEvent.objects.select_for_update(skip_locked=True)
+            .filter(status__in=RETRYABLE_STATUSES, attempts__lt=max_attempts, id__gt=after_id)
+            .order_by('id')[:batch_size]
+        )
+        references = [event.reference for event in events if event.event in EVENT_HANDLERS]
+        payments = dict(Payment.objects.filter(paystack_reference__in=references).values_list('paystack_reference', 'pk'))
+
+        now = timezone.now()
+        for event in events:
+            handler = EVENT_HANDLERS.get(event.event)
+            event.attempts += 1
+            event.processed_at = now
+            if handler is None:
+                event.status, event.error = 'ignored', 'Unhandled event type'
+                continue
+            try:
+                with transaction.atomic():
+                    event.status, event.error = handler(event, payments)
+            except Exception as e:
+                event.status, event.error = 'failed', str(e)
+        PaystackEvent.objects.bulk_update(events, ['status', 'attempts', 'error', 'processed_at'])
+    return events
+
+
+def process_paystack_events(batch_size=None, max_attempts=None):
+    """Apply pending (and retry failed) inbox events in id order, one locked batch per transaction.
+
+    Each event runs in its own savepoint, so one bad event is marked failed
+    without rolling back the rest of its batch. Applying a charge goes
+    through set_payment_status, which credits an invoice only once, so
+    re-running the worker is always safe. Returns a Counter of outcomes.
+    """
+    batch_size = batch_size or settings.PAYSTACK_EVENT_BATCH_SIZE
+    max_attempts = max_attempts or settings.PAYSTACK_EVENT_MAX_ATTEMPTS
+    outcomes = Counter()
+    after_id = 0
+    while True:
+        events = _process_batch(after_id, batch_size, max_attempts)
+        outcomes.update(event.status for event in events)
+        if len(events) < batch_size:
+            return outcomes
+        after_id = events[-1].id
+
+
+def drain_events():
+    """Background entry point: process the inbox unless another thread is already draining it"""
+    if not _drain_lock.acquire(blocking=False):
+        return
+    try:
+        process_paystack_events()
+    finally:
+        _drain_lock.release()
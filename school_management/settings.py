@@ -32,6 +32,14 @@ INSTALLED_APPS = [
 
 PAYSTACK_SECRET_KEY = os.environ.get('PAYSTACK_SECRET_KEY', '')
 PAYSTACK_PUBLIC_KEY = os.environ.get('PAYSTACK_PUBLIC_KEY', '')
+PAYSTACK_BASE_URL = os.environ.get('PAYSTACK_BASE_URL', 'https://api.paystack.co')
+PAYSTACK_CONNECT_TIMEOUT = float(os.environ.get('PAYSTACK_CONNECT_TIMEOUT', 3.05))
+PAYSTACK_READ_TIMEOUT = float(os.environ.get('PAYSTACK_READ_TIMEOUT', 10))
+PAYSTACK_RETRIES = int(os.environ.get('PAYSTACK_RETRIES', 2))
+PAYSTACK_RETRY_BACKOFF = float(os.environ.get('PAYSTACK_RETRY_BACKOFF', 0.3))
+PAYSTACK_POOL_SIZE = int(os.environ.get('PAYSTACK_POOL_SIZE', 10))
+PAYSTACK_EVENT_BATCH_SIZE = int(os.environ.get('PAYSTACK_EVENT_BATCH_SIZE', 100))
+PAYSTACK_EVENT_MAX_ATTEMPTS = int(os.environ.get('PAYSTACK_EVENT_MAX_ATTEMPTS', 5))
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
@@ -85,6 +93,46 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'school-management'),
+    }
+}
+
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 300))
+CHART_CACHE_TIMEOUT = int(os.environ.get('CHART_CACHE_TIMEOUT', 600))
+
+DASHBOARD_ASYNC = os.environ.get('DASHBOARD_ASYNC', '').lower() in ('1', 'true', 'yes')
+DASHBOARD_WIDGET_WORKERS = int(os.environ.get('DASHBOARD_WIDGET_WORKERS', 4))
+
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', 2))
+BACKGROUND_TASKS_EAGER = os.environ.get('BACKGROUND_TASKS_EAGER', '').lower() in ('1', 'true', 'yes')
+
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+STUDENT_LIST_PAGE_SIZE = int(os.environ.get('STUDENT_LIST_PAGE_SIZE', 50))
+STUDENT_PROFILE_CACHE_TIMEOUT = int(os.environ.get('STUDENT_PROFILE_CACHE_TIMEOUT', 600))
+INVOICE_LIST_PAGE_SIZE = int(os.environ.get('INVOICE_LIST_PAGE_SIZE', 50))
+PAYMENT_LIST_PAGE_SIZE = int(os.environ.get('PAYMENT_LIST_PAGE_SIZE', 50))
+
+STUDENT_IMPORT_CHUNK_SIZE = int(os.environ.get('STUDENT_IMPORT_CHUNK_SIZE', 500))
+STUDENT_IMPORT_POOL_THRESHOLD = int(os.environ.get('STUDENT_IMPORT_POOL_THRESHOLD', 200))
+STUDENT_IMPORT_HASH_WORKERS = int(os.environ.get('STUDENT_IMPORT_HASH_WORKERS', 0)) or None
+
+ID_CARD_POOL_THRESHOLD = int(os.environ.get('ID_CARD_POOL_THRESHOLD', 200))
+
+REPORT_CARD_POOL_THRESHOLD = int(os.environ.get('REPORT_CARD_POOL_THRESHOLD', 20))
+REPORT_CARD_WORKERS = int(os.environ.get('REPORT_CARD_WORKERS', 0)) or None
+# Rendered report cards are private; keep this outside MEDIA_ROOT so /media/ never serves them.
+REPORT_CARD_CACHE_DIR = Path(os.environ.get('REPORT_CARD_CACHE_DIR', BASE_DIR / 'var' / 'report_cards'))
+REPORT_CARD_CACHE_MAX_AGE = int(os.environ.get('REPORT_CARD_CACHE_MAX_AGE', 30 * 24 * 3600))
+REPORT_CARD_CACHE_MAX_SIZE = int(os.environ.get('REPORT_CARD_CACHE_MAX_SIZE', 512 * 1024 * 1024))
+
+PROMOTION_PASS_MARK = int(os.environ.get('PROMOTION_PASS_MARK', 40))
+
+TERM_INVOICE_CHUNK_SIZE = int(os.environ.get('TERM_INVOICE_CHUNK_SIZE', 500))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
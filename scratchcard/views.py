@@ -1,17 +1,21 @@
 import json
-import requests
+import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.urls import reverse
 from django.conf import settings
 from django.utils import timezone
 from datetime import datetime
 from students.models import Student
 from cbt.models import Exam, ExamAttempt
+from finance import paystack
 from .models import ScratchCardPurchase, ScratchCard, ExamAccess
 
+logger = logging.getLogger(__name__)
+
 
 @login_required
 def buy_scratch_card(request):
@@ -25,11 +29,6 @@ def buy_scratch_card(request):
         try:
             card_price = getattr(settings, 'SCRATCH_CARD_PRICE', 5000)
             
-            headers = {
-                "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-                "Content-Type": "application/json",
-            }
-            
             import uuid
             payment_ref = f"SCRATCH-{student.admission_number}-{uuid.uuid4().hex[:8].upper()}"
             
@@ -39,42 +38,29 @@ def buy_scratch_card(request):
                 payment_ref=payment_ref,
             )
             
-            payload = {
-                "email": student.email or student.user.email,
-                "amount": int(card_price * 100),
-                "reference": payment_ref,
-                "callback_url": request.build_absolute_uri('/scratchcard/callback/'),
-                "metadata": {
+            logger.info("Initializing Paystack with ref: %s", payment_ref)
+            
+            data = paystack.initialize_transaction(
+                student.email or student.user.email,
+                int(card_price * 100),
+                payment_ref,
+                request.build_absolute_uri(reverse('scratchcard:payment_callback')),
+                metadata={
                     "student_id": student.id,
                     "purchase_id": purchase.id,
-                }
-            }
-            
-            # Print for debugging in logs
-            print(f"Initializing Paystack with ref: {payment_ref}")
-            print(f"Payload: {payload}")
-            
-            response = requests.post(
-                "https://api.paystack.co/transaction/initialize",
-                headers=headers,
-                json=payload,
-                timeout=30
+                },
             )
             
-            print(f"Paystack Status Code: {response.status_code}")
-            print(f"Paystack Raw Response: {response.text}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data['status']:
-                    purchase.paystack_access_code = data['data']['access_code']
-                    purchase.paystack_auth_url = data['data']['authorization_url']
-                    purchase.save()
-                    return redirect(data['data']['authorization_url'])
-                else:
-                    messages.error(request, "Failed to initialize payment.")
+            if data.get('status'):
+                purchase.paystack_access_code = data['data']['access_code']
+                purchase.paystack_auth_url = data['data']['authorization_url']
+                purchase.save()
+                return redirect(data['data']['authorization_url'])
             else:
-                messages.error(request, "Payment service unavailable.")
+                logger.warning("Paystack rejected %s: %s", payment_ref, data.get('message'))
+                messages.error(request, "Failed to initialize payment.")
+        except paystack.PaystackError:
+            messages.error(request, "Payment service unavailable.")
         except Exception as e:
             messages.error(request, f"Error: {str(e)}")
             return redirect('scratchcard:dashboard')
@@ -94,41 +80,32 @@ def payment_callback(request):
         return redirect('scratchcard:dashboard')
     
     try:
-        headers = {
-            "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        }
+        data = paystack.verify_transaction(reference)
         
-        response = requests.get(
-            f"https://api.paystack.co/transaction/verify/{reference}",
-            headers=headers,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
+        if data['status'] and data['data']['status'] == 'success':
+            purchase = ScratchCardPurchase.objects.get(payment_ref=reference)
+            purchase.payment_status = 'completed'
+            purchase.completed_at = timezone.now()
             
-            if data['status'] and data['data']['status'] == 'success':
-                purchase = ScratchCardPurchase.objects.get(payment_ref=reference)
-                purchase.payment_status = 'completed'
-                purchase.completed_at = timezone.now()
-                
-                available_card = ScratchCard.objects.filter(status='active').first()
-                if available_card:
-                    purchase.scratch_card = available_card
-                    available_card.status = 'used'
-                    available_card.save()
-                
-                purchase.save()
-                messages.success(request, "Payment successful! Scratch card activated.")
-                return redirect('scratchcard:dashboard')
-            else:
-                purchase = ScratchCardPurchase.objects.get(payment_ref=reference)
-                purchase.payment_status = 'failed'
-                purchase.save()
-                messages.error(request, "Payment failed.")
-                return redirect('scratchcard:buy')
+            available_card = ScratchCard.objects.filter(status='active').first()
+            if available_card:
+                purchase.scratch_card = available_card
+                available_card.status = 'used'
+                available_card.save()
+            
+            purchase.save()
+            messages.success(request, "Payment successful! Scratch card activated.")
+            return redirect('scratchcard:dashboard')
+        else:
+            purchase = ScratchCardPurchase.objects.get(payment_ref=reference)
+            purchase.payment_status = 'failed'
+            purchase.save()
+            messages.error(request, "Payment failed.")
+            return redirect('scratchcard:buy')
     except ScratchCardPurchase.DoesNotExist:
         messages.error(request, "Payment record not found.")
+    except paystack.PaystackError:
+        messages.error(request, "Payment service unavailable. Please try again later.")
     except Exception as e:
         messages.error(request, f"Error: {str(e)}")
     
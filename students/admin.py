@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Student, StudentClassHistory, Result
+from .models import Student, StudentClassHistory, Result, StudentTermSummary
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
@@ -14,6 +14,12 @@ class StudentClassHistoryAdmin(admin.ModelAdmin):
 
 @admin.register(Result)
 class ResultAdmin(admin.ModelAdmin):
-    list_display = ['student', 'subject', 'classroom', 'term', 'ca_score', 'exam_score', 'total', 'grade']
+    list_display = ['student', 'subject', 'classroom', 'term', 'ca_score', 'exam_score', 'total', 'grade', 'subject_position', 'class_average']
     list_filter = ['session', 'term', 'classroom', 'subject', 'grade']
     search_fields = ['student__first_name', 'student__last_name', 'student__admission_number']
+
+@admin.register(StudentTermSummary)
+class StudentTermSummaryAdmin(admin.ModelAdmin):
+    list_display = ['student', 'classroom', 'session', 'term', 'total', 'average', 'subject_count', 'position']
+    list_filter = ['session', 'term', 'classroom']
+    search_fields = ['student__first_name', 'student__last_name', 'student__admission_number']
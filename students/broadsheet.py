@@ -0,0 +1,45 @@
+from collections import Counter
+import pandas as pd
+from core.models import Subject
+from .models import Result
+
+BROADSHEET_INDEX = ['Admission No', 'Student']
+
+
+def _subject_labels(subject_ids):
+    subjects = Subject.objects.filter(pk__in=list(subject_ids)).values_list('pk', 'name', 'code')
+    names = Counter(name for _, name, _ in subjects)
+    return {pk: f"{name} ({code})" if names[name] > 1 else name for pk, name, code in subjects}
+
+
+def class_broadsheet(classroom, session, term):
+    """Every student in a class against every subject for a term, as a DataFrame.
+
+    Built from one values() query pivoted in memory on the subject id, with
+    subject names put back as column labels (plus the code where two
+    subjects share a name); totals, averages and competition-style
+    positions are computed on the pivot. Returns an empty
+    DataFrame when the class has no results.
+    """
+    rows = list(
+        Result.objects.filter(classroom=classroom, session=session, term=term)
+        .values_list('student__admission_number', 'student__first_name', 'student__last_name', 'subject_id', 'total')
+    )
+    if not rows:
+        return pd.DataFrame(columns=BROADSHEET_INDEX + ['Total', 'Average', 'Position'])
+
+    frame = pd.DataFrame(rows, columns=['admission_number', 'first_name', 'last_name', 'subject', 'total'])
+    frame['Student'] = frame['first_name'] + ' ' + frame['last_name']
+    frame['total'] = frame['total'].astype(float)
+
+    sheet = frame.pivot_table(index=['admission_number', 'Student'], columns='subject', values='total', aggfunc='first')
+    labels = _subject_labels(sheet.columns)
+    sheet = sheet.rename(columns=labels)
+    sheet = sheet.reindex(columns=sorted(sheet.columns))
+    sheet.columns.name = None
+    sheet['Total'] = sheet.sum(axis=1)
+    sheet['Average'] = (sheet['Total'] / sheet.iloc[:, :-1].count(axis=1)).round(2)
+    sheet['Position'] = sheet['Total'].rank(method='min', ascending=False).astype(int)
+
+    sheet = sheet.reset_index().rename(columns={'admission_number': 'Admission No'})
+    return sheet.sort_values(['Position', 'Student']).reset_index(drop=True)
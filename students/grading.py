@@ -0,0 +1,117 @@
+from decimal import Decimal
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from core.charts import invalidate_chart
+from .models import GRADE_BOUNDARIES, GRADE_REMARKS, Result, StudentTermSummary
+from .profile import invalidate_student_profiles
+
+GRADE_CUTOFFS = np.array([boundary * 100 for boundary, _ in sorted(GRADE_BOUNDARIES)])
+GRADE_LETTERS = np.array(['F'] + [grade for _, grade in sorted(GRADE_BOUNDARIES)])
+RESULT_FIELDS = ['total', 'grade', 'remark', 'subject_position', 'class_average', 'class_highest', 'class_lowest', 'updated_at']
+SUMMARY_FIELDS = ['total', 'average', 'subject_count', 'position', 'updated_at']
+
+
+def _cents(value):
+    return int((value * 100).to_integral_value())
+
+
+def _amount(cents, count=1):
+    return (Decimal(int(cents)) / count).scaleb(-2).quantize(Decimal('0.01'))
+
+
+def competition_ranks(matrix):
+    """Column-wise competition ranks (1, 2, 2, 4) of a rows x columns score matrix; NaN cells rank 0"""
+    beaten_by = (matrix[np.newaxis, :, :] > matrix[:, np.newaxis, :]).sum(axis=1)
+    return np.where(np.isnan(matrix), 0, beaten_by + 1)
+
+
+@transaction.atomic
+def grade_class(classroom_id, session_id, term_id):
+    """Grade and rank one class for a term in a single vectorized pass.
+
+    Scores are loaded into a (students x subjects) matrix of cents, so totals,
+    grades, subject positions, class average/highest/lowest and overall
+    positions all come out of a handful of NumPy operations. Results are
+    written back with one bulk_update and term summaries with one upsert.
+    Returns the number of results graded.
+    """
+    results = list(
+        Result.objects.filter(classroom_id=classroom_id, session_id=session_id, term_id=term_id)
+        .only('id', 'student_id', 'subject_id', 'ca_score', 'exam_score')
+    )
+    summaries = StudentTermSummary.objects.filter(classroom_id=classroom_id, session_id=session_id, term_id=term_id)
+    if not results:
+        summaries.delete()
+        return 0
+
+    student_ids = sorted({r.student_id for r in results})
+    subject_ids = sorted({r.subject_id for r in results})
+    student_index = {pk: i for i, pk in enumerate(student_ids)}
+    subject_index = {pk: i for i, pk in enumerate(subject_ids)}
+    rows = np.array([student_index[r.student_id] for r in results])
+    cols = np.array([subject_index[r.subject_id] for r in results])
+    totals = np.array([_cents(r.ca_score) + _cents(r.exam_score) for r in results], dtype=np.int64)
+
+    matrix = np.full((len(student_ids), len(subject_ids)), np.nan)
+    matrix[rows, cols] = totals
+    taken = ~np.isnan(matrix)
+
+    grades = GRADE_LETTERS[np.searchsorted(GRADE_CUTOFFS, totals, side='right')]
+    subject_positions = competition_ranks(matrix)[rows, cols]
+    subject_counts = taken.sum(axis=0)
+    subject_sums = np.nansum(matrix, axis=0)
+    subject_highest = np.nanmax(matrix, axis=0)
+    subject_lowest = np.nanmin(matrix, axis=0)
+
+    student_totals = np.nansum(matrix, axis=1)
+    student_counts = taken.sum(axis=1)
+    overall_positions = competition_ranks(student_totals[:, np.newaxis])[:, 0]
+
+    now = timezone.now()
+    for result, total, grade, position, col in zip(results, totals, grades, subject_positions, cols):
+        result.total = _amount(total)
+        result.grade = str(grade)
+        result.remark = GRADE_REMARKS[result.grade]
+        result.subject_position = int(position)
+        result.class_average = _amount(subject_sums[col], int(subject_counts[col]))
+        result.class_highest = _amount(subject_highest[col])
+        result.class_lowest = _amount(subject_lowest[col])
+        result.updated_at = now
+    Result.objects.bulk_update(results, RESULT_FIELDS, batch_size=500)
+
+    StudentTermSummary.objects.bulk_create(
+        [
+            StudentTermSummary(
+                student_id=student_id,
+                classroom_id=classroom_id,
+                session_id=session_id,
+                term_id=term_id,
+                total=_amount(student_totals[i]),
+                average=_amount(student_totals[i], int(student_counts[i])),
+                subject_count=int(student_counts[i]),
+                position=int(overall_positions[i]),
+                updated_at=now,
+            )
+            for i, student_id in enumerate(student_ids)
+        ],
+        update_conflicts=True,
+        unique_fields=['student', 'session', 'term', 'classroom'],
+        update_fields=SUMMARY_FIELDS,
+    )
+    summaries.exclude(student_id__in=student_ids).delete()
+    invalidate_student_profiles(student_ids)
+    return len(results)
+
+
+def grade_term(session_id, term_id, classroom_ids=None):
+    """Run grade_class for every class with results in a term; returns (classes, results) graded"""
+    results = Result.objects.filter(session_id=session_id, term_id=term_id)
+    if classroom_ids:
+        results = results.filter(classroom_id__in=classroom_ids)
+
+    classrooms = sorted(set(results.values_list('classroom_id', flat=True)))
+    graded = sum(grade_class(classroom_id, session_id, term_id) for classroom_id in classrooms)
+    if classrooms:
+        invalidate_chart('performance')
+    return len(classrooms), graded
@@ -0,0 +1,249 @@
+import csv
+import io
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from accounts.models import UserProfile
+from core import search
+from core.charts import invalidate_chart
+from core.dashboard import invalidate_dashboard_snapshot
+from core.models import ClassRoom
+from core.qrcodes import schedule_qr_codes
+from .models import Student
+
+IMPORT_COLUMNS = [
+    'admission_number', 'first_name', 'last_name', 'other_name', 'gender', 'date_of_birth',
+    'admission_date', 'class', 'email', 'phone', 'address', 'parent_name', 'parent_phone',
+    'parent_email', 'parent_address', 'parent_occupation',
+]
+REQUIRED_COLUMNS = ['first_name', 'last_name', 'gender', 'date_of_birth', 'admission_date']
+REPORT_COLUMNS = ['row', 'status', 'admission_number', 'name', 'username', 'password', 'errors']
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']
+GENDERS = {'m': 'M', 'male': 'M', 'f': 'F', 'female': 'F'}
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def read_rows(uploaded_file):
+    """Yield ``(row_number, row_dict)`` from a CSV or XLSX upload without loading it all into memory"""
+    name = uploaded_file.name.lower()
+    if name.endswith('.xlsx'):
+        yield from _read_xlsx(uploaded_file)
+    elif name.endswith('.csv'):
+        yield from _read_csv(uploaded_file)
+    else:
+        raise ImportFileError('Upload a .csv or .xlsx file.')
+
+
+def _normalise_header(header):
+    return [str(h or '').strip().lower().replace(' ', '_') for h in header]
+
+
+def _read_csv(uploaded_file):
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    header = _normalise_header(next(reader, []))
+    for number, values in enumerate(reader, start=2):
+        if any(v.strip() for v in values):
+            yield number, dict(zip(header, values))
+
+
+def _read_xlsx(uploaded_file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalise_header(next(rows, []))
+        for number, values in enumerate(rows, start=2):
+            if any(v not in (None, '') for v in values):
+                yield number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _text(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(_text(value), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _classroom_lookup():
+    lookup = {}
+    for classroom in ClassRoom.objects.select_related('class_level'):
+        for key in (str(classroom.pk), str(classroom), f"{classroom.class_level.name} {classroom.name}"):
+            lookup[key.strip().lower()] = classroom.pk
+    return lookup
+
+
+def validate_row(number, raw, classrooms):
+    """Clean one upload row. Returns ``(cleaned, errors)``"""
+    row = {column: _text(raw.get(column)) for column in IMPORT_COLUMNS}
+    errors = [f'{column} is required' for column in REQUIRED_COLUMNS if not row[column]]
+
+    gender = GENDERS.get(row['gender'].lower())
+    if row['gender'] and not gender:
+        errors.append(f"unknown gender '{row['gender']}'")
+
+    dates = {}
+    for column in ('date_of_birth', 'admission_date'):
+        dates[column] = _parse_date(raw.get(column))
+        if row[column] and dates[column] is None:
+            errors.append(f"{column} must be YYYY-MM-DD or DD/MM/YYYY")
+
+    classroom_id = None
+    if row['class']:
+        classroom_id = classrooms.get(row['class'].lower())
+        if classroom_id is None:
+            errors.append(f"unknown class '{row['class']}'")
+
+    cleaned = {
+        **{k: v for k, v in row.items() if k != 'class'},
+        'admission_number': row['admission_number'] or f"STU{uuid.uuid4().hex[:6].upper()}",
+        'gender': gender,
+        'date_of_birth': dates['date_of_birth'],
+        'admission_date': dates['admission_date'],
+        'current_class_id': classroom_id,
+        'row': number,
+    }
+    return cleaned, errors
+
+
+def _init_hash_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords):
+    """Hash passwords, spreading the PBKDF2 work over a process pool for large batches"""
+    if len(passwords) < settings.STUDENT_IMPORT_POOL_THRESHOLD:
+        return [make_password(p) for p in passwords]
+    with ProcessPoolExecutor(
+        max_workers=settings.STUDENT_IMPORT_HASH_WORKERS,
+        initializer=_init_hash_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'school_management.settings'),),
+    ) as pool:
+        return list(pool.map(make_password, passwords, chunksize=32))
+
+
+def _assign_usernames(rows):
+    wanted = {f"{r['first_name'].lower()}.{r['last_name'].lower()}" for r in rows}
+    taken = set(User.objects.filter(username__in=wanted).values_list('username', flat=True))
+    for row in rows:
+        username = f"{row['first_name'].lower()}.{row['last_name'].lower()}"
+        if username in taken:
+            username = f"{username}_{row['admission_number'].lower()}"
+        taken.add(username)
+        row['username'] = username
+
+
+def _create_chunk(rows):
+    passwords = [f"{row['admission_number']}@2024" for row in rows]
+    hashes = hash_passwords(passwords)
+
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(username=row['username'], email=row['email'], first_name=row['first_name'],
+                 last_name=row['last_name'], password=hashed)
+            for row, hashed in zip(rows, hashes)
+        ])
+        UserProfile.objects.bulk_create([UserProfile(user=user, role='student') for user in users])
+        students = Student.objects.bulk_create([
+            Student(user=user, **{k: v for k, v in row.items() if k not in ('row', 'username')})
+            for row, user in zip(rows, users)
+        ])
+
+    for row, password in zip(rows, passwords):
+        row['password'] = password
+    return students
+
+
+def import_students(uploaded_file, chunk_size=None):
+    """Validate and bulk-create students (and their login accounts) from an upload.
+
+    Rows are validated in one streaming pass; valid rows are then written
+    in chunks, each chunk in its own transaction. Returns
+    ``(report_rows, created_students)`` where each report row follows
+    REPORT_COLUMNS. QR codes are generated afterwards in the background.
+    """
+    chunk_size = chunk_size or settings.STUDENT_IMPORT_CHUNK_SIZE
+    classrooms = _classroom_lookup()
+    report, valid = [], []
+    seen_numbers = set()
+
+    for number, raw in read_rows(uploaded_file):
+        row, errors = validate_row(number, raw, classrooms)
+        if row['admission_number'] in seen_numbers:
+            errors.append('duplicate admission_number in file')
+        seen_numbers.add(row['admission_number'])
+        if errors:
+            report.append(_report(row, 'error', errors))
+        else:
+            valid.append(row)
+
+    existing = set()
+    numbers = [row['admission_number'] for row in valid]
+    for start in range(0, len(numbers), 500):
+        existing.update(Student.objects.filter(admission_number__in=numbers[start:start + 500]).values_list('admission_number', flat=True))
+    for row in [r for r in valid if r['admission_number'] in existing]:
+        report.append(_report(row, 'error', ['admission_number already exists']))
+    valid = [r for r in valid if r['admission_number'] not in existing]
+
+    created = []
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        _assign_usernames(chunk)
+        try:
+            created.extend(_create_chunk(chunk))
+        except Exception as e:
+            report.extend(_report(row, 'error', [f'could not be saved: {e}']) for row in chunk)
+        else:
+            report.extend(_report(row, 'created') for row in chunk)
+
+    if created:
+        search.index_objects('student', created)
+        schedule_qr_codes('students.Student', [student.pk for student in created])
+        invalidate_dashboard_snapshot()
+        invalidate_chart('students')
+
+    report.sort(key=lambda r: r['row'])
+    return report, created
+
+
+def _report(row, status, errors=()):
+    return {
+        'row': row['row'],
+        'status': status,
+        'admission_number': row['admission_number'],
+        'name': f"{row['first_name']} {row['last_name']}".strip(),
+        'username': row.get('username', '') if status == 'created' else '',
+        'password': row.get('password', '') if status == 'created' else '',
+        'errors': '; '.join(errors),
+    }
+
+
+def write_report(report, stream):
+    writer = csv.DictWriter(stream, fieldnames=REPORT_COLUMNS)
+    writer.writeheader()
+    writer.writerows(report)
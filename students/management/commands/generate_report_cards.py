@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.models import AcademicSession, ClassRoom, Term
+from students.reports import class_report_payloads, render_merged_report_cards, render_report_card_zip
+
+
+class Command(BaseCommand):
+    help = 'Render report cards for a whole class as one merged PDF or a ZIP of per-student PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--class', dest='classroom', type=int, required=True, help='Classroom id')
+        parser.add_argument('--session', type=int, required=True, help='Academic session id')
+        parser.add_argument('--term', type=int, required=True, help='Term id')
+        parser.add_argument('--format', choices=['pdf', 'zip'], default='zip')
+        parser.add_argument('--output', required=True, help='File to write the PDF or ZIP to')
+        parser.add_argument('--workers', type=int, help='Process pool size for ZIP output')
+
+    def handle(self, *args, **options):
+        try:
+            classroom = ClassRoom.objects.get(pk=options['classroom'])
+            session = AcademicSession.objects.get(pk=options['session'])
+            term = Term.objects.get(pk=options['term'])
+        except (ClassRoom.DoesNotExist, AcademicSession.DoesNotExist, Term.DoesNotExist) as exc:
+            raise CommandError(exc)
+
+        payloads = class_report_payloads(classroom, session, term)
+        if not payloads:
+            raise CommandError('No results found for the selected class and period.')
+
+        def progress(done, total):
+            self.stdout.write(f'\r{done}/{total} report cards', ending='')
+            self.stdout.flush()
+
+        with open(options['output'], 'wb') as output:
+            if options['format'] == 'zip':
+                render_report_card_zip(payloads, output, options['workers'], progress)
+            else:
+                render_merged_report_cards(payloads, output, progress)
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(payloads)} report card(s) to {options['output']}."))
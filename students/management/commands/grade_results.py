@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.models import AcademicSession, Term
+from students.grading import grade_term
+
+
+class Command(BaseCommand):
+    help = 'Compute grades, subject/class positions and class statistics for a term'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, help='Academic session id (defaults to the current session)')
+        parser.add_argument('--term', type=int, help='Term id (defaults to the current term)')
+        parser.add_argument('--class', dest='classrooms', type=int, action='append', help='Only grade this classroom id (repeatable)')
+
+    def handle(self, *args, **options):
+        session_id = options['session'] or AcademicSession.objects.filter(is_current=True).values_list('id', flat=True).first()
+        term_id = options['term'] or Term.objects.filter(is_current=True).values_list('id', flat=True).first()
+        if not session_id or not term_id:
+            raise CommandError('No current session/term is set; pass --session and --term.')
+
+        classes, graded = grade_term(session_id, term_id, options['classrooms'])
+        self.stdout.write(self.style.SUCCESS(f'Graded {graded} result(s) across {classes} class(es).'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from students.importer import ImportFileError, import_students, write_report
+
+
+class Command(BaseCommand):
+    help = 'Bulk-import students and their login accounts from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file to import')
+        parser.add_argument('--report', help='Write the credentials/error report to this CSV file')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as upload:
+                report, created = import_students(upload)
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w', newline='') as stream:
+                write_report(report, stream)
+
+        failed = len(report) - len(created)
+        self.stdout.write(self.style.SUCCESS(f'Imported {len(created)} student(s); {failed} row(s) rejected.'))
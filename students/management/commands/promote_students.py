@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.models import AcademicSession
+from students.promotion import PROMOTION_ACTIONS, apply_promotions, plan_promotions
+
+
+class Command(BaseCommand):
+    help = 'Promote, repeat or graduate students at the end of an academic session'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, help='Academic session id (defaults to the current session)')
+        parser.add_argument('--class', dest='classrooms', type=int, action='append', help='Only process this classroom id (repeatable)')
+        parser.add_argument('--pass-mark', type=int, help='Minimum session average to be promoted (defaults to PROMOTION_PASS_MARK)')
+        parser.add_argument('--dry-run', action='store_true', help='Print the decisions without writing anything')
+
+    def handle(self, *args, **options):
+        sessions = AcademicSession.objects.all()
+        session = sessions.filter(pk=options['session']).first() if options['session'] else sessions.filter(is_current=True).first()
+        if session is None:
+            raise CommandError('Session not found; pass --session.')
+
+        decisions = plan_promotions(session, options['classrooms'], options['pass_mark'])
+        if options['dry_run']:
+            for d in decisions:
+                self.stdout.write(f"{d['student'].admission_number}\t{d['from_class']}\t{d['average'] or '-'}\t{d['action']}\t{d['to_class'] or '-'}\t{d['reason']}")
+            counts = {action: sum(1 for d in decisions if d['action'] == action) for action in PROMOTION_ACTIONS}
+        else:
+            counts = apply_promotions(session, decisions)
+
+        summary = ', '.join(f"{counts[action]} {action}" for action in PROMOTION_ACTIONS)
+        prefix = 'Dry run: ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}{summary} for {session}.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from students.report_cache import prune_report_card_cache
+
+
+class Command(BaseCommand):
+    help = 'Evict cached report-card PDFs by age and total cache size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, help='Maximum age in seconds (defaults to REPORT_CARD_CACHE_MAX_AGE)')
+        parser.add_argument('--max-size', type=int, help='Maximum total size in bytes (defaults to REPORT_CARD_CACHE_MAX_SIZE)')
+
+    def handle(self, *args, **options):
+        removed, remaining = prune_report_card_cache(options['max_age'], options['max_size'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} cached report card(s); {remaining} bytes remain.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from students.summaries import rebuild_term_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild StudentTermSummary rows (totals, averages and class positions) from Result'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, help='Only rebuild this academic session id')
+        parser.add_argument('--term', type=int, help='Only rebuild this term id')
+
+    def handle(self, *args, **options):
+        periods = rebuild_term_summaries(options['session'], options['term'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt term summaries for {periods} session/term period(s).'))
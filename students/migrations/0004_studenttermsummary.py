@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_subject_description_subject_icon_subjectvideo'),
+        ('students', '0003_student_qr_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentTermSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('average', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('subject_count', models.IntegerField(default=0)),
+                ('position', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.classroom')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.academicsession')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_summaries', to='students.student')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.term')),
+            ],
+            options={
+                'verbose_name_plural': 'Student term summaries',
+                'indexes': [models.Index(fields=['classroom', 'session', 'term', '-total'], name='students_st_classro_a124bd_idx')],
+                'unique_together': {('student', 'session', 'term', 'classroom')},
+            },
+        ),
+    ]
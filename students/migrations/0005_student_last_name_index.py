@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_subject_description_subject_icon_subjectvideo'),
+        ('students', '0004_studenttermsummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name', 'id'], name='students_st_last_na_55c44f_idx'),
+        ),
+    ]
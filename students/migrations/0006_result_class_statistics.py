@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0005_student_last_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='class_average',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='class_highest',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='class_lowest',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='subject_position',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -31,26 +31,12 @@ class Student(models.Model):
     parent_occupation = models.CharField(max_length=100, blank=True)
     qr_code = models.ImageField(upload_to='students/qrcodes/', blank=True, null=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['last_name', 'id'])]
+
     def __str__(self):
         return f"{self.admission_number} - {self.first_name} {self.last_name}"
 
-    def generate_qr_code(self):
-        import qrcode
-        from io import BytesIO
-        from django.core.files import File
-        
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(f"STUDENT:{self.admission_number}")
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        filename = f"qr_{self.admission_number}.png"
-        self.qr_code.save(filename, File(buffer), save=False)
-
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -66,6 +52,26 @@ class StudentClassHistory(models.Model):
         unique_together = ['student', 'session']
 
 
+GRADE_BOUNDARIES = [(70, 'A'), (60, 'B'), (50, 'C'), (45, 'D'), (40, 'E')]
+
+GRADE_REMARKS = {
+    'A': 'Excellent',
+    'B': 'Very Good',
+    'C': 'Good',
+    'D': 'Fair',
+    'E': 'Pass',
+    'F': 'Fail'
+}
+
+
+def grade_for_total(total):
+    """Letter grade for a total score"""
+    for boundary, grade in GRADE_BOUNDARIES:
+        if total >= boundary:
+            return grade
+    return 'F'
+
+
 class Result(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='results')
     subject = models.ForeignKey('core.Subject', on_delete=models.CASCADE)
@@ -77,6 +83,10 @@ class Result(models.Model):
     total = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     grade = models.CharField(max_length=2, blank=True)
     remark = models.CharField(max_length=50, blank=True)
+    subject_position = models.PositiveIntegerField(null=True, blank=True)
+    class_average = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    class_highest = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    class_lowest = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -91,29 +101,30 @@ class Result(models.Model):
         super().save(*args, **kwargs)
 
     def calculate_grade(self):
-        if self.total >= 70:
-            return 'A'
-        elif self.total >= 60:
-            return 'B'
-        elif self.total >= 50:
-            return 'C'
-        elif self.total >= 45:
-            return 'D'
-        elif self.total >= 40:
-            return 'E'
-        else:
-            return 'F'
+        return grade_for_total(self.total)
 
     def get_remark(self):
-        remarks = {
-            'A': 'Excellent',
-            'B': 'Very Good',
-            'C': 'Good',
-            'D': 'Fair',
-            'E': 'Pass',
-            'F': 'Fail'
-        }
-        return remarks.get(self.grade, '')
+        return GRADE_REMARKS.get(self.grade, '')
 
     def __str__(self):
         return f"{self.student.full_name} - {self.subject.name} - {self.term}"
+
+
+class StudentTermSummary(models.Model):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='term_summaries')
+    classroom = models.ForeignKey(ClassRoom, on_delete=models.CASCADE)
+    session = models.ForeignKey(AcademicSession, on_delete=models.CASCADE)
+    term = models.ForeignKey('core.Term', on_delete=models.CASCADE)
+    total = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    average = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    subject_count = models.IntegerField(default=0)
+    position = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'session', 'term', 'classroom']
+        indexes = [models.Index(fields=['classroom', 'session', 'term', '-total'])]
+        verbose_name_plural = "Student term summaries"
+
+    def __str__(self):
+        return f"{self.student.full_name} - {self.term} - {self.average}"
@@ -0,0 +1,85 @@
+from datetime import date
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from attendance.models import StudentAttendance
+from cbt.models import ExamAttempt
+from finance.models import Invoice
+from library.models import BookIssue
+from .models import StudentTermSummary
+
+
+def profile_cache_key(student_id):
+    return f'student:profile:{student_id}'
+
+
+def build_student_profile(student):
+    """Cross-module aggregates for one student, one query per module"""
+    today = date.today()
+
+    attendance = StudentAttendance.objects.filter(student=student).aggregate(
+        days=Count('id'),
+        attended=Count('id', filter=Q(status__in=['present', 'late'])),
+        absent=Count('id', filter=Q(status='absent')),
+    )
+    finance = Invoice.objects.filter(student=student).exclude(status='cancelled').aggregate(
+        billed=Sum('total_amount'),
+        paid=Sum('amount_paid'),
+        outstanding=Sum('balance', filter=Q(status__in=['pending', 'partial'])),
+        open_invoices=Count('id', filter=Q(status__in=['pending', 'partial'])),
+    )
+    latest = (
+        StudentTermSummary.objects.filter(student=student)
+        .select_related('session', 'term__session', 'classroom__class_level')
+        .order_by('-session__start_date', '-term__start_date', '-updated_at')
+        .first()
+    )
+    library = BookIssue.objects.filter(student=student).aggregate(
+        on_loan=Count('id', filter=Q(status__in=['issued', 'overdue'])),
+        overdue=Count('id', filter=Q(status='overdue') | Q(status='issued', due_date__lt=today)),
+        fines=Sum('fine_amount'),
+    )
+    exams = ExamAttempt.objects.filter(student=student).aggregate(
+        attempts=Count('id'),
+        completed=Count('id', filter=Q(is_completed=True)),
+        average_score=Avg('score', filter=Q(is_completed=True)),
+    )
+
+    return {
+        'date': today,
+        'attendance_days': attendance['days'],
+        'attendance_absent': attendance['absent'],
+        'attendance_rate': round(attendance['attended'] * 100 / attendance['days'], 1) if attendance['days'] else None,
+        'fees_billed': finance['billed'] or 0,
+        'fees_paid': finance['paid'] or 0,
+        'outstanding_balance': finance['outstanding'] or 0,
+        'open_invoices': finance['open_invoices'],
+        'latest_term': str(latest.term) if latest else None,
+        'latest_classroom': str(latest.classroom) if latest else None,
+        'latest_average': latest.average if latest else None,
+        'latest_position': latest.position if latest else None,
+        'books_on_loan': library['on_loan'],
+        'books_overdue': library['overdue'],
+        'library_fines': library['fines'] or 0,
+        'exam_attempts': exams['attempts'],
+        'exams_completed': exams['completed'],
+        'exam_average_score': round(exams['average_score'], 1) if exams['average_score'] is not None else None,
+    }
+
+
+def get_student_profile(student):
+    """Return the cached profile aggregates, rebuilding them on a miss or a new day"""
+    key = profile_cache_key(student.pk)
+    profile = cache.get(key)
+    if profile is None or profile['date'] != date.today():
+        profile = build_student_profile(student)
+        cache.set(key, profile, settings.STUDENT_PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_student_profiles(student_ids):
+    """Drop cached profiles for ``student_ids`` once the current transaction commits"""
+    keys = [profile_cache_key(pk) for pk in set(student_ids) if pk]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
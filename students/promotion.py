@@ -0,0 +1,145 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from core.charts import invalidate_chart
+from core.dashboard import invalidate_dashboard_snapshot
+from core.models import ClassLevel, ClassRoom
+from .models import Student, StudentClassHistory, StudentTermSummary
+
+PROMOTION_ACTIONS = ['promote', 'repeat', 'graduate']
+UPDATE_BATCH_SIZE = 500
+
+
+def _next_levels():
+    levels = list(ClassLevel.objects.order_by('order', 'id'))
+    return {
+        level.id: next((later for later in levels if later.order > level.order), None)
+        for level in levels
+    }
+
+
+def _target_classrooms():
+    rooms = defaultdict(dict)
+    for room in ClassRoom.objects.select_related('class_level').order_by('name', 'id'):
+        rooms[room.class_level_id].setdefault(room.name, room)
+    return rooms
+
+
+def _session_averages(session, students):
+    rows = (
+        StudentTermSummary.objects.filter(session=session, student__in=students)
+        .values('student_id')
+        .annotate(total=Sum('total'), subjects=Sum('subject_count'))
+    )
+    return {
+        row['student_id']: (row['total'] / row['subjects']).quantize(Decimal('0.01'))
+        for row in rows if row['subjects']
+    }
+
+
+def plan_promotions(session, classroom_ids=None, pass_mark=None):
+    """Decide promote/repeat/graduate for every active student not yet processed for ``session``.
+
+    A student whose average over all of the session's term summaries reaches
+    ``pass_mark`` moves to the classroom with the same arm name at the next
+    ClassLevel (by ``order``), or graduates from the last level. Students
+    without results, below the mark or with no classroom to move into repeat.
+    Nothing is written; pass the decisions to apply_promotions.
+    """
+    if pass_mark is None:
+        pass_mark = settings.PROMOTION_PASS_MARK
+
+    students = (
+        Student.objects.filter(status='active', current_class__isnull=False)
+        .exclude(class_history__session=session)
+        .select_related('current_class__class_level')
+        .order_by('current_class__class_level__order', 'current_class__name', 'last_name', 'first_name')
+    )
+    if classroom_ids:
+        students = students.filter(current_class_id__in=classroom_ids)
+
+    next_levels = _next_levels()
+    classrooms = _target_classrooms()
+    averages = _session_averages(session, students)
+
+    decisions = []
+    for student in students:
+        current = student.current_class
+        average = averages.get(student.id)
+        next_level = next_levels.get(current.class_level_id)
+        target = None
+
+        if average is None:
+            action, reason = 'repeat', 'No results this session'
+        elif average < pass_mark:
+            action, reason = 'repeat', f'Average below {pass_mark}'
+        elif next_level is None:
+            action, reason = 'graduate', 'Completed final class'
+        else:
+            rooms = classrooms.get(next_level.id, {})
+            target = rooms.get(current.name) or next(iter(rooms.values()), None)
+            if target is None:
+                action, reason = 'repeat', f'No classroom in {next_level.name}'
+            else:
+                action, reason = 'promote', ''
+
+        decisions.append({
+            'student': student,
+            'from_class': current,
+            'to_class': target,
+            'average': average,
+            'action': action,
+            'reason': reason,
+        })
+    return decisions
+
+
+def _batches(ids):
+    for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+        yield ids[start:start + UPDATE_BATCH_SIZE]
+
+
+@transaction.atomic
+def apply_promotions(session, decisions):
+    """Write the class history and class/status changes for planned decisions; returns counts per action.
+
+    History rows are upserted in bulk and students are moved with one UPDATE
+    per target classroom, so signals do not fire and the dashboard and
+    student chart caches are invalidated here instead.
+    """
+    StudentClassHistory.objects.bulk_create(
+        [
+            StudentClassHistory(
+                student=d['student'],
+                classroom=d['from_class'],
+                session=session,
+                promoted=d['action'] in ('promote', 'graduate'),
+            )
+            for d in decisions
+        ],
+        update_conflicts=True,
+        unique_fields=['student', 'session'],
+        update_fields=['classroom', 'promoted'],
+        batch_size=UPDATE_BATCH_SIZE,
+    )
+
+    moves = defaultdict(list)
+    graduates = []
+    for d in decisions:
+        if d['action'] == 'promote':
+            moves[d['to_class'].id].append(d['student'].id)
+        elif d['action'] == 'graduate':
+            graduates.append(d['student'].id)
+
+    for classroom_id, student_ids in moves.items():
+        for batch in _batches(student_ids):
+            Student.objects.filter(pk__in=batch).update(current_class_id=classroom_id)
+    for batch in _batches(graduates):
+        Student.objects.filter(pk__in=batch).update(status='graduated')
+
+    if moves or graduates:
+        invalidate_dashboard_snapshot()
+        invalidate_chart('students')
+    return Counter(d['action'] for d in decisions)
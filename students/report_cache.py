@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from django.conf import settings
+from core.background import run_in_background
+
+# Bump whenever report_card_elements changes what a rendered card looks like.
+REPORT_CARD_VERSION = 1
+
+
+def cache_dir():
+    return Path(settings.REPORT_CARD_CACHE_DIR)
+
+
+def report_card_key(payload):
+    """SHA-256 of everything printed on the card plus the layout version"""
+    document = json.dumps({'version': REPORT_CARD_VERSION, 'payload': payload}, sort_keys=True)
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def lookup(payload):
+    """Path of the cached PDF for ``payload``, or None; a hit refreshes its age"""
+    path = cache_dir() / f'{report_card_key(payload)}.pdf'
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def read(path):
+    """Bytes of a cached PDF, or None if a prune removed it since lookup()"""
+    try:
+        return Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def store(payload, pdf):
+    """Atomically write rendered PDF bytes into the cache and return the path"""
+    directory = cache_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{report_card_key(payload)}.pdf'
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as handle:
+        handle.write(pdf)
+    os.replace(handle.name, path)
+    return path
+
+
+def schedule_prune():
+    run_in_background(prune_report_card_cache)
+
+
+def get_or_render(payload, render):
+    """PDF bytes of a cached report card, rendering and storing it with ``render`` on a miss.
+
+    The bytes are read straight away, so a prune running concurrently
+    just turns the hit into a miss instead of failing the caller.
+    """
+    path = lookup(payload)
+    pdf = read(path) if path is not None else None
+    if pdf is None:
+        pdf = render(payload)
+        store(payload, pdf)
+        schedule_prune()
+    return pdf
+
+
+def prune_report_card_cache(max_age=None, max_size=None):
+    """Evict cached PDFs older than ``max_age`` seconds, then the least recently used until under ``max_size`` bytes.
+
+    Returns ``(removed, remaining_bytes)``.
+    """
+    max_age = settings.REPORT_CARD_CACHE_MAX_AGE if max_age is None else max_age
+    max_size = settings.REPORT_CARD_CACHE_MAX_SIZE if max_size is None else max_size
+    directory = cache_dir()
+    if not directory.exists():
+        return 0, 0
+
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith('.pdf'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+
+    cutoff = time.time() - max_age
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed, total
@@ -0,0 +1,245 @@
+import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import groupby
+from django.conf import settings
+from django.db.models import Count
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Flowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from . import report_cache
+from .models import Result, StudentTermSummary
+
+
+def _payload(student, classroom, session, term, results, summary, class_size):
+    if summary:
+        total_score, average = summary.total, summary.average
+    else:
+        total_score = sum(r.total for r in results)
+        average = total_score / len(results)
+
+    return {
+        'student_name': student.full_name,
+        'admission_number': student.admission_number,
+        'classroom': str(classroom),
+        'session': session.name,
+        'term': term.name,
+        'rows': [
+            [r.subject.name, str(r.ca_score), str(r.exam_score), str(r.total), r.grade, r.remark]
+            for r in results
+        ],
+        'total': str(total_score),
+        'average': f'{average:.2f}',
+        'position': f'{summary.position} of {class_size}' if summary and summary.position else None,
+    }
+
+
+def student_report_payload(student, session, term):
+    """Plain-data report card for one student, or None when there are no results.
+
+    A student who changed class mid-term can have results in two
+    classrooms; the card covers the one holding most of them (the current
+    class on a tie), so its rows, total, average and position agree.
+    """
+    counts = dict(
+        Result.objects.filter(student=student, session=session, term=term)
+        .values_list('classroom_id').annotate(count=Count('id')).order_by()
+    )
+    if not counts:
+        return None
+
+    classroom_id = max(counts, key=lambda pk: (counts[pk], pk == student.current_class_id))
+    results = list(
+        Result.objects.filter(student=student, session=session, term=term, classroom_id=classroom_id)
+        .select_related('subject', 'classroom__class_level').order_by('subject__name')
+    )
+    summary = StudentTermSummary.objects.filter(student=student, session=session, term=term, classroom_id=classroom_id).first()
+    class_size = None
+    if summary and summary.position:
+        class_size = StudentTermSummary.objects.filter(classroom_id=classroom_id, session=session, term=term).count()
+    return _payload(student, results[0].classroom, session, term, results, summary, class_size)
+
+
+def class_report_payloads(classroom, session, term):
+    """Report cards for every student with results in a class, from two queries"""
+    summaries = {
+        s.student_id: s
+        for s in StudentTermSummary.objects.filter(classroom=classroom, session=session, term=term)
+    }
+    results = (
+        Result.objects.filter(classroom=classroom, session=session, term=term)
+        .select_related('subject', 'student')
+        .order_by('student__last_name', 'student__first_name', 'student_id', 'subject__name')
+    )
+    payloads = []
+    for student_id, rows in groupby(results, key=lambda r: r.student_id):
+        rows = list(rows)
+        payloads.append(_payload(rows[0].student, classroom, session, term, rows, summaries.get(student_id), len(summaries)))
+    return payloads
+
+
+def report_card_elements(payload):
+    """Flowables for one report card"""
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'Title',
+        parent=styles['Heading1'],
+        alignment=TA_CENTER,
+        fontSize=16,
+        spaceAfter=6
+    )
+    subtitle_style = ParagraphStyle(
+        'Subtitle',
+        parent=styles['Normal'],
+        alignment=TA_CENTER,
+        fontSize=12,
+        spaceAfter=20
+    )
+
+    elements = []
+
+    elements.append(Paragraph("SCHOOL MANAGEMENT SYSTEM", title_style))
+    elements.append(Paragraph("Student Report Card", subtitle_style))
+    elements.append(Spacer(1, 0.2*inch))
+
+    info_data = [
+        ['Student Name:', payload['student_name'], 'Admission No:', payload['admission_number']],
+        ['Class:', payload['classroom'], 'Session:', payload['session']],
+        ['Term:', payload['term'], '', ''],
+    ]
+
+    info_table = Table(info_data, colWidths=[1.2*inch, 2*inch, 1.2*inch, 2*inch])
+    info_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    elements.append(info_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    result_data = [['Subject', 'CA (40)', 'Exam (60)', 'Total (100)', 'Grade', 'Remark']]
+    result_data.extend(payload['rows'])
+    result_data.append(['', '', '', '', '', ''])
+    result_data.append(['Total', '', '', payload['total'], '', ''])
+    result_data.append(['Average', '', '', payload['average'], '', ''])
+    if payload['position']:
+        result_data.append(['Position', '', '', payload['position'], '', ''])
+
+    result_table = Table(result_data, colWidths=[2*inch, 0.8*inch, 0.8*inch, 1*inch, 0.7*inch, 1*inch])
+    result_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a365d')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('FONTNAME', (0, len(payload['rows']) + 2), (0, -1), 'Helvetica-Bold'),
+    ]))
+    elements.append(result_table)
+    elements.append(Spacer(1, 0.5*inch))
+
+    signature_data = [
+        ['Class Teacher:', '_________________', "Principal's Signature:", '_________________'],
+    ]
+    sig_table = Table(signature_data, colWidths=[1.2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+    sig_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('TOPPADDING', (0, 0), (-1, -1), 30),
+    ]))
+    elements.append(sig_table)
+    return elements
+
+
+def _document(buffer):
+    return SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+
+
+def render_report_card(payload):
+    """Render one report card payload to PDF bytes; picklable for process pools"""
+    buffer = io.BytesIO()
+    _document(buffer).build(report_card_elements(payload))
+    return buffer.getvalue()
+
+
+def report_card_filename(payload):
+    return f"result_{payload['admission_number']}_{payload['term']}.pdf"
+
+
+class _Progress(Flowable):
+    """Zero-size flowable that reports progress once the card before it has been laid out"""
+
+    def __init__(self, callback, done, total):
+        super().__init__()
+        self.callback, self.done, self.total = callback, done, total
+
+    def wrap(self, available_width, available_height):
+        return 0, 0
+
+    def draw(self):
+        self.callback(self.done, self.total)
+
+
+def render_merged_report_cards(payloads, output, progress=None):
+    """Render every card into one PDF document written to ``output``, one card per page.
+
+    A single document keeps one set of fonts and resources for the whole
+    class, which is what makes it worth printing; it is built in-process.
+    """
+    total = len(payloads)
+    elements = []
+    for done, payload in enumerate(payloads, start=1):
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(report_card_elements(payload))
+        if progress:
+            elements.append(_Progress(progress, done, total))
+    _document(output).build(elements)
+
+
+def render_report_card_zip(payloads, output, workers=None, progress=None):
+    """Write a ZIP of per-student PDFs to ``output``.
+
+    Cards already in the report-card cache are reused; the rest are rendered
+    across a process pool once the batch reaches REPORT_CARD_POOL_THRESHOLD
+    and stored in the cache as they arrive. A cached card pruned between
+    lookup and writing is rendered again in-process.
+    """
+    total = len(payloads)
+    if workers is None:
+        workers = settings.REPORT_CARD_WORKERS
+    cached = [report_cache.lookup(payload) for payload in payloads]
+    missing = [payload for payload, path in zip(payloads, cached) if path is None]
+    use_pool = len(missing) >= settings.REPORT_CARD_POOL_THRESHOLD and workers != 1
+
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive, ExitStack() as stack:
+        if use_pool:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            rendered = pool.map(render_report_card, missing, chunksize=8)
+        else:
+            rendered = map(render_report_card, missing)
+
+        pruned = False
+        for done, (payload, path) in enumerate(zip(payloads, cached), start=1):
+            pdf = report_cache.read(path) if path is not None else None
+            if pdf is None:
+                if path is None:
+                    pdf = next(rendered)
+                else:  # pruned since lookup()
+                    pdf, pruned = render_report_card(payload), True
+                report_cache.store(payload, pdf)
+            archive.writestr(report_card_filename(payload), pdf)
+            if progress:
+                progress(done, total)
+
+    if missing or pruned:
+        report_cache.schedule_prune()
@@ -0,0 +1,69 @@
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+from core.charts import invalidate_chart
+from .models import GRADE_REMARKS, Result, grade_for_total
+from .summaries import refresh_term_summaries
+
+RESULT_UNIQUE_FIELDS = ['student', 'subject', 'session', 'term']
+RESULT_UPDATE_FIELDS = ['classroom', 'ca_score', 'exam_score', 'total', 'grade', 'remark', 'recorded_by', 'updated_at']
+
+
+def parse_score(value):
+    try:
+        return Decimal(value) if value else Decimal(0)
+    except Exception:
+        return Decimal(0)
+
+
+@transaction.atomic
+def save_class_results(classroom_id, subject_id, session_id, term_id, scores, recorded_by=None):
+    """Upsert one subject's results for a whole class.
+
+    ``scores`` maps student id to a ``(ca_score, exam_score)`` pair. Existing
+    rows are fetched in one query so unchanged scores are skipped, totals and
+    grades are computed in memory and everything else is written with a
+    single ``INSERT ... ON CONFLICT DO UPDATE``. Bulk writes bypass the Result
+    signals, so term summaries and the performance chart are refreshed here.
+    Returns the number of rows written.
+    """
+    classroom_id = int(classroom_id)
+    existing = {
+        r.student_id: r
+        for r in Result.objects.filter(student_id__in=scores, subject_id=subject_id, session_id=session_id, term_id=term_id)
+        .only('student_id', 'classroom_id', 'ca_score', 'exam_score')
+    }
+
+    now = timezone.now()
+    rows = []
+    for student_id, (ca_score, exam_score) in scores.items():
+        current = existing.get(student_id)
+        if current and (current.classroom_id, current.ca_score, current.exam_score) == (classroom_id, ca_score, exam_score):
+            continue
+        total = ca_score + exam_score
+        grade = grade_for_total(total)
+        rows.append(Result(
+            student_id=student_id,
+            subject_id=subject_id,
+            classroom_id=classroom_id,
+            session_id=session_id,
+            term_id=term_id,
+            ca_score=ca_score,
+            exam_score=exam_score,
+            total=total,
+            grade=grade,
+            remark=GRADE_REMARKS[grade],
+            recorded_by=recorded_by,
+            updated_at=now,
+        ))
+
+    if rows:
+        Result.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=RESULT_UNIQUE_FIELDS,
+            update_fields=RESULT_UPDATE_FIELDS,
+        )
+        refresh_term_summaries([row.student_id for row in rows], session_id, term_id)
+        invalidate_chart('performance')
+    return len(rows)
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Result
+from .profile import invalidate_student_profiles
+from .summaries import refresh_term_summaries
+
+PROFILE_SOURCES = [
+    'attendance.StudentAttendance',
+    'finance.Invoice',
+    'library.BookIssue',
+    'cbt.ExamAttempt',
+    'students.StudentTermSummary',
+]
+
+
+@receiver([post_save, post_delete], sender=Result)
+def update_term_summary(sender, instance, **kwargs):
+    refresh_term_summaries([instance.student_id], instance.session_id, instance.term_id)
+
+
+def _invalidate_profile(sender, instance, **kwargs):
+    invalidate_student_profiles([instance.student_id])
+
+
+for label in PROFILE_SOURCES:
+    model = apps.get_model(label)
+    post_save.connect(_invalidate_profile, sender=model, dispatch_uid=f'students-profile-save-{label}')
+    post_delete.connect(_invalidate_profile, sender=model, dispatch_uid=f'students-profile-delete-{label}')
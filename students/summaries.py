@@ -0,0 +1,94 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum, Count
+from django.utils import timezone
+from .models import Result, StudentTermSummary
+from .profile import invalidate_student_profiles
+
+
+def rank_class(classroom_id, session_id, term_id):
+    """Assign competition-style positions (1, 2, 2, 4) within a class for a term"""
+    summaries = list(
+        StudentTermSummary.objects.filter(classroom_id=classroom_id, session_id=session_id, term_id=term_id)
+        .only('id', 'student_id', 'total', 'position')
+        .order_by('-total')
+    )
+    changed = []
+    previous_total = None
+    position = 0
+    for index, summary in enumerate(summaries, start=1):
+        if summary.total != previous_total:
+            position = index
+            previous_total = summary.total
+        if summary.position != position:
+            summary.position = position
+            changed.append(summary)
+    StudentTermSummary.objects.bulk_update(changed, ['position'])
+    invalidate_student_profiles(s.student_id for s in changed)
+
+
+@transaction.atomic
+def refresh_term_summaries(student_ids, session_id, term_id):
+    """Recompute the term summaries of the given students from their Result rows.
+
+    One grouped query covers every student, so this is cheap enough to run
+    after a single result is saved or after a whole class sheet is written.
+    Positions are re-ranked for every class the students' summaries touch.
+    """
+    student_ids = set(student_ids)
+    aggregates = (
+        Result.objects.filter(student_id__in=student_ids, session_id=session_id, term_id=term_id)
+        .values('student_id', 'classroom_id')
+        .annotate(total_score=Sum('total'), subjects=Count('id'))
+    )
+    existing = {
+        (s.student_id, s.classroom_id): s
+        for s in StudentTermSummary.objects.filter(student_id__in=student_ids, session_id=session_id, term_id=term_id)
+    }
+
+    to_create, to_update = [], []
+    classrooms = {classroom_id for _, classroom_id in existing}
+    for row in aggregates:
+        key = (row['student_id'], row['classroom_id'])
+        total = row['total_score'] or Decimal(0)
+        average = (total / row['subjects']).quantize(Decimal('0.01'))
+        summary = existing.pop(key, None)
+        if summary is None:
+            to_create.append(StudentTermSummary(
+                student_id=row['student_id'],
+                classroom_id=row['classroom_id'],
+                session_id=session_id,
+                term_id=term_id,
+                total=total,
+                average=average,
+                subject_count=row['subjects'],
+            ))
+        elif (summary.total, summary.average, summary.subject_count) != (total, average, row['subjects']):
+            summary.total, summary.average, summary.subject_count = total, average, row['subjects']
+            summary.updated_at = timezone.now()
+            to_update.append(summary)
+        classrooms.add(row['classroom_id'])
+
+    StudentTermSummary.objects.bulk_create(to_create)
+    StudentTermSummary.objects.bulk_update(to_update, ['total', 'average', 'subject_count', 'updated_at'])
+    if existing:
+        StudentTermSummary.objects.filter(pk__in=[s.pk for s in existing.values()]).delete()
+    invalidate_student_profiles(student_ids)
+
+    for classroom_id in classrooms:
+        rank_class(classroom_id, session_id, term_id)
+
+
+def rebuild_term_summaries(session_id=None, term_id=None):
+    """Rebuild every summary (optionally for one session/term) from scratch"""
+    results = Result.objects.all()
+    if session_id:
+        results = results.filter(session_id=session_id)
+    if term_id:
+        results = results.filter(term_id=term_id)
+
+    periods = list(results.values_list('session_id', 'term_id').distinct())
+    for period_session_id, period_term_id in periods:
+        student_ids = results.filter(session_id=period_session_id, term_id=period_term_id).values_list('student_id', flat=True).distinct()
+        refresh_term_summaries(student_ids, period_session_id, period_term_id)
+    return len(periods)
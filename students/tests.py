@@ -1,3 +1,337 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from core.models import AcademicSession, ClassLevel, ClassRoom, Subject, Term
+from . import report_cache
+from .broadsheet import class_broadsheet
+from .grading import competition_ranks, grade_term
+from .importer import ImportFileError, import_students
+from .models import Result, Student, StudentClassHistory, StudentTermSummary
+from .promotion import apply_promotions, plan_promotions
+from .reports import student_report_payload
 
-# Create your tests here.
+
+class StudentsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.session = AcademicSession.objects.create(name='2025/2026', start_date=date(2025, 9, 1), end_date=date(2026, 7, 31), is_current=True)
+        cls.term = Term.objects.create(name='First', session=cls.session, start_date=date(2025, 9, 1), end_date=date(2025, 12, 15), is_current=True)
+        cls.level = ClassLevel.objects.create(name='JSS1', order=1)
+        cls.classroom = ClassRoom.objects.create(name='A', class_level=cls.level)
+        cls.maths = Subject.objects.create(name='Mathematics', code='MTH')
+        cls.english = Subject.objects.create(name='English', code='ENG')
+        cls.students = [cls.make_student(f'ADM{i:03d}', cls.classroom) for i in range(3)]
+        cls.user = User.objects.create_superuser('registrar', 'registrar@school.edu', 'password')
+
+    @classmethod
+    def make_student(cls, admission_number, classroom, **kwargs):
+        return Student.objects.create(
+            admission_number=admission_number, first_name=f'First{admission_number}', last_name=f'Last{admission_number}',
+            gender='F', date_of_birth=date(2012, 1, 1), admission_date=date(2024, 9, 1), current_class=classroom, **kwargs,
+        )
+
+    def make_result(self, student, subject, ca, exam, classroom=None, term=None):
+        return Result.objects.create(
+            student=student, subject=subject, classroom=classroom or self.classroom, session=self.session,
+            term=term or self.term, ca_score=ca, exam_score=exam,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+
+class StudentListApiTests(StudentsTestCase):
+    def test_filters_by_class_and_rejects_bad_input(self):
+        other = ClassRoom.objects.create(name='B', class_level=self.level)
+        self.make_student('ADM900', other)
+
+        response = self.client.get('/students/api/list/', {'class': self.classroom.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['admission_number'] for row in response.json()['results']}, {'ADM000', 'ADM001', 'ADM002'})
+
+        self.assertEqual(self.client.get('/students/api/list/', {'class': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get('/students/api/list/', {'cursor': 'garbage'}).status_code, 400)
+
+
+class BroadsheetTests(StudentsTestCase):
+    def test_subjects_sharing_a_name_stay_separate(self):
+        further = Subject.objects.create(name='Mathematics', code='FMT')
+        self.make_result(self.students[0], self.maths, 30, 50)
+        self.make_result(self.students[0], further, 20, 20)
+        self.make_result(self.students[1], self.maths, 35, 55)
+        self.make_result(self.students[1], self.english, 10, 10)
+
+        sheet = class_broadsheet(self.classroom, self.session, self.term)
+        self.assertEqual(list(sheet.columns), ['Admission No', 'Student', 'English', 'Mathematics (FMT)', 'Mathematics (MTH)', 'Total', 'Average', 'Position'])
+        first = sheet.set_index('Admission No').loc['ADM000']
+        self.assertEqual((first['Mathematics (MTH)'], first['Mathematics (FMT)'], first['Total'], first['Average']), (80, 40, 120, 60))
+        self.assertEqual(list(sheet['Position']), [1, 2])
+
+    def test_view_rejects_bad_ids(self):
+        self.make_result(self.students[0], self.maths, 30, 50)
+        params = {'class': self.classroom.pk, 'session': self.session.pk, 'term': self.term.pk}
+
+        response = self.client.get('/students/results/broadsheet/', params)
+        self.assertEqual(response.context['headers'], ['Admission No', 'Student', 'Mathematics', 'Total', 'Average', 'Position'])
+        for name in params:
+            response = self.client.get('/students/results/broadsheet/', {**params, name: 'abc'})
+            self.assertRedirects(response, '/students/results/broadsheet/', fetch_redirect_response=False)
+        self.assertEqual(self.client.get('/students/results/broadsheet/', {**params, 'session': 9999}).status_code, 404)
+
+
+class PrintClassResultsTests(StudentsTestCase):
+    def test_prints_class_and_rejects_bad_ids(self):
+        self.make_result(self.students[0], self.maths, 30, 50)
+        params = {'class': self.classroom.pk, 'session': self.session.pk, 'term': self.term.pk}
+
+        response = self.client.get('/students/results/print/', params)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        for name in params:
+            response = self.client.get('/students/results/print/', {**params, name: 'x'})
+            self.assertRedirects(response, '/students/results/', fetch_redirect_response=False)
+        self.assertEqual(self.client.get('/students/results/print/', {**params, 'term': 9999}).status_code, 404)
+
+
+class PromotionTests(StudentsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.final = ClassLevel.objects.create(name='JSS2', order=2)
+        self.next_room = ClassRoom.objects.create(name='A', class_level=self.final)
+        self.leaver = self.make_student('ADM100', self.next_room)
+        for student, total in ((self.students[0], 120), (self.students[1], 60), (self.leaver, 140)):
+            StudentTermSummary.objects.create(
+                student=student, classroom=student.current_class, session=self.session, term=self.term,
+                total=total, average=total / 2, subject_count=2,
+            )
+
+    def test_decisions_move_exactly_the_planned_students(self):
+        decisions = plan_promotions(self.session, pass_mark=40)
+        self.assertEqual(
+            {d['student'].admission_number: (d['action'], d['to_class']) for d in decisions},
+            {'ADM000': ('promote', self.next_room), 'ADM001': ('repeat', None), 'ADM002': ('repeat', None), 'ADM100': ('graduate', None)},
+        )
+
+        counts = apply_promotions(self.session, decisions)
+        self.assertEqual(counts, {'promote': 1, 'repeat': 2, 'graduate': 1})
+        self.assertEqual(
+            dict(Student.objects.values_list('admission_number', 'current_class_id')),
+            {'ADM000': self.next_room.pk, 'ADM001': self.classroom.pk, 'ADM002': self.classroom.pk, 'ADM100': self.next_room.pk},
+        )
+        self.assertEqual(list(Student.objects.filter(status='graduated').values_list('admission_number', flat=True)), ['ADM100'])
+        self.assertEqual(
+            dict(StudentClassHistory.objects.values_list('student__admission_number', 'promoted')),
+            {'ADM000': True, 'ADM001': False, 'ADM002': False, 'ADM100': True},
+        )
+        self.assertEqual(plan_promotions(self.session, pass_mark=40), [])
+
+    def test_rerunning_a_session_upserts_history(self):
+        decisions = plan_promotions(self.session, classroom_ids=[self.classroom.pk], pass_mark=40)
+        apply_promotions(self.session, decisions)
+        for decision in decisions:
+            decision['action'] = 'repeat'
+        apply_promotions(self.session, decisions)
+
+        self.assertEqual(StudentClassHistory.objects.count(), 3)
+        self.assertFalse(StudentClassHistory.objects.filter(promoted=True).exists())
+        self.assertEqual(StudentClassHistory.objects.filter(classroom=self.classroom).count(), 3)
+
+    def test_view_rejects_bad_ids(self):
+        for params in ({'session': 'abc'}, {'class': 'abc'}):
+            response = self.client.get('/students/promotion/', params)
+            self.assertRedirects(response, '/students/promotion/', fetch_redirect_response=False)
+            response = self.client.post('/students/promotion/', params)
+            self.assertRedirects(response, '/students/promotion/', fetch_redirect_response=False)
+        self.assertFalse(StudentClassHistory.objects.exists())
+
+        response = self.client.post('/students/promotion/', {'session': self.session.pk, 'class': self.classroom.pk})
+        self.assertRedirects(response, f'/students/promotion/?session={self.session.pk}', fetch_redirect_response=False)
+        self.assertEqual(StudentClassHistory.objects.count(), 3)
+
+
+class ReportCardCacheTests(StudentsTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(REPORT_CARD_CACHE_DIR=directory.name))
+        for student in self.students[:2]:
+            self.make_result(student, self.maths, 30, 50)
+
+    def test_cache_lives_outside_media_root(self):
+        with override_settings(REPORT_CARD_CACHE_DIR=settings.BASE_DIR / 'var' / 'report_cards'):
+            self.assertFalse(report_cache.cache_dir().resolve().is_relative_to(Path(settings.MEDIA_ROOT).resolve()))
+
+    def prune_after_lookup(self):
+        lookup = report_cache.lookup
+
+        def pruning_lookup(payload):
+            path = lookup(payload)
+            if path is not None:
+                os.remove(path)
+            return path
+        return mock.patch('students.report_cache.lookup', side_effect=pruning_lookup)
+
+    def test_pruned_card_is_rendered_again(self):
+        url = f'/students/{self.students[0].pk}/results/print/'
+        params = {'session': self.session.pk, 'term': self.term.pk}
+        first = b''.join(self.client.get(url, params).streaming_content)
+        self.assertEqual(len(os.listdir(report_cache.cache_dir())), 1)
+
+        with self.prune_after_lookup():
+            second = b''.join(self.client.get(url, params).streaming_content)
+        self.assertTrue(second.startswith(b'%PDF'))
+        self.assertEqual(len(first), len(second))
+
+    def test_zip_survives_a_concurrent_prune(self):
+        params = {'class': self.classroom.pk, 'session': self.session.pk, 'term': self.term.pk, 'format': 'zip'}
+        b''.join(self.client.get('/students/results/print/', params).streaming_content)
+        self.assertEqual(len(os.listdir(report_cache.cache_dir())), 2)
+
+        with self.prune_after_lookup():
+            response = self.client.get('/students/results/print/', params)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(sorted(archive.namelist()), ['result_ADM000_First.pdf', 'result_ADM001_First.pdf'])
+        self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in archive.namelist()))
+
+
+class StudentReportPayloadTests(StudentsTestCase):
+    def test_card_sticks_to_one_classroom(self):
+        other = ClassRoom.objects.create(name='B', class_level=self.level)
+        history = Subject.objects.create(name='History', code='HIS')
+        student = self.students[0]
+        self.make_result(student, self.maths, 30, 50)
+        self.make_result(student, self.english, 20, 40)
+        self.make_result(student, history, 35, 60, classroom=other)
+        self.make_result(self.students[1], self.maths, 40, 55)
+        grade_term(self.session.pk, self.term.pk)
+
+        payload = student_report_payload(student, self.session, self.term)
+        self.assertEqual(payload['classroom'], 'JSS1 - A')
+        self.assertEqual([row[0] for row in payload['rows']], ['English', 'Mathematics'])
+        self.assertEqual((payload['total'], payload['average'], payload['position']), ('140.00', '70.00', '1 of 2'))
+        self.assertIsNone(student_report_payload(self.students[2], self.session, self.term))
+
+
+class GradingTests(StudentsTestCase):
+    def test_competition_ranks_ties_and_missing_scores(self):
+        matrix = np.array([
+            [90.0, np.nan],
+            [80.0, 50.0],
+            [80.0, 70.0],
+            [60.0, 50.0],
+        ])
+        self.assertEqual(competition_ranks(matrix).tolist(), [[1, 0], [2, 2], [2, 1], [4, 2]])
+
+    def test_grade_term_ranks_and_summarises(self):
+        first, second, third = self.students
+        self.make_result(first, self.maths, 35, 45)     # 80
+        self.make_result(second, self.maths, 30, 50)    # 80
+        self.make_result(third, self.maths, 20, 19.5)   # 39.5
+        self.make_result(first, self.english, 20, 30)   # 50
+        self.make_result(third, self.english, 30, 40)   # 70; second sat no English
+
+        self.assertEqual(grade_term(self.session.pk, self.term.pk), (1, 5))
+
+        maths = {r.student_id: r for r in Result.objects.filter(subject=self.maths)}
+        self.assertEqual([maths[s.pk].subject_position for s in self.students], [1, 1, 3])
+        self.assertEqual([maths[s.pk].grade for s in self.students], ['A', 'A', 'F'])
+        self.assertEqual(
+            (maths[first.pk].class_average, maths[first.pk].class_highest, maths[first.pk].class_lowest),
+            (Decimal('66.50'), Decimal('80.00'), Decimal('39.50')),
+        )
+        english = {r.student_id: r for r in Result.objects.filter(subject=self.english)}
+        self.assertEqual((english[third.pk].subject_position, english[first.pk].subject_position), (1, 2))
+        self.assertEqual(english[first.pk].class_average, Decimal('60.00'))
+
+        summaries = {s.student_id: s for s in StudentTermSummary.objects.all()}
+        self.assertEqual(
+            [(summaries[s.pk].total, summaries[s.pk].average, summaries[s.pk].subject_count, summaries[s.pk].position) for s in self.students],
+            [
+                (Decimal('130.00'), Decimal('65.00'), 2, 1),
+                (Decimal('80.00'), Decimal('80.00'), 1, 3),
+                (Decimal('109.50'), Decimal('54.75'), 2, 2),
+            ],
+        )
+
+    def test_regrading_upserts_summaries(self):
+        self.make_result(self.students[0], self.maths, 30, 50)
+        stale = self.make_result(self.students[1], self.maths, 30, 40)
+        grade_term(self.session.pk, self.term.pk)
+        Result.objects.filter(pk=stale.pk).delete()
+        Result.objects.filter(student=self.students[0]).update(exam_score=20)
+
+        grade_term(self.session.pk, self.term.pk, [self.classroom.pk])
+        summary = StudentTermSummary.objects.get()
+        self.assertEqual((summary.student, summary.total, summary.position), (self.students[0], Decimal('50.00'), 1))
+
+
+class StudentImportTests(StudentsTestCase):
+    def upload(self, text, name='students.csv'):
+        return SimpleUploadedFile(name, text.encode(), content_type='text/csv')
+
+    def test_report_covers_every_row(self):
+        upload = self.upload(
+            'Admission Number,First Name,Last Name,Gender,Date of Birth,Admission Date,Class\n'
+            'NEW001,Ada,Obi,F,2012-03-04,2025-09-01,JSS1 - A\n'
+            'NEW001,Bola,Ade,M,2012-05-06,2025-09-01,\n'
+            'ADM000,Chi,Eze,F,04/03/2012,01/09/2025,\n'
+            ',,Okoro,X,2012-13-01,2025-09-01,JSS9\n'
+            '\n'
+            'NEW002,Dayo,Obi,male,12-07-2012,2025-09-01,\n'
+        )
+        report, created = import_students(upload)
+
+        rows = {r['row']: r for r in report}
+        self.assertEqual(list(rows), [2, 3, 4, 5, 7])
+        self.assertEqual({number: r['status'] for number, r in rows.items()}, {2: 'created', 3: 'error', 4: 'error', 5: 'error', 7: 'created'})
+        self.assertEqual(rows[3]['errors'], 'duplicate admission_number in file')
+        self.assertEqual(rows[4]['errors'], 'admission_number already exists')
+        self.assertEqual(
+            rows[5]['errors'],
+            "first_name is required; unknown gender 'X'; date_of_birth must be YYYY-MM-DD or DD/MM/YYYY; unknown class 'JSS9'",
+        )
+        self.assertEqual((rows[2]['username'], rows[2]['password']), ('ada.obi', 'NEW001@2024'))
+        self.assertEqual((rows[3]['username'], rows[3]['password']), ('', ''))
+
+        self.assertEqual(sorted(student.admission_number for student in created), ['NEW001', 'NEW002'])
+        self.assertEqual(Student.objects.count(), 5)
+        ada = Student.objects.get(admission_number='NEW001')
+        self.assertEqual((ada.first_name, ada.current_class, ada.user.username), ('Ada', self.classroom, 'ada.obi'))
+        self.assertTrue(ada.user.check_password('NEW001@2024'))
+        self.assertEqual(Student.objects.get(admission_number='NEW002').gender, 'M')
+
+    def test_missing_required_columns_fail_every_row(self):
+        report, created = import_students(self.upload('admission_number,first_name\nNEW001,Ada\n'))
+        self.assertEqual(created, [])
+        self.assertEqual(
+            report[0]['errors'],
+            'last_name is required; gender is required; date_of_birth is required; admission_date is required',
+        )
+
+    def test_rejects_unknown_file_types(self):
+        with self.assertRaises(ImportFileError):
+            import_students(self.upload('x', name='students.txt'))
+
+        response = self.client.post('/students/import/', {'file': self.upload('x', name='students.txt')})
+        self.assertRedirects(response, '/students/import/', fetch_redirect_response=False)
+
+    def test_view_returns_report_csv(self):
+        response = self.client.post('/students/import/', {'file': self.upload(
+            'admission_number,first_name,last_name,gender,date_of_birth,admission_date\n'
+            'NEW001,Ada,Obi,F,2012-03-04,2025-09-01\n'
+            'ADM001,Bola,Ade,M,2012-05-06,2025-09-01\n'
+        )})
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0], 'row,status,admission_number,name,username,password,errors')
+        self.assertEqual(lines[1:], ['2,created,NEW001,Ada Obi,ada.obi,NEW001@2024,', '3,error,ADM001,Bola Ade,,,admission_number already exists'])
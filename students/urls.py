@@ -5,12 +5,20 @@ app_name = 'students'
 
 urlpatterns = [
     path('', views.student_list, name='student_list'),
+    path('api/list/', views.student_list_api, name='student_list_api'),
+    path('import/', views.student_import, name='student_import'),
+    path('id-cards/', views.generate_id_cards, name='generate_id_cards'),
     path('add/', views.student_add, name='student_add'),
     path('<int:pk>/', views.student_detail, name='student_detail'),
+    path('<int:pk>/profile/', views.student_profile, name='student_profile'),
     path('<int:pk>/edit/', views.student_edit, name='student_edit'),
     path('<int:pk>/delete/', views.student_delete, name='student_delete'),
     path('<int:pk>/id-card/', views.generate_id_card, name='generate_id_card'),
+    path('promotion/', views.promote_students, name='promote_students'),
     path('results/', views.results_dashboard, name='results_dashboard'),
+    path('results/process/', views.process_results, name='process_results'),
+    path('results/print/', views.print_class_results, name='print_class_results'),
+    path('results/broadsheet/', views.broadsheet, name='broadsheet'),
     path('results/mark/', views.mark_results, name='mark_results'),
     path('results/view/', views.view_results, name='view_results'),
     path('<int:pk>/results/', views.student_results, name='student_results'),
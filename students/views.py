@@ -1,45 +1,73 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.urls import reverse
 from django.db.models import Q, Avg, Sum
-from .models import Student, StudentClassHistory, Result
+from .models import Student, StudentClassHistory, Result, StudentTermSummary
+from . import report_cache
+from .broadsheet import class_broadsheet
+from .grading import grade_term
+from .profile import get_student_profile
+from .promotion import PROMOTION_ACTIONS, apply_promotions, plan_promotions
+from .reports import class_report_payloads, render_merged_report_cards, render_report_card, render_report_card_zip, student_report_payload
+from .results import parse_score, save_class_results
+from .importer import IMPORT_COLUMNS, REQUIRED_COLUMNS, ImportFileError, import_students, write_report
 from core.models import ClassRoom, ClassLevel, Subject, AcademicSession, Term
+from core import search
+from core.idcards import draw_student_card, qr_path, render_card_sheets
+from core.qrcodes import render_qr_png, schedule_qr_code, store_qr_code
+from core.pagination import InvalidCursor, get_page_size, keyset_page
 from teachers.models import Teacher
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch, cm
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
-from decimal import Decimal
+from reportlab.lib.units import inch
+from datetime import date
+import csv
 import io
+import tempfile
 import uuid
 
 
-@login_required
-def student_list(request):
+STUDENT_LIST_ORDERING = ['last_name', 'id']
+STUDENT_LIST_FIELDS = [
+    'id', 'admission_number', 'first_name', 'last_name', 'other_name', 'gender', 'status', 'photo', 'phone',
+    'current_class__name', 'current_class__class_level__name',
+]
+
+
+def _filtered_students(request):
     query = request.GET.get('q', '')
     class_filter = request.GET.get('class', '')
     status_filter = request.GET.get('status', 'active')
     
-    students = Student.objects.all()
+    students = Student.objects.select_related('current_class__class_level').only(*STUDENT_LIST_FIELDS)
     
     if query:
-        students = students.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(admission_number__icontains=query)
-        )
+        students = search.filter_queryset(students, 'student', query)
     
-    if class_filter:
+    if class_filter.isdigit():
         students = students.filter(current_class_id=class_filter)
     
     if status_filter:
         students = students.filter(status=status_filter)
     
-    classrooms = ClassRoom.objects.all()
+    return students, query, class_filter, status_filter
+
+
+@login_required
+def student_list(request):
+    students, query, class_filter, status_filter = _filtered_students(request)
+    page_size = get_page_size(request, settings.STUDENT_LIST_PAGE_SIZE)
+    cursor = request.GET.get('cursor')
+    
+    try:
+        students, next_cursor = keyset_page(students, STUDENT_LIST_ORDERING, cursor, page_size)
+    except InvalidCursor:
+        students, next_cursor = keyset_page(students, STUDENT_LIST_ORDERING, None, page_size)
+    
+    classrooms = ClassRoom.objects.select_related('class_level')
     
     context = {
         'students': students,
@@ -47,10 +75,40 @@ def student_list(request):
         'query': query,
         'class_filter': class_filter,
         'status_filter': status_filter,
+        'next_cursor': next_cursor,
+        'page_size': page_size,
+        'is_first_page': not cursor,
     }
     return render(request, 'students/student_list.html', context)
 
 
+@login_required
+def student_list_api(request):
+    students, _, class_filter, _ = _filtered_students(request)
+    if class_filter and not class_filter.isdigit():
+        return JsonResponse({'status': 'error', 'message': 'Invalid class'}, status=400)
+    page_size = get_page_size(request, settings.STUDENT_LIST_PAGE_SIZE)
+    
+    try:
+        students, next_cursor = keyset_page(students, STUDENT_LIST_ORDERING, request.GET.get('cursor'), page_size)
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+    
+    data = [{
+        'id': s.id,
+        'admission_number': s.admission_number,
+        'full_name': s.full_name,
+        'other_name': s.other_name,
+        'gender': s.get_gender_display(),
+        'status': s.get_status_display(),
+        'phone': s.phone,
+        'current_class': str(s.current_class) if s.current_class else None,
+        'photo': s.photo.url if s.photo else None,
+        'url': reverse('students:student_detail', args=[s.id]),
+    } for s in students]
+    return JsonResponse({'results': data, 'next_cursor': next_cursor})
+
+
 @login_required
 def student_detail(request, pk):
     student = get_object_or_404(Student, pk=pk)
@@ -61,6 +119,16 @@ def student_detail(request, pk):
     })
 
 
+@login_required
+def student_profile(request, pk):
+    student = get_object_or_404(Student.objects.select_related('current_class__class_level'), pk=pk)
+    return render(request, 'students/student_profile.html', {
+        'student': student,
+        'profile': get_student_profile(student),
+        'class_history': student.class_history.select_related('classroom__class_level', 'session').order_by('-session__start_date'),
+    })
+
+
 @login_required
 def student_add(request):
     from django.contrib.auth.models import User
@@ -95,8 +163,7 @@ def student_add(request):
             student.photo = request.FILES['photo']
         
         student.save()
-        student.generate_qr_code()
-        student.save()
+        schedule_qr_code(student)
         
         try:
             username = f"{first_name.lower()}.{last_name.lower()}"
@@ -121,6 +188,32 @@ def student_add(request):
     return render(request, 'students/student_form.html', {'classrooms': classrooms})
 
 
+@login_required
+def student_import(request):
+    if request.GET.get('template'):
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="student_import_template.csv"'
+        csv.writer(response).writerow(IMPORT_COLUMNS)
+        return response
+    
+    if request.method == 'POST' and 'file' in request.FILES:
+        try:
+            report, created = import_students(request.FILES['file'])
+        except ImportFileError as e:
+            messages.error(request, str(e))
+            return redirect('students:student_import')
+        
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="student_import_report_{date.today():%Y%m%d}.csv"'
+        write_report(report, response)
+        return response
+    
+    return render(request, 'students/student_import.html', {
+        'columns': IMPORT_COLUMNS,
+        'required_columns': REQUIRED_COLUMNS,
+    })
+
+
 @login_required
 def student_edit(request, pk):
     student = get_object_or_404(Student, pk=pk)
@@ -171,54 +264,14 @@ def generate_id_card(request, pk):
     student = get_object_or_404(Student, pk=pk)
     
     if not student.qr_code:
-        student.generate_qr_code()
-        student.save()
+        store_qr_code(student, render_qr_png(f"STUDENT:{student.admission_number}"))
     
     buffer = io.BytesIO()
     p = canvas.Canvas(buffer, pagesize=(3.5*inch, 2.25*inch))
     
     p.setTitle(f"Student ID - {student.full_name}")
     
-    p.setLineWidth(2)
-    p.setStrokeColor(colors.HexColor('#1e40af'))
-    p.rect(0.05*inch, 0.05*inch, 3.4*inch, 2.15*inch)
-    
-    p.setFillColor(colors.HexColor('#1e40af'))
-    p.rect(0.05*inch, 1.8*inch, 3.4*inch, 0.4*inch, fill=True)
-    
-    p.setFillColor(colors.white)
-    p.setFont("Helvetica-Bold", 12)
-    p.drawCentredString(1.75*inch, 2.05*inch, "STUDENT ID CARD")
-    
-    p.setFillColor(colors.black)
-    p.setFont("Helvetica-Bold", 9)
-    p.drawString(0.2*inch, 1.6*inch, student.full_name.upper())
-    
-    p.setFont("Helvetica", 7)
-    p.drawString(0.2*inch, 1.35*inch, f"ID: {student.admission_number}")
-    p.drawString(0.2*inch, 1.15*inch, f"Class: {student.current_class or 'N/A'}")
-    p.drawString(0.2*inch, 0.95*inch, f"DOB: {student.date_of_birth.strftime('%d/%m/%Y') if student.date_of_birth else 'N/A'}")
-    p.drawString(0.2*inch, 0.75*inch, f"Status: {student.get_status_display()}")
-    
-    if student.qr_code:
-        from django.core.files.storage import default_storage
-        import os
-        try:
-            qr_path = student.qr_code.path if hasattr(student.qr_code, 'path') else None
-            if qr_path and os.path.exists(qr_path):
-                p.drawImage(qr_path, 2.6*inch, 0.8*inch, width=0.7*inch, height=0.7*inch)
-        except:
-            pass
-    
-    p.setFont("Helvetica", 6)
-    p.drawString(0.2*inch, 0.35*inch, f"Admission: {student.admission_date.strftime('%d/%m/%Y') if student.admission_date else 'N/A'}")
-    
-    p.setFillColor(colors.HexColor('#1e40af'))
-    p.rect(0.05*inch, 0.05*inch, 3.4*inch, 0.2*inch, fill=True)
-    
-    p.setFillColor(colors.white)
-    p.setFont("Helvetica", 5)
-    p.drawCentredString(1.75*inch, 0.1*inch, "Valid for Current Academic Year | Keep Card Safe")
+    draw_student_card(p, student, qr_path(student))
     
     p.showPage()
     p.save()
@@ -229,6 +282,20 @@ def generate_id_card(request, pk):
     return response
 
 
+@login_required
+def generate_id_cards(request):
+    students, query, class_filter, status_filter = _filtered_students(request)
+    students = students.defer(None).order_by(*STUDENT_LIST_ORDERING)
+    
+    if not students.exists():
+        messages.error(request, 'No students match the selected filters.')
+        return redirect('students:student_list')
+    
+    buffer = render_card_sheets(students, draw_student_card, 'Student ID Cards')
+    suffix = f"_{class_filter}" if class_filter else ''
+    return FileResponse(buffer, as_attachment=True, filename=f"student_id_cards{suffix}.pdf", content_type='application/pdf')
+
+
 @login_required
 def results_dashboard(request):
     sessions = AcademicSession.objects.all().order_by('-start_date')
@@ -248,6 +315,105 @@ def results_dashboard(request):
     return render(request, 'students/results_dashboard.html', context)
 
 
+@login_required
+def process_results(request):
+    if request.method != 'POST':
+        return redirect('students:results_dashboard')
+    
+    session_id = request.POST.get('session')
+    term_id = request.POST.get('term')
+    classroom_id = request.POST.get('classroom')
+    
+    if not session_id or not term_id:
+        messages.error(request, 'Select a session and term to process.')
+        return redirect('students:results_dashboard')
+    
+    classes, graded = grade_term(session_id, term_id, [classroom_id] if classroom_id else None)
+    messages.success(request, f'Processed {graded} result(s) across {classes} class(es).')
+    return redirect('students:results_dashboard')
+
+
+@login_required
+def broadsheet(request):
+    classrooms = ClassRoom.objects.all()
+    sessions = AcademicSession.objects.all().order_by('-start_date')
+    terms = Term.objects.all()
+    
+    selected_class = request.GET.get('class')
+    selected_session = request.GET.get('session')
+    selected_term = request.GET.get('term')
+    export_format = request.GET.get('format')
+    
+    sheet = None
+    if selected_class and selected_session and selected_term:
+        if not all(value.isdigit() for value in (selected_class, selected_session, selected_term)):
+            messages.error(request, 'Invalid class, session or term selected.')
+            return redirect('students:broadsheet')
+        classroom = get_object_or_404(ClassRoom, pk=selected_class)
+        session = get_object_or_404(AcademicSession, pk=selected_session)
+        term = get_object_or_404(Term, pk=selected_term)
+        sheet = class_broadsheet(classroom, session, term)
+        filename = f"broadsheet_{classroom}_{term.name}"
+        
+        if export_format == 'csv':
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            sheet.to_csv(response, index=False)
+            return response
+        
+        if export_format == 'xlsx':
+            buffer = io.BytesIO()
+            sheet.to_excel(buffer, index=False, sheet_name='Broadsheet', engine='openpyxl')
+            response = HttpResponse(buffer.getvalue(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
+            return response
+    
+    context = {
+        'classrooms': classrooms,
+        'sessions': sessions,
+        'terms': terms,
+        'selected_class': selected_class,
+        'selected_session': selected_session,
+        'selected_term': selected_term,
+        'headers': list(sheet.columns) if sheet is not None else [],
+        'rows': sheet.astype(object).where(sheet.notna(), '').values.tolist() if sheet is not None else [],
+    }
+    return render(request, 'students/broadsheet.html', context)
+
+
+@login_required
+def promote_students(request):
+    sessions = AcademicSession.objects.all().order_by('-start_date')
+    classrooms = ClassRoom.objects.select_related('class_level')
+    
+    session_id = request.POST.get('session') or request.GET.get('session')
+    class_filter = request.POST.get('class') or request.GET.get('class', '')
+    if (session_id and not session_id.isdigit()) or (class_filter and not class_filter.isdigit()):
+        messages.error(request, 'Invalid session or class selected.')
+        return redirect('students:promote_students')
+    session = AcademicSession.objects.filter(pk=session_id).first() if session_id else AcademicSession.objects.filter(is_current=True).first()
+    
+    decisions = []
+    if session:
+        decisions = plan_promotions(session, [class_filter] if class_filter else None)
+    
+    if request.method == 'POST' and session:
+        counts = apply_promotions(session, decisions)
+        messages.success(request, f"Promoted {counts['promote']}, repeated {counts['repeat']} and graduated {counts['graduate']} student(s) for {session}.")
+        return redirect(f"{request.path}?session={session.pk}")
+    
+    context = {
+        'sessions': sessions,
+        'classrooms': classrooms,
+        'selected_session': session,
+        'class_filter': class_filter,
+        'decisions': decisions,
+        'summary': {action: sum(1 for d in decisions if d['action'] == action) for action in PROMOTION_ACTIONS},
+        'pass_mark': settings.PROMOTION_PASS_MARK,
+    }
+    return render(request, 'students/promotion.html', context)
+
+
 @login_required
 def mark_results(request):
     classrooms = ClassRoom.objects.all()
@@ -279,31 +445,15 @@ def mark_results(request):
         session_id = request.POST.get('session')
         term_id = request.POST.get('term')
         
-        student_ids = request.POST.getlist('student_ids')
-        
-        for student_id in student_ids:
-            ca_score = request.POST.get(f'ca_{student_id}', 0)
-            exam_score = request.POST.get(f'exam_{student_id}', 0)
-            
-            try:
-                ca_score = Decimal(ca_score) if ca_score else Decimal(0)
-                exam_score = Decimal(exam_score) if exam_score else Decimal(0)
-            except:
-                ca_score = Decimal(0)
-                exam_score = Decimal(0)
-            
-            result, created = Result.objects.update_or_create(
-                student_id=student_id,
-                subject_id=subject_id,
-                session_id=session_id,
-                term_id=term_id,
-                defaults={
-                    'classroom_id': classroom_id,
-                    'ca_score': ca_score,
-                    'exam_score': exam_score,
-                    'recorded_by': request.user,
-                }
+        scores = {
+            int(student_id): (
+                parse_score(request.POST.get(f'ca_{student_id}')),
+                parse_score(request.POST.get(f'exam_{student_id}')),
             )
+            for student_id in request.POST.getlist('student_ids')
+        }
+        
+        save_class_results(classroom_id, subject_id, session_id, term_id, scores, recorded_by=request.user)
         
         messages.success(request, 'Results saved successfully!')
         return redirect(f"{request.path}?class={classroom_id}&subject={subject_id}&session={session_id}&term={term_id}")
@@ -362,13 +512,13 @@ def view_results(request):
                 messages.error(request, "Invalid or already used scratch card code.")
         
         if has_access:
-            results = Result.objects.filter(
+            results = list(Result.objects.filter(
                 student=student,
                 session_id=selected_session_id,
                 term_id=selected_term_id
-            ).select_related('subject')
+            ).select_related('subject'))
             
-            if results.exists():
+            if results:
                 total_score = sum(r.total for r in results)
                 average = total_score / len(results)
     
@@ -400,13 +550,13 @@ def student_results(request, pk):
     average = 0
     
     if selected_session and selected_term:
-        results = Result.objects.filter(
+        results = list(Result.objects.filter(
             student=student,
             session_id=selected_session,
             term_id=selected_term
-        ).select_related('subject')
+        ).select_related('subject'))
         
-        if results.exists():
+        if results:
             total_score = sum(r.total for r in results)
             average = total_score / len(results)
     
@@ -436,107 +586,42 @@ def print_result(request, pk):
     session = get_object_or_404(AcademicSession, pk=session_id)
     term = get_object_or_404(Term, pk=term_id)
     
-    results = Result.objects.filter(
-        student=student,
-        session=session,
-        term=term
-    ).select_related('subject').order_by('subject__name')
+    payload = student_report_payload(student, session, term)
     
-    if not results.exists():
+    if payload is None:
         messages.error(request, 'No results found for the selected period.')
         return redirect('students:student_results', pk=pk)
     
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        alignment=TA_CENTER,
-        fontSize=16,
-        spaceAfter=6
-    )
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        alignment=TA_CENTER,
-        fontSize=12,
-        spaceAfter=20
-    )
-    
-    elements = []
-    
-    elements.append(Paragraph("SCHOOL MANAGEMENT SYSTEM", title_style))
-    elements.append(Paragraph("Student Report Card", subtitle_style))
-    elements.append(Spacer(1, 0.2*inch))
-    
-    info_data = [
-        ['Student Name:', student.full_name, 'Admission No:', student.admission_number],
-        ['Class:', str(student.current_class or 'N/A'), 'Session:', session.name],
-        ['Term:', term.name, '', ''],
-    ]
-    
-    info_table = Table(info_data, colWidths=[1.2*inch, 2*inch, 1.2*inch, 2*inch])
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    elements.append(info_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    result_data = [['Subject', 'CA (40)', 'Exam (60)', 'Total (100)', 'Grade', 'Remark']]
-    
-    for result in results:
-        result_data.append([
-            result.subject.name,
-            str(result.ca_score),
-            str(result.exam_score),
-            str(result.total),
-            result.grade,
-            result.remark
-        ])
-    
-    total_score = sum(r.total for r in results)
-    average = total_score / len(results) if results else 0
-    
-    result_data.append(['', '', '', '', '', ''])
-    result_data.append(['Total', '', '', str(total_score), '', ''])
-    result_data.append(['Average', '', '', f'{average:.2f}', '', ''])
-    
-    result_table = Table(result_data, colWidths=[2*inch, 0.8*inch, 0.8*inch, 1*inch, 0.7*inch, 1*inch])
-    result_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a365d')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('FONTNAME', (0, -2), (0, -1), 'Helvetica-Bold'),
-    ]))
-    elements.append(result_table)
-    elements.append(Spacer(1, 0.5*inch))
-    
-    signature_data = [
-        ['Class Teacher:', '_________________', "Principal's Signature:", '_________________'],
-    ]
-    sig_table = Table(signature_data, colWidths=[1.2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    sig_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('TOPPADDING', (0, 0), (-1, -1), 30),
-    ]))
-    elements.append(sig_table)
-    
-    doc.build(elements)
-    buffer.seek(0)
-    
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="result_{student.admission_number}_{term.name}.pdf"'
-    return response
+    pdf = report_cache.get_or_render(payload, render_report_card)
+    return FileResponse(io.BytesIO(pdf), as_attachment=True, filename=f"result_{student.admission_number}_{term.name}.pdf", content_type='application/pdf')
+
+
+@login_required
+def print_class_results(request):
+    class_id = request.GET.get('class', '')
+    session_id = request.GET.get('session', '')
+    term_id = request.GET.get('term', '')
+    if not all(value.isdigit() for value in (class_id, session_id, term_id)):
+        messages.error(request, 'Select a valid class, session and term to print.')
+        return redirect('students:results_dashboard')
+    
+    classroom = get_object_or_404(ClassRoom, pk=class_id)
+    session = get_object_or_404(AcademicSession, pk=session_id)
+    term = get_object_or_404(Term, pk=term_id)
+    output_format = request.GET.get('format', 'pdf')
+    
+    payloads = class_report_payloads(classroom, session, term)
+    if not payloads:
+        messages.error(request, 'No results found for the selected class and period.')
+        return redirect('students:results_dashboard')
+    
+    output = tempfile.TemporaryFile()
+    if output_format == 'zip':
+        render_report_card_zip(payloads, output)
+        filename, content_type = f"results_{classroom}_{term.name}.zip", 'application/zip'
+    else:
+        render_merged_report_cards(payloads, output)
+        filename, content_type = f"results_{classroom}_{term.name}.pdf", 'application/pdf'
+    output.seek(0)
+    
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=content_type)
@@ -31,23 +31,6 @@ class Teacher(models.Model):
     def __str__(self):
         return f"{self.staff_id} - {self.first_name} {self.last_name}"
 
-    def generate_qr_code(self):
-        import qrcode
-        from io import BytesIO
-        from django.core.files import File
-        
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(f"TEACHER:{self.staff_id}")
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        filename = f"qr_{self.staff_id}.png"
-        self.qr_code.save(filename, File(buffer), save=False)
-
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
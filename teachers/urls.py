@@ -5,6 +5,7 @@ app_name = 'teachers'
 
 urlpatterns = [
     path('', views.teacher_list, name='teacher_list'),
+    path('id-cards/', views.generate_staff_id_cards, name='generate_staff_id_cards'),
     path('add/', views.teacher_add, name='teacher_add'),
     path('<int:pk>/', views.teacher_detail, name='teacher_detail'),
     path('<int:pk>/edit/', views.teacher_edit, name='teacher_edit'),
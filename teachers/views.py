@@ -1,10 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.db.models import Q
 from .models import Teacher
 from core.models import ClassRoom, Subject
+from core import search
+from core.idcards import draw_staff_card, qr_path, render_card_sheets
+from core.qrcodes import render_qr_png, schedule_qr_code, store_qr_code
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
@@ -21,11 +24,7 @@ def teacher_list(request):
     teachers = Teacher.objects.all()
     
     if query:
-        teachers = teachers.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(staff_id__icontains=query)
-        )
+        teachers = search.filter_queryset(teachers, 'teacher', query)
     
     if status_filter:
         teachers = teachers.filter(status=status_filter)
@@ -74,8 +73,7 @@ def teacher_add(request):
             teacher.photo = request.FILES['photo']
         
         teacher.save()
-        teacher.generate_qr_code()
-        teacher.save()
+        schedule_qr_code(teacher)
         
         subject_ids = request.POST.getlist('subjects')
         teacher.subjects.set(subject_ids)
@@ -163,58 +161,17 @@ def teacher_delete(request, pk):
 
 @login_required
 def generate_staff_id_card(request, pk):
-    import os
     teacher = get_object_or_404(Teacher, pk=pk)
     
     if not teacher.qr_code:
-        teacher.generate_qr_code()
-        teacher.save()
+        store_qr_code(teacher, render_qr_png(f"TEACHER:{teacher.staff_id}"))
     
     buffer = io.BytesIO()
     p = canvas.Canvas(buffer, pagesize=(3.5*inch, 2.25*inch))
     
     p.setTitle(f"Teacher ID - {teacher.full_name}")
     
-    p.setLineWidth(2)
-    p.setStrokeColor(colors.HexColor('#059669'))
-    p.rect(0.05*inch, 0.05*inch, 3.4*inch, 2.15*inch)
-    
-    p.setFillColor(colors.HexColor('#059669'))
-    p.rect(0.05*inch, 1.8*inch, 3.4*inch, 0.4*inch, fill=True)
-    
-    p.setFillColor(colors.white)
-    p.setFont("Helvetica-Bold", 12)
-    p.drawCentredString(1.75*inch, 2.05*inch, "STAFF ID CARD")
-    
-    p.setFillColor(colors.black)
-    p.setFont("Helvetica-Bold", 9)
-    p.drawString(0.2*inch, 1.6*inch, teacher.full_name.upper())
-    
-    p.setFont("Helvetica", 7)
-    p.drawString(0.2*inch, 1.35*inch, f"Staff ID: {teacher.staff_id}")
-    p.drawString(0.2*inch, 1.15*inch, f"Position: Teacher")
-    if teacher.qualification:
-        qual_short = teacher.qualification[:25]
-        p.drawString(0.2*inch, 0.95*inch, f"Qualification: {qual_short}")
-    p.drawString(0.2*inch, 0.75*inch, f"Status: {teacher.get_status_display()}")
-    
-    if teacher.qr_code:
-        try:
-            qr_path = teacher.qr_code.path if hasattr(teacher.qr_code, 'path') else None
-            if qr_path and os.path.exists(qr_path):
-                p.drawImage(qr_path, 2.6*inch, 0.8*inch, width=0.7*inch, height=0.7*inch)
-        except:
-            pass
-    
-    p.setFont("Helvetica", 6)
-    p.drawString(0.2*inch, 0.35*inch, f"Employed: {teacher.date_employed.strftime('%d/%m/%Y') if teacher.date_employed else 'N/A'}")
-    
-    p.setFillColor(colors.HexColor('#059669'))
-    p.rect(0.05*inch, 0.05*inch, 3.4*inch, 0.2*inch, fill=True)
-    
-    p.setFillColor(colors.white)
-    p.setFont("Helvetica", 5)
-    p.drawCentredString(1.75*inch, 0.1*inch, "Valid for Current Academic Year | Keep Card Safe")
+    draw_staff_card(p, teacher, qr_path(teacher))
     
     p.showPage()
     p.save()
@@ -223,3 +180,24 @@ def generate_staff_id_card(request, pk):
     response = HttpResponse(buffer, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="staff_id_{teacher.staff_id}.pdf"'
     return response
+
+
+@login_required
+def generate_staff_id_cards(request):
+    query = request.GET.get('q', '')
+    status_filter = request.GET.get('status', 'active')
+    
+    teachers = Teacher.objects.order_by('last_name', 'first_name', 'id')
+    
+    if query:
+        teachers = search.filter_queryset(teachers, 'teacher', query)
+    
+    if status_filter:
+        teachers = teachers.filter(status=status_filter)
+    
+    if not teachers.exists():
+        messages.error(request, 'No staff match the selected filters.')
+        return redirect('teachers:teacher_list')
+    
+    buffer = render_card_sheets(teachers, draw_staff_card, 'Staff ID Cards')
+    return FileResponse(buffer, as_attachment=True, filename='staff_id_cards.pdf', content_type='application/pdf')